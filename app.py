@@ -7,18 +7,21 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-from modules import database, recommender
-import pandas as pd
+from modules import database, image_cache, metrics, profiling, recommender
 import importlib.util
 from modules.localization import get_text
 import time
 import datetime
 import streamlit.components.v1 as components
+from streamlit.errors import StreamlitAPIException
 from decimal import Decimal
 import importlib
 import os
 from collections import Counter
 
+# Serve Prometheus metrics from a background thread (once per process; METRICS_PORT=0 disables)
+metrics.start_http_server()
+
 # Custom CSS to hide the default Streamlit sidebar navigation
 # (Delete the block that sets [data-testid="stSidebarNav"] to display: none;)
 
@@ -77,7 +80,7 @@ def row_to_dict(row):
     return {}
 
 def get_filter_data():
-    """Gets the filter bounds (years, genres, etc.) to prevent re-querying."""
+    """Gets the filter bounds (years, genres, etc.) from the shared, write-invalidated snapshot."""
     try:
         return database.get_movie_filter_bounds()
     except Exception as e:
@@ -87,24 +90,27 @@ def get_filter_data():
             'min_year': 1900,
             'max_year': 2024,
             'genres': [],
-            'languages': []
+            'audio_languages': []
         }
 
 def load_and_build_model():
     """
     Loads all movies from the database and builds the recommendation model.
-    The cache ensures this runs only when the underlying data changes.
+    The model is rebuilt in the background when the movies change (see recommender.ensure_model),
+    and modules/warmup builds it before the first session.
     """
     try:
-        movies_list = database.get_all_movies()
-        if not movies_list:
-            return None, None
-        movies_df = pd.DataFrame(movies_list)
-        recommender.build_recommendation_model(movies_df)
-        return movies_df
+        return recommender.ensure_model(database.get_model_version(), database.get_model_movies)
     except Exception as e:
         st.error(f"Error loading recommendation model: {e}")
-        return None, None
+        return None
+
+def rerun_fragment():
+    """Reruns only the calling fragment; falls back to a full rerun when the fragment is running as part of one."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
 
 # --- Fix: Always convert DB rows to dicts in all loops ---
 def get_suggestions(search_term):
@@ -113,16 +119,10 @@ def get_suggestions(search_term):
 
 def display_movie_poster(movie_data):
     movie = row_to_dict(movie_data) if movie_data else {}
-    poster_url = movie.get('poster_url')
-    default_poster = "https://via.placeholder.com/300x450/2E2E2E/FFFFFF?text=🎬+No+Poster"
-    
-    # A simple check to see if the URL is plausible
-    is_valid = poster_url and isinstance(poster_url, str) and poster_url.strip().startswith('http')
-
-    if is_valid:
-        st.image(str(poster_url), use_column_width=True)
-    else:
-            st.image(default_poster, use_column_width=True)
+    # Posters are served from the local thumbnail cache (downloaded and resized once, in
+    # the background on first sight); missing or broken ones get a locally generated placeholder
+    poster = image_cache.poster_source(movie.get('poster_url')) or image_cache.placeholder_path()
+    st.image(poster, use_column_width=True)
 
 def search_autocomplete():
     """Search with autocomplete suggestions"""
@@ -153,188 +153,137 @@ def search_autocomplete():
     
     return search_term
 
-def display_movie_grid(movies_rows, total_movies, page=1, per_page=12, cols_per_row=4):
+@st.fragment
+def movie_card(movie):
     """
-    Displays movies in a responsive grid and handles pagination controls.
-    This function receives a pre-paginated list of movies.
+    One card of the browse grid, rendered as a fragment: watchlist and review actions
+    rerun only this card. Watch Now/Stop rerun the app, since every card shows which
+    movie is playing.
     """
-    movies = [row_to_dict(row) for row in movies_rows] if movies_rows else []
-    if not movies:
-        st.warning("No movies found matching your criteria.")
-        return
-        
-    # Display movies in grid
-    cols = st.columns(cols_per_row)
-    
-    for i, movie in enumerate(movies):
-        col = cols[i % cols_per_row]
-        
-        with col:
-            # Use a custom key for the container to ensure it's unique
-            with st.container(border=True):
-                # Movie poster
-                display_movie_poster(movie)
-                # Movie title
-                st.markdown(f"**{movie.get('title', 'No Title')}**")
-                # Movie details
-                st.caption(f"🎬 {movie.get('type', 'Unknown')} | 🎭 {movie.get('genre', 'Unknown')} | 📅 {movie.get('release_year', 'N/A')}")
-                # --- Watchlist and Reviews Counts ---
-                movie_id = movie.get('id')
-                watchlist_count = database.get_watchlist_count(movie_id) if movie_id else 0
-                review_count = database.get_review_count(movie_id) if movie_id else 0
-                st.caption(f"📋 Watchlist: {watchlist_count} | 📝 Reviews: {review_count}")
-                # Watchlist & History Buttons
-                user_id = st.session_state.user.get('id') if st.session_state.user else None
-                if movie_id and user_id:
-                    # --- RATING DISPLAY ---
-                    rating_summary_row = database.get_rating_summary(movie_id)
-                    rating_summary = row_to_dict(rating_summary_row) if rating_summary_row else {}
-                    avg_rating = rating_summary.get('average_rating', 0.0)
-                    review_count = rating_summary.get('review_count', 0)
-                    # Fix: Only convert to float if possible and safe
-                    if isinstance(avg_rating, (int, float, str)):
-                        try:
-                            avg_rating_float = float(avg_rating)
-                        except (TypeError, ValueError):
-                            avg_rating_float = 0.0
-                    else:
-                        avg_rating_float = 0.0
-                    if avg_rating_float > 0:
-                        st.markdown(f"**⭐ {avg_rating_float:.1f}/5** ({review_count} reviews)")
-                    else:
-                        st.caption(get_text("no_reviews") or "No reviews yet")
-                    in_watchlist = database.is_in_watchlist(user_id, movie_id)
-                    button_col1, button_col2 = st.columns(2)
-                    with button_col1:
-                        if in_watchlist:
-                            if st.button(get_text("watchlist_remove") or "➖ Watchlist", key=f"wl_{movie_id}", use_container_width=True):
-                                database.remove_from_watchlist(user_id, movie_id)
-                                st.toast(f"Removed '{movie.get('title', 'No Title')}' from watchlist!", icon="📋")
-                                st.rerun()
-                        else:
-                            if st.button(get_text("watchlist_add") or "➕ Watchlist", key=f"wl_{movie_id}", use_container_width=True):
-                                database.add_to_watchlist(user_id, movie_id)
-                                st.toast(f"Added '{movie.get('title', 'No Title')}' to watchlist!", icon="📋")
-                                st.rerun()
-                    with button_col2:
-                        # Check if a session is currently active for THIS movie
-                        is_watching = st.session_state.get('active_session_movie_id') == movie_id
-                        if is_watching:
-                            # Show stop button
-                            if st.button("⏹️ Stop", key=f"stop_{movie_id}", use_container_width=True):
-                                session_id = st.session_state.get('active_session_id')
-                                if session_id:
-                                    database.end_watch_session(session_id)
-                                    database.add_to_history(user_id, movie_id)
-                                    st.toast(f"Finished watching '{movie.get('title', 'No Title')}'!", icon="✅")
-                                    # Clear session state
-                                    del st.session_state['active_session_id']
-                                    del st.session_state['active_session_movie_id']
-                                    st.rerun()
-                        else:
-                            # Show watch now button
-                            if st.button("▶️ Watch Now", key=f"watch_{movie_id}", use_container_width=True):
-                                # End any other active session before starting a new one
-                                if 'active_session_id' in st.session_state:
-                                    database.end_watch_session(st.session_state.active_session_id)
-                                    st.toast("Stopped previous movie session.", icon="⏹️")
-                                # Start a new session
-                                session_id = database.start_watch_session(user_id, movie_id)
-                                if session_id:
-                                    st.session_state['active_session_id'] = session_id
-                                    st.session_state['active_session_movie_id'] = movie_id
-                                    st.toast(f"Started watching '{movie.get('title', 'No Title')}'!", icon="▶️")
-                                    st.rerun()
-                    # --- REVIEW & DETAILS EXPANDER ---
-                    with st.expander(get_text("details_reviews") or "Details & Reviews"):
-                        # Movie description
-                        description = movie.get('description')
-                        st.subheader("Description")
-                        if description and description.strip():
-                             st.write(description)
+    with st.container(border=True):
+        # Movie poster
+        display_movie_poster(movie)
+        # Movie title
+        st.markdown(f"**{movie.get('title', 'No Title')}**")
+        # Movie details
+        st.caption(f"🎬 {movie.get('type', 'Unknown')} | 🎭 {movie.get('genre', 'Unknown')} | 📅 {movie.get('release_year', 'N/A')}")
+        # --- Watchlist and Reviews Counts ---
+        movie_id = movie.get('id')
+        watchlist_count = database.get_watchlist_count(movie_id) if movie_id else 0
+        review_count = database.get_review_count(movie_id) if movie_id else 0
+        st.caption(f"📋 Watchlist: {watchlist_count} | 📝 Reviews: {review_count}")
+        # Watchlist & History Buttons
+        user_id = st.session_state.user.get('id') if st.session_state.user else None
+        if movie_id and user_id:
+            # --- RATING DISPLAY ---
+            rating_summary_row = database.get_rating_summary(movie_id)
+            rating_summary = row_to_dict(rating_summary_row) if rating_summary_row else {}
+            avg_rating = rating_summary.get('average_rating', 0.0)
+            review_count = rating_summary.get('review_count', 0)
+            # Fix: Only convert to float if possible and safe
+            if isinstance(avg_rating, (int, float, str)):
+                try:
+                    avg_rating_float = float(avg_rating)
+                except (TypeError, ValueError):
+                    avg_rating_float = 0.0
+            else:
+                avg_rating_float = 0.0
+            if avg_rating_float > 0:
+                st.markdown(f"**⭐ {avg_rating_float:.1f}/5** ({review_count} reviews)")
+            else:
+                st.caption(get_text("no_reviews") or "No reviews yet")
+            in_watchlist = database.is_in_watchlist(user_id, movie_id)
+            button_col1, button_col2 = st.columns(2)
+            with button_col1:
+                if in_watchlist:
+                    if st.button(get_text("watchlist_remove") or "➖ Watchlist", key=f"wl_{movie_id}", use_container_width=True):
+                        database.remove_from_watchlist(user_id, movie_id)
+                        st.toast(f"Removed '{movie.get('title', 'No Title')}' from watchlist!", icon="📋")
+                        rerun_fragment()
+                else:
+                    if st.button(get_text("watchlist_add") or "➕ Watchlist", key=f"wl_{movie_id}", use_container_width=True):
+                        database.add_to_watchlist(user_id, movie_id)
+                        st.toast(f"Added '{movie.get('title', 'No Title')}' to watchlist!", icon="📋")
+                        rerun_fragment()
+            with button_col2:
+                # Check if a session is currently active for THIS movie
+                is_watching = st.session_state.get('active_session_movie_id') == movie_id
+                if is_watching:
+                    # Show stop button
+                    if st.button("⏹️ Stop", key=f"stop_{movie_id}", use_container_width=True):
+                        session_id = st.session_state.get('active_session_id')
+                        if session_id:
+                            database.end_watch_session(session_id)
+                            database.add_to_history(user_id, movie_id)
+                            st.toast(f"Finished watching '{movie.get('title', 'No Title')}'!", icon="✅")
+                            # Clear session state
+                            del st.session_state['active_session_id']
+                            del st.session_state['active_session_movie_id']
+                            st.rerun()
+                else:
+                    # Show watch now button
+                    if st.button("▶️ Watch Now", key=f"watch_{movie_id}", use_container_width=True):
+                        # End any other active session before starting a new one
+                        if 'active_session_id' in st.session_state:
+                            database.end_watch_session(st.session_state.active_session_id)
+                            st.toast("Stopped previous movie session.", icon="⏹️")
+                        # Start a new session
+                        session_id = database.start_watch_session(user_id, movie_id)
+                        if session_id:
+                            st.session_state['active_session_id'] = session_id
+                            st.session_state['active_session_movie_id'] = movie_id
+                            st.toast(f"Started watching '{movie.get('title', 'No Title')}'!", icon="▶️")
+                            st.rerun()
+            # --- REVIEW & DETAILS EXPANDER ---
+            with st.expander(get_text("details_reviews") or "Details & Reviews"):
+                # Movie description
+                description = movie.get('description')
+                st.subheader("Description")
+                if description and description.strip():
+                     st.write(description)
+                else:
+                    st.write("No description available.")
+                # Cast information
+                cast = movie.get('cast')
+                if cast and cast.strip() and cast != "Unknown":
+                    st.caption(f"👥 Cast: {cast}")
+                # Audio Language
+                audio_lang = movie.get('audio_languages')
+                if audio_lang and audio_lang.strip():
+                    st.caption(f"🗣️ Audio: {audio_lang}")
+                # --- REVIEW SECTION ---
+                st.subheader("Recent Reviews")
+                reviews_rows = database.get_reviews_for_movie(movie_id)
+                reviews = [row_to_dict(row) for row in reviews_rows] if reviews_rows else []
+                if not reviews:
+                    st.write("Be the first to review this movie!")
+                else:
+                    for review in reviews:
+                        created_at = review.get('created_at')
+                        # Fix: Only call strftime if it's a datetime.datetime and not None
+                        if created_at is not None and isinstance(created_at, datetime.datetime):
+                            created_at_str = created_at.strftime('%Y-%m-%d')
+                        elif created_at is not None and not isinstance(created_at, (str, int, float, Decimal, bytes, set)):
+                            created_at_str = str(created_at)
                         else:
-                            st.write("No description available.")
-                        # Cast information
-                        cast = movie.get('cast')
-                        if cast and cast.strip() and cast != "Unknown":
-                            st.caption(f"👥 Cast: {cast}")
-                        # Audio Language
-                        audio_lang = movie.get('audio_languages')
-                        if audio_lang and audio_lang.strip():
-                            st.caption(f"🗣️ Audio: {audio_lang}")
-                        # --- REVIEW SECTION ---
-                        st.subheader("Recent Reviews")
-                        reviews_rows = database.get_reviews_for_movie(movie_id)
-                        reviews = [row_to_dict(row) for row in reviews_rows] if reviews_rows else []
-                        if not reviews:
-                            st.write("Be the first to review this movie!")
+                            created_at_str = ''
+                        st.markdown(f"**{review.get('username', 'Anonymous')}** ({review.get('rating', 'N/A')}⭐) - *{created_at_str}*")
+                        st.text(review.get('review', 'No review text.'))
+                        st.divider()
+                # Form to add/update a review
+                st.subheader("Add or Update Your Review")
+                with st.form(key=f"review_form_{movie_id}", clear_on_submit=True):
+                    user_rating = st.slider("Your Rating (1-5 ⭐)", 1, 5, 3, key=f"rating_{movie_id}")
+                    user_review = st.text_area("Your Review", max_chars=250, placeholder="What did you think?", key=f"review_text_{movie_id}")
+                    submit_review = st.form_submit_button("Submit Your Review")
+                    if submit_review:
+                        if database.add_or_update_review(movie_id, user_id, user_rating, user_review):
+                            st.toast("Your review has been submitted!", icon="🎉")
+                            rerun_fragment()
                         else:
-                            for review in reviews:
-                                created_at = review.get('created_at')
-                                # Fix: Only call strftime if it's a datetime.datetime and not None
-                                if created_at is not None and isinstance(created_at, datetime.datetime):
-                                    created_at_str = created_at.strftime('%Y-%m-%d')
-                                elif created_at is not None and not isinstance(created_at, (str, int, float, Decimal, bytes, set)):
-                                    created_at_str = str(created_at)
-                                else:
-                                    created_at_str = ''
-                                st.markdown(f"**{review.get('username', 'Anonymous')}** ({review.get('rating', 'N/A')}⭐) - *{created_at_str}*")
-                                st.text(review.get('review', 'No review text.'))
-                                st.divider()
-                        # Form to add/update a review
-                        st.subheader("Add or Update Your Review")
-                        with st.form(key=f"review_form_{movie_id}", clear_on_submit=True):
-                            user_rating = st.slider("Your Rating (1-5 ⭐)", 1, 5, 3, key=f"rating_{movie_id}")
-                            user_review = st.text_area("Your Review", max_chars=250, placeholder="What did you think?", key=f"review_text_{movie_id}")
-                            submit_review = st.form_submit_button("Submit Your Review")
-                            if submit_review:
-                                if database.add_or_update_review(movie_id, user_id, user_rating, user_review):
-                                    st.toast("Your review has been submitted!", icon="🎉")
-                                    st.rerun()
-                                else:
-                                    st.error("Failed to submit review. Please try again.")
-                # Add some spacing between movie cards
-                st.markdown("---")
-
-    # --- PAGINATION CONTROLS ---
-    total_pages = (total_movies + per_page - 1) // per_page
-    
-    if total_pages > 1:
-        st.divider()
-        
-        # Display current page info
-        st.write(f"Page **{page}** of **{total_pages}** (Total movies: **{total_movies}**)")
-        
-        cols = st.columns([1, 1, 1, 5, 1, 1, 1])
-
-        if page > 1:
-            if cols[0].button("⏮️ First", use_container_width=True):
-                st.session_state.current_page = 1
-                st.rerun()
-            if cols[1].button("⬅️ Previous", use_container_width=True):
-                st.session_state.current_page = page - 1
-                st.rerun()
-        
-        if page < total_pages:
-            if cols[5].button("Next ➡️", use_container_width=True):
-                st.session_state.current_page = page + 1
-                st.rerun()
-            if cols[6].button("Last ⏭️", use_container_width=True):
-                st.session_state.current_page = total_pages
-                st.rerun()
-        
-        # Page jump in the middle
-        with cols[3]:
-            page_jump = st.number_input(
-                "Go to page:", 
-                min_value=1, 
-                max_value=total_pages, 
-                value=page, 
-                key='page_jump'
-            )
-            if page_jump != page:
-                st.session_state.current_page = page_jump
-                st.rerun()
+                            st.error("Failed to submit review. Please try again.")
+        # Add some spacing between movie cards
+        st.markdown("---")
 
 def login_page():
     st.header("🔐 Login")
@@ -468,15 +417,139 @@ def display_value(val, default="N/A"):
         return default
     return str(val)
 
+@st.fragment
+def recommendations_section():
+    """
+    "Recommended for You" strip. A fragment, so "Not Interested" reruns only the strip;
+    the history and feedback it reads come from the per-user cache.
+    """
+    st.header(get_text("recommended_for_you") or "✨ Recommended for You")
+    user_id = st.session_state.user.get('id')
+    if user_id:
+        user_history_rows = database.get_history(user_id)
+        user_history = [row_to_dict(row) for row in user_history_rows] if user_history_rows else []
+        if not user_history:
+            st.info("Watch some movies to get personalized recommendations!")
+        else:
+            last_watched_movie = user_history[0]
+            last_watched_movie_title = last_watched_movie.get('title')
+            if last_watched_movie_title:
+                recommendations_df = recommender.get_recommendations(last_watched_movie_title)
+
+                # Get a list of movie IDs the user is not interested in
+                excluded_movie_ids = database.get_user_recommendation_feedback_ids(user_id)
+
+                if recommendations_df is not None and not recommendations_df.empty:
+                    # Filter out the movies the user is not interested in
+                    filtered_recs_df = recommendations_df[~recommendations_df['id'].isin(excluded_movie_ids)]
+
+                    if filtered_recs_df.empty:
+                        st.info("We've run out of new recommendations for now. Check back later!")
+                    else:
+                        st.write((get_text("because_you_watched") or "Because you watched **{movie_title}**:").format(movie_title=last_watched_movie_title))
+                        rec_cols = st.columns(5)
+                        for i, (_, rec_row) in enumerate(filtered_recs_df.head(5).iterrows()):
+                            rec = rec_row.to_dict()
+                            with rec_cols[i]:
+                                with st.container():
+                                    display_movie_poster(rec)
+                                    st.markdown(f"**{rec.get('title', 'N/A')}**")
+                                    st.caption(f"📅 {rec.get('release_year', 'N/A')}")
+                                    rec_id = rec.get('id')
+                                    if st.button("Not Interested", key=f"rec_not_interested_{rec_id}", use_container_width=True):
+                                        database.add_recommendation_feedback(user_id, rec_id)
+                                        st.toast(f"We won't recommend '{rec.get('title', 'N/A')}' anymore.", icon="👍")
+                                        rerun_fragment()
+                else:
+                    st.info("Could not find recommendations based on your last watched movie.")
+
+@st.fragment
+def browse_section(filter_data):
+    """
+    Filtered, paginated catalog grid. A fragment, so paging reruns only the grid;
+    changing a filter (outside the fragment) still reruns the whole page.
+    """
+    # --- Process filter values for the backend ---
+    rating_map = {
+        "4+ stars": "4+",
+        "3+ stars": "3+",
+        "Below 3 stars": "<3"
+    }
+    sort_map = {
+        "Popularity": "popularity",
+        "Rating": "rating",
+        "Newest": "year"
+    }
+    # --- Fetch and Display Movies based on search/filter ---
+    PER_PAGE = 6
+    current_page = st.session_state.get('current_page', 1)
+    movies, total_movies = database.get_movies_paginated(
+        page=current_page,
+        per_page=PER_PAGE,
+        query=st.session_state.get('search_term', ''),
+        movie_type=st.session_state.get('filter_type', None) if st.session_state.get('filter_type', 'All') != 'All' else None,
+        genres=st.session_state.get('filter_genres', []),
+        year_range=st.session_state.get('filter_year_range', (filter_data['min_year'], filter_data['max_year'])),
+        rating_filter=rating_map.get(st.session_state.get('filter_rating', 'All')),
+        audio_languages=st.session_state.get('filter_audio_languages', []),
+        sort_by=sort_map.get(st.session_state.get('filter_sort_by', 'Popularity'), 'popularity')
+    )
+    st.success(f"{total_movies} movies found matching your criteria!")
+    st.header((get_text("browse_all") or "📺 Browse All Movies & Series ({count} found)").format(count=total_movies))
+    # --- Movie Grid ---
+    # Each card is its own fragment, so a card's watchlist or review action reruns only that card
+    def movie_grid(movies, per_row=3):
+        if not movies:
+            st.warning("No movies found matching your criteria.")
+            return
+        for i in range(0, len(movies), per_row):
+            cols = st.columns(per_row)
+            for j, movie in enumerate(movies[i:i+per_row]):
+                with cols[j]:
+                    movie_card(movie)
+    movie_grid([row_to_dict(row) for row in movies], per_row=3)
+    # --- Pagination Controls ---
+    total_pages = (total_movies + PER_PAGE - 1) // PER_PAGE
+    if total_pages > 1:
+        st.divider()
+        st.write(f"Page **{current_page}** of **{total_pages}** (Total movies: **{total_movies}**)")
+        cols = st.columns([1, 1, 1, 5, 1, 1, 1])
+        if current_page > 1:
+            if cols[0].button("⏮️ First", use_container_width=True):
+                st.session_state.current_page = 1
+                rerun_fragment()
+            if cols[1].button("⬅️ Previous", use_container_width=True):
+                st.session_state.current_page = current_page - 1
+                rerun_fragment()
+        if current_page < total_pages:
+            if cols[5].button("Next ➡️", use_container_width=True):
+                st.session_state.current_page = current_page + 1
+                rerun_fragment()
+            if cols[6].button("Last ⏭️", use_container_width=True):
+                st.session_state.current_page = total_pages
+                rerun_fragment()
+        with cols[3]:
+            page_jump = st.number_input(
+                "Go to page:", 
+                min_value=1, 
+                max_value=total_pages, 
+                value=current_page, 
+                key='page_jump'
+            )
+            if page_jump != current_page:
+                st.session_state.current_page = page_jump
+                rerun_fragment()
+
 def main():
     """Main function to run the Streamlit application."""
 
     # Initialize session state for filters
+    filter_data = get_filter_data()
     filter_keys = {
         'search_term': "",
         'filter_genres': [],
         'filter_type': "All",
-        'filter_year_range': (get_filter_data()['min_year'], get_filter_data()['max_year']),
+        'filter_year_range': (filter_data['min_year'], filter_data['max_year']),
         'filter_audio_languages': [],
         'filter_rating': "All",
         'filter_sort_by': "Popularity"
@@ -510,6 +583,9 @@ def main():
         st.error(f"Database initialization failed: {e}")
         return # Stop the app if DB fails
 
+    # Hourly TMDb metadata sync (trailers, languages, keywords); a no-op once running in this process
+    database.start_metadata_sync_job()
+
     # --- APP ROUTING ---
     if st.session_state.logged_in and st.session_state.user:
         # --- LOGGED-IN VIEW ---
@@ -683,26 +759,27 @@ def main():
             st.markdown("---")
             # Global stats (read-only, no admin controls)
             st.subheader('Platform Stats')
-            metrics = database.get_dashboard_metrics()
+            platform_metrics = database.get_dashboard_metrics()
             kpi_cols = st.columns(4)
             kpis = {
-                "👥 Total Users": metrics.get('total_users', 0),
-                "🎬 Total Movies": metrics.get('total_movies', 0),
-                "📋 Watchlist Items": metrics.get('total_watchlist', 0),
-                "✅ Watched Movies": metrics.get('total_watched', 0),
+                "👥 Total Users": platform_metrics.get('total_users', 0),
+                "🎬 Total Movies": platform_metrics.get('total_movies', 0),
+                "📋 Watchlist Items": platform_metrics.get('total_watchlist', 0),
+                "✅ Watched Movies": platform_metrics.get('total_watched', 0),
             }
             for i, (label, value) in enumerate(kpis.items()):
                 with kpi_cols[i]:
                     st.metric(label=label, value=str(value))
             st.markdown("---")
             st.subheader('Top Genres')
-            genre_data = metrics.get('movies_by_genre', [])
+            import pandas as pd
+            genre_data = platform_metrics.get('movies_by_genre', [])
             if genre_data:
                 df = pd.DataFrame(genre_data)
                 st.bar_chart(df.set_index('genre')['count'], use_container_width=True)
             st.markdown("---")
             st.subheader('Recent Uploads')
-            uploads = metrics.get('recent_uploads', [])
+            uploads = platform_metrics.get('recent_uploads', [])
             if uploads:
                 st.table(pd.DataFrame(uploads))
         elif page == 'history':
@@ -764,6 +841,7 @@ def main():
                 st.success(f"{len(filtered)} movies/series in your history.")
                 # --- Export Button ---
                 if filtered:
+                    import pandas as pd
                     export_df = pd.DataFrame([
                         {
                             'Title': h.get('title', ''),
@@ -925,6 +1003,8 @@ def main():
                 st.error('🚫 You do not have permission to access the Admin Panel.')
         elif page == 'dashboard' or True:
             # Default dashboard/main page
+            sections = metrics.SectionTimer("home")
+            sections.start("header")
             st.title(get_text("page_title") or "Movie Recommendation System")
             st.write((get_text("welcome_message") or "Welcome, {username}! Explore our collection of movies and series.").format(username=st.session_state.user.get('username', 'user')))
             
@@ -935,48 +1015,12 @@ def main():
                 st.warning("No movies in database to build recommendation model.")
             else:
                 # --- Recommended for You Section ---
-                st.header(get_text("recommended_for_you") or "✨ Recommended for You")
-                user_id = st.session_state.user.get('id')
-                if user_id:
-                    user_history_rows = database.get_history(user_id)
-                    user_history = [row_to_dict(row) for row in user_history_rows] if user_history_rows else []
-                    if not user_history:
-                        st.info("Watch some movies to get personalized recommendations!")
-                    else:
-                        last_watched_movie = user_history[0]
-                        last_watched_movie_title = last_watched_movie.get('title')
-                        if last_watched_movie_title:
-                            recommendations_df = recommender.get_recommendations(last_watched_movie_title)
-                            
-                            # Get a list of movie IDs the user is not interested in
-                            excluded_movie_ids = database.get_user_recommendation_feedback_ids(user_id)
-
-                            if recommendations_df is not None and not recommendations_df.empty:
-                                # Filter out the movies the user is not interested in
-                                filtered_recs_df = recommendations_df[~recommendations_df['id'].isin(excluded_movie_ids)]
-
-                                if filtered_recs_df.empty:
-                                    st.info("We've run out of new recommendations for now. Check back later!")
-                                else:
-                                    st.write((get_text("because_you_watched") or "Because you watched **{movie_title}**:").format(movie_title=last_watched_movie_title))
-                                    rec_cols = st.columns(5)
-                                    for i, (_, rec_row) in enumerate(filtered_recs_df.head(5).iterrows()):
-                                        rec = rec_row.to_dict()
-                                        with rec_cols[i]:
-                                            with st.container():
-                                                display_movie_poster(rec)
-                                                st.markdown(f"**{rec.get('title', 'N/A')}**")
-                                                st.caption(f"📅 {rec.get('release_year', 'N/A')}")
-                                                rec_id = rec.get('id')
-                                                if st.button("Not Interested", key=f"rec_not_interested_{rec_id}", use_container_width=True):
-                                                    database.add_recommendation_feedback(user_id, rec_id)
-                                                    st.toast(f"We won't recommend '{rec.get('title', 'N/A')}' anymore.", icon="👍")
-                                                    st.rerun()
-                            else:
-                                st.info("Could not find recommendations based on your last watched movie.")
+                sections.start("recommendations")
+                recommendations_section()
                 st.divider()
 
                 # --- Trending Now Section ---
+                sections.start("trending")
                 st.header("🔥 Trending Now")
                 trending_movies_rows = database.get_trending_movies(limit=10)
                 trending_movies = [row_to_dict(row) for row in trending_movies_rows] if trending_movies_rows else []
@@ -993,6 +1037,7 @@ def main():
                 st.divider()
 
                 # --- Search and Filter UI ---
+                sections.start("filters")
                 filter_data = get_filter_data()
                 with st.expander("🔍 Advanced Filters & Sort", expanded=True):
                     filter_cols = st.columns([2, 2, 2, 2, 2, 2])
@@ -1044,83 +1089,15 @@ def main():
                                 del st.session_state[key]
                         st.rerun()
 
-                # --- Process filter values for the backend ---
-                rating_map = {
-                    "4+ stars": "4+",
-                    "3+ stars": "3+",
-                    "Below 3 stars": "<3"
-                }
-                sort_map = {
-                    "Popularity": "popularity",
-                    "Rating": "rating",
-                    "Newest": "year"
-                }
-                # --- Fetch and Display Movies based on search/filter ---
-                PER_PAGE = 6
-                current_page = st.session_state.get('current_page', 1)
-                movies, total_movies = database.get_movies_paginated(
-                    page=current_page,
-                    per_page=PER_PAGE,
-                    query=st.session_state.get('search_term', ''),
-                    movie_type=st.session_state.get('filter_type', None) if st.session_state.get('filter_type', 'All') != 'All' else None,
-                    genres=st.session_state.get('filter_genres', []),
-                    year_range=st.session_state.get('filter_year_range', (filter_data['min_year'], filter_data['max_year'])),
-                    rating_filter=rating_map.get(st.session_state.get('filter_rating', 'All')),
-                    audio_languages=st.session_state.get('filter_audio_languages', []),
-                    sort_by=sort_map.get(st.session_state.get('filter_sort_by', 'Popularity'), 'popularity')
-                )
-                st.success(f"{total_movies} movies found matching your criteria!")
-                st.header((get_text("browse_all") or "📺 Browse All Movies & Series ({count} found)").format(count=total_movies))
-                # --- Movie Grid ---
-                def movie_grid(movies, per_row=3):
-                    if not movies:
-                        st.warning("No movies found matching your criteria.")
-                        return
-                    for i in range(0, len(movies), per_row):
-                        cols = st.columns(per_row)
-                        for j, movie in enumerate(movies[i:i+per_row]):
-                            with cols[j]:
-                                with st.container(border=True):
-                                    display_movie_poster(movie)
-                                    st.markdown(f"**{movie.get('title', 'No Title')}**")
-                                    st.caption(f"🎬 {movie.get('type', 'Unknown')} | 🎭 {movie.get('genre', 'Unknown')} | 📅 {movie.get('release_year', 'N/A')}")
-                                    st.caption(f"👥 {movie.get('cast', 'Unknown')}")
-                movie_grid([row_to_dict(row) for row in movies], per_row=3)
-                # --- Pagination Controls ---
-                total_pages = (total_movies + PER_PAGE - 1) // PER_PAGE
-                if total_pages > 1:
-                    st.divider()
-                    st.write(f"Page **{current_page}** of **{total_pages}** (Total movies: **{total_movies}**)")
-                    cols = st.columns([1, 1, 1, 5, 1, 1, 1])
-                    if current_page > 1:
-                        if cols[0].button("⏮️ First", use_container_width=True):
-                            st.session_state.current_page = 1
-                            st.rerun()
-                        if cols[1].button("⬅️ Previous", use_container_width=True):
-                            st.session_state.current_page = current_page - 1
-                            st.rerun()
-                    if current_page < total_pages:
-                        if cols[5].button("Next ➡️", use_container_width=True):
-                            st.session_state.current_page = current_page + 1
-                            st.rerun()
-                        if cols[6].button("Last ⏭️", use_container_width=True):
-                            st.session_state.current_page = total_pages
-                            st.rerun()
-                    with cols[3]:
-                        page_jump = st.number_input(
-                            "Go to page:", 
-                            min_value=1, 
-                            max_value=total_pages, 
-                            value=current_page, 
-                            key='page_jump'
-                        )
-                        if page_jump != current_page:
-                            st.session_state.current_page = page_jump
-                            st.rerun()
+                sections.start("grid")
+                browse_section(filter_data)
+            sections.stop()
 
     else:
         # --- LOGIN VIEW ---
         login_page()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Opt-in per-rerun profiling (STREAMLIT_PROFILE, or ?profile=1 for admins), see modules/profiling.py
+    with profiling.profile_rerun("app"):
+        main()
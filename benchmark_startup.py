@@ -0,0 +1,86 @@
+"""
+Measures how long the app's modules take to import, i.e. the cold start of a worker.
+
+    python benchmark_startup.py
+    python benchmark_startup.py app modules.database --top 15
+    python benchmark_startup.py --repeat 5 --fail-on-heavy
+
+Each target is imported in a fresh interpreter under `python -X importtime`, so no
+target benefits from modules another one already loaded. For every target this
+prints the median wall time, the cost of each module it imports directly and of our
+own modules (cumulative and self time), and which heavy dependencies were loaded
+eagerly, beyond those Streamlit itself loads. Heavy dependencies are meant to be
+imported on first use only.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TARGETS = ['app', 'modules.database', 'modules.recommender', 'modules.tmdb', 'modules.image_cache']
+HEAVY_MODULES = ['pandas', 'numpy', 'sklearn', 'plotly', 'mysql.connector', 'pymysql', 'pyarrow']
+
+# "import time:  self [us] | cumulative | imported package", nesting shown by indentation
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+def measure(target):
+    """
+    Imports `target` in a fresh interpreter.
+    Returns (wall_seconds, {module: (self_us, cumulative_us, depth)}).
+    """
+    code = f"import time; started = time.perf_counter(); import {target}; print(time.perf_counter() - started)"
+    # No metrics listener in the child process
+    env = dict(os.environ, METRICS_PORT="0")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {target} failed:\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return float(result.stdout.strip().splitlines()[-1]), modules
+
+def heavy_modules_loaded(modules, baseline=()):
+    """Heavy dependencies in `modules` that are not already in `baseline` (e.g. Streamlit's own imports)."""
+    return [name for name in HEAVY_MODULES if name in modules and name not in baseline]
+
+def report(target, runs, top, baseline=()):
+    """Prints the summary for one target; `runs` is a list of measure() results. Returns the heavy modules loaded."""
+    wall = statistics.median(seconds for seconds, _ in runs)
+    modules = runs[-1][1]
+    print(f"\n{target}: {wall * 1000:.0f} ms (median of {len(runs)})")
+    print(f"  {'cumulative':>10}  {'self':>8}  module")
+    # Direct imports of the target, plus our own modules wherever they are nested
+    ranked = sorted(((cumulative, self_us, name) for name, (self_us, cumulative, depth) in modules.items()
+                     if name != target and (depth == 1 or name.split('.')[0] in ('modules', 'app'))), reverse=True)
+    for cumulative, self_us, name in ranked[:top]:
+        print(f"  {cumulative / 1000:>8.1f}ms  {self_us / 1000:>6.1f}ms  {name}")
+    heavy = heavy_modules_loaded(modules, baseline)
+    print(f"  heavy dependencies loaded at import: {', '.join(heavy) if heavy else 'none'}")
+    return heavy
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report the import cost of the app's modules.")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="modules to import (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=10, help="most expensive imports to list per target")
+    parser.add_argument("--fail-on-heavy", action="store_true", help="exit 1 if any target loads a heavy dependency")
+    args = parser.parse_args(argv)
+
+    # Whatever Streamlit loads is paid by every page and is not ours to defer
+    baseline_seconds, baseline = measure('streamlit')
+    print(f"streamlit alone: {baseline_seconds * 1000:.0f} ms")
+    eager = False
+    for target in args.targets:
+        runs = [measure(target) for _ in range(max(1, args.repeat))]
+        eager = bool(report(target, runs, args.top, baseline)) or eager
+    return 1 if eager and args.fail_on_heavy else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
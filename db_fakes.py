@@ -0,0 +1,66 @@
+"""
+In-memory stand-ins for the DB-API connection and cursor, shared by the tests.
+
+A test subclasses FakeDB, answers the statements it cares about in execute() (and
+executemany()), and patches database.get_conn with db.connect:
+
+    class FakeMoviesDB(FakeDB):
+        def execute(self, cursor, sql, params):
+            if sql.startswith("SELECT id FROM movies"):
+                return [{'id': 1}]
+
+Statements reach the FakeDB with their whitespace collapsed to single spaces. Rows
+returned from execute() are what the cursor's fetchone()/fetchall() give back;
+handlers set cursor.rowcount, cursor.lastrowid or cursor.description as needed.
+"""
+
+class FakeDB:
+    def connect(self, **kwargs):
+        return FakeConn(self)
+
+    def execute(self, cursor, sql, params):
+        """Returns the result rows of `sql` (None for no rows)."""
+        return None
+
+    def executemany(self, cursor, sql, seq_params):
+        pass
+
+class FakeConn:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+        self.rowcount = 0
+        self.lastrowid = None
+        self.description = None
+
+    def execute(self, sql, params=None):
+        self.result = []
+        self.result = self.db.execute(self, " ".join(sql.split()), params) or []
+
+    def executemany(self, sql, seq_params):
+        self.db.executemany(self, " ".join(sql.split()), seq_params)
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
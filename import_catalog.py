@@ -0,0 +1,115 @@
+"""
+Loads movies into the catalog from the command line.
+
+    python import_catalog.py csv movies.csv
+    python import_catalog.py jsonl movies.jsonl --chunk-size 20000
+    python import_catalog.py tmdb tmdb_5000_movies.csv tmdb_5000_credits.csv --workers 4
+    python import_catalog.py csv movies.csv --dry-run
+
+Files are streamed in chunks, validated with the same rules as the admin bulk upload
+and upserted on the movies natural key (LOAD DATA LOCAL INFILE when available), so
+running an import twice is safe. Database credentials come from .streamlit/secrets.toml.
+Imports are recorded as uploaded by --uploaded-by, or by the first admin user.
+
+Rejected rows are reported by their line in the input file (for tmdb, the movies file).
+"""
+import argparse
+import os
+import queue
+import threading
+
+import pandas as pd
+
+from modules import database, tmdb_files
+
+SOURCES = {'csv': 1, 'jsonl': 1, 'tmdb': 2}  # source -> number of files
+FIRST_LINES = {'csv': 2, 'jsonl': 1, 'tmdb': 2}  # source -> line of the first data row
+
+def read_chunks(source, paths, chunk_size):
+    """Yields raw movie DataFrames (validate_movie_chunk input) from a csv, jsonl or tmdb source."""
+    if source == 'csv':
+        yield from pd.read_csv(paths[0], dtype=str, chunksize=chunk_size)
+    elif source == 'jsonl':
+        with pd.read_json(paths[0], lines=True, dtype=False, chunksize=chunk_size) as reader:
+            yield from reader
+    elif source == 'tmdb':
+        cast_by_id = tmdb_files.read_cast_lookup(paths[1])
+        for chunk in tmdb_files.iter_movies(paths[0], chunk_size):
+            yield tmdb_files.transform_movies(chunk, cast_by_id)
+    else:
+        raise ValueError(f"Unknown source: {source}")
+
+def prefetch(iterable, depth=2):
+    """Produces `iterable` on a worker thread, up to `depth` items ahead, so parsing overlaps with loading."""
+    items = queue.Queue(maxsize=depth)
+    end = object()
+
+    def produce():
+        try:
+            for item in iterable:
+                items.put((item, None))
+            items.put((end, None))
+        except Exception as e:
+            items.put((end, e))
+
+    threading.Thread(target=produce, name="import-reader", daemon=True).start()
+    while True:
+        item, error = items.get()
+        if error is not None:
+            raise error
+        if item is end:
+            return
+        yield item
+
+def print_progress(stats):
+    rate = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0
+    print(f"[IMPORT] {stats['rows']:,} rows, {stats['rejected']:,} rejected, {rate:,.0f} rows/s", flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import movies into the catalog.")
+    parser.add_argument("source", choices=sorted(SOURCES), help="input format")
+    parser.add_argument("paths", nargs="+", help="input file(s); tmdb takes the movies file, then the credits file")
+    parser.add_argument("--chunk-size", type=int, default=database.IMPORT_CHUNK_SIZE, help="rows per chunk/transaction")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes for decoding TMDB JSON columns")
+    parser.add_argument("--uploaded-by", type=int, help="user id recorded as the uploader (default: the first admin)")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    parser.add_argument("--no-load-data", action="store_true", help="use batched inserts instead of LOAD DATA LOCAL INFILE")
+    args = parser.parse_args(argv)
+    if len(args.paths) != SOURCES[args.source]:
+        parser.error(f"{args.source} takes {SOURCES[args.source]} file(s)")
+
+    tmdb_files.PARSE_POOL_WORKERS = max(1, args.workers)
+    if args.no_load_data:
+        database.LOAD_DATA_ENABLED = False
+
+    uploaded_by = args.uploaded_by
+    if not args.dry_run:
+        uploaded_by = database.get_import_uploader_id(args.uploaded_by)
+        if uploaded_by is None:
+            parser.error(f"user {args.uploaded_by} does not exist" if args.uploaded_by is not None
+                         else "there is no admin user to record as the uploader; pass --uploaded-by")
+
+    chunks = prefetch(read_chunks(args.source, args.paths, args.chunk_size))
+    success, stats = database.load_movie_chunks(chunks, uploaded_by, dry_run=args.dry_run, progress=print_progress,
+                                                first_line=FIRST_LINES[args.source])
+
+    rate = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0
+    for error in stats['errors']:
+        print(f"  {error}")
+    if stats['rejected'] > len(stats['errors']):
+        print(f"  ... and {stats['rejected'] - len(stats['errors'])} more")
+    if stats['dropped']:
+        print(f"[IMPORT] {stats['dropped']:,} rows were dropped before validation (tmdb: movies without credits).")
+    if not success:
+        print(f"[IMPORT] Failed after {stats['rows']:,} rows: {stats['error']}")
+        return 1
+    if args.dry_run:
+        print(f"[IMPORT] Dry run: {stats['valid']:,} valid, {stats['rejected']:,} rejected of {stats['rows']:,} rows "
+              f"in {stats['seconds']:.2f}s ({rate:,.0f} rows/s). Nothing was written.")
+    else:
+        print(f"[IMPORT] {stats['rows']:,} rows in {stats['seconds']:.2f}s ({rate:,.0f} rows/s): "
+              f"{database.format_upsert_counts(stats)}, {stats['rejected']:,} rejected.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,165 @@
+import atexit
+import queue
+import threading
+import time
+
+# Flush thresholds: a batch is written when it reaches BATCH_SIZE events or
+# FLUSH_INTERVAL_SECONDS after its first event, whichever comes first.
+BATCH_SIZE = 200
+FLUSH_INTERVAL_SECONDS = 2.0
+# Upper bound on buffered events; when full, the oldest events are dropped.
+MAX_QUEUE_SIZE = 10000
+# Write attempts per event before it is dropped.
+MAX_ATTEMPTS = 3
+
+_queue = queue.Queue(maxsize=MAX_QUEUE_SIZE)
+_writer = None
+_thread = None
+_start_lock = threading.Lock()
+# Reentrant: flush() holds it across its writes so the background thread cannot take
+# a batch between flush's drain and its return
+_write_lock = threading.RLock()
+# Events the background thread took off the queue for its next batch; kept here rather
+# than in a local so flush() writes them too when the process exits
+_in_flight = []
+_in_flight_lock = threading.Lock()
+_atexit_registered = False
+stats = {'enqueued': 0, 'written': 0, 'dropped': 0, 'failed_batches': 0}
+
+def start(writer):
+    """
+    Starts the background flush thread (once per process).
+    `writer` receives a list of events and must persist them, raising on failure.
+    """
+    global _writer, _thread, _atexit_registered
+    _writer = writer
+    if _thread is not None and _thread.is_alive():
+        return
+    with _start_lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _thread = threading.Thread(target=_run, name="activity-logger", daemon=True)
+        _thread.start()
+        if not _atexit_registered:
+            atexit.register(flush)
+            _atexit_registered = True
+
+def enqueue(event):
+    """Buffers an event without blocking. Returns False if an older event had to be dropped."""
+    stats['enqueued'] += 1
+    return _put((event, 0))
+
+def _put(item):
+    """Adds a queue item, evicting the oldest buffered item if the queue is full."""
+    try:
+        _queue.put_nowait(item)
+        return True
+    except queue.Full:
+        pass
+    try:
+        _queue.get_nowait()
+        stats['dropped'] += 1
+    except queue.Empty:
+        pass
+    try:
+        _queue.put_nowait(item)
+    except queue.Full:
+        stats['dropped'] += 1
+    return False
+
+def pending():
+    """Returns the number of events waiting to be written."""
+    return _queue.qsize() + len(_in_flight)
+
+def _hold(item):
+    with _in_flight_lock:
+        _in_flight.append(item)
+
+def _take_in_flight():
+    with _in_flight_lock:
+        batch = list(_in_flight)
+        _in_flight.clear()
+    return batch
+
+def _retry_later(items, attempted=True):
+    """Re-queues failed items, giving up on those that already used MAX_ATTEMPTS."""
+    for event, attempts in items:
+        attempts = attempts + 1 if attempted else attempts
+        if attempts >= MAX_ATTEMPTS:
+            stats['dropped'] += 1
+        else:
+            _put((event, attempts))
+
+def _write(items):
+    """
+    Writes one batch of queued items. Returns True if everything was written.
+    If the batch fails, events are retried one by one so a single bad event (e.g. for
+    a user deleted meanwhile) does not sink the rest. When the first few single writes
+    also fail the database is assumed to be unavailable and the batch is re-queued.
+    """
+    if not items or _writer is None:
+        return True
+    with _write_lock:
+        try:
+            _writer([event for event, _ in items])
+            stats['written'] += len(items)
+            return True
+        except Exception as e:
+            stats['failed_batches'] += 1
+            print(f"[ACTIVITY_LOG] Failed to write {len(items)} event(s): {e}")
+
+        if len(items) == 1:
+            _retry_later(items)
+            return False
+        failed = []
+        for i, item in enumerate(items):
+            if len(failed) >= 3 and len(failed) == i:
+                _retry_later(failed)
+                _retry_later(items[i:], attempted=False)
+                return False
+            try:
+                _writer([item[0]])
+                stats['written'] += 1
+            except Exception:
+                failed.append(item)
+        _retry_later(failed)
+        return not failed
+
+def _run():
+    """Background loop: collects events into batches and writes them."""
+    while True:
+        _hold(_queue.get())
+        deadline = time.time() + FLUSH_INTERVAL_SECONDS
+        while len(_in_flight) < BATCH_SIZE:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                _hold(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        with _write_lock:
+            written = _write(_take_in_flight())
+        if not written:
+            # Back off so failing writes do not spin against the database
+            time.sleep(FLUSH_INTERVAL_SECONDS)
+
+def flush():
+    """
+    Synchronously writes everything currently buffered, including the batch the
+    background thread is collecting (called on shutdown).
+    """
+    with _write_lock:
+        batch = _take_in_flight()
+        while True:
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            if not _write(batch):
+                # Failed events were re-queued; stop instead of retrying during shutdown
+                return
+            batch = []
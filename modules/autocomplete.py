@@ -0,0 +1,151 @@
+import bisect
+import heapq
+import re
+import threading
+import time
+import unicodedata
+
+# Number of completions kept for every "heavy" prefix. Suggestions are capped at this.
+TOP_K = 10
+# Prefix ranges at most this large are ranked on the fly; larger ones are precomputed.
+MAX_SCAN = 256
+# How often (seconds) the catalog fingerprint is re-checked for changes.
+REFRESH_CHECK_SECONDS = 60
+
+_ARTICLES = ('the ', 'a ', 'an ')
+_SENTINEL = '￿'
+
+# This global variable holds the current index; it is swapped atomically on rebuild
+_index = None
+_last_check = 0.0
+_build_lock = threading.Lock()
+
+def normalize(text):
+    """Lowercases a title, strips accents and punctuation, and collapses whitespace."""
+    if text is None:
+        return ''
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text).split())
+
+def build_index(rows, fingerprint=None):
+    """
+    Builds an autocomplete index from catalog rows.
+    Each row needs 'id', 'title', 'genre', 'release_year' and optionally 'popularity'.
+    Titles are indexed by their normalized form and, for titles starting with an
+    article ("The Matrix"), also without it so "matrix" matches.
+    """
+    titles, genres, years, ranks = [], [], [], []
+    pairs = []
+    for row in rows:
+        key = normalize(row.get('title'))
+        if not key:
+            continue
+        pos = len(titles)
+        year = row.get('release_year')
+        titles.append(row.get('title'))
+        genres.append(row.get('genre'))
+        years.append(year)
+        ranks.append((int(row.get('popularity') or 0), int(year or 0)))
+        pairs.append((key, pos))
+        for article in _ARTICLES:
+            if key.startswith(article) and len(key) > len(article):
+                pairs.append((key[len(article):], pos))
+                break
+
+    pairs.sort()
+    keys = [k for k, _ in pairs]
+    positions = [p for _, p in pairs]
+    rank_of = ranks.__getitem__
+
+    def top_in_range(lo, hi):
+        return heapq.nlargest(TOP_K, set(positions[lo:hi]), key=rank_of)
+
+    # Precompute ranked completions for every prefix whose range is too large to scan.
+    # Post-order: each heavy node merges its children's top lists, so every key is
+    # ranked exactly once inside the largest light range containing it.
+    heavy = {}
+
+    def collect(prefix, lo, hi):
+        if hi - lo <= MAX_SCAN:
+            return top_in_range(lo, hi)
+        depth = len(prefix)
+        candidates = set()
+        i = lo
+        while i < hi and len(keys[i]) == depth:
+            candidates.add(positions[i])
+            i += 1
+        while i < hi:
+            child = keys[i][:depth + 1]
+            j = bisect.bisect_left(keys, child + _SENTINEL, i, hi)
+            candidates.update(collect(child, i, j))
+            i = j
+        top = heapq.nlargest(TOP_K, candidates, key=rank_of)
+        heavy[prefix] = top
+        return top
+
+    if keys:
+        collect('', 0, len(keys))
+
+    return {
+        'keys': keys,
+        'positions': positions,
+        'titles': titles,
+        'genres': genres,
+        'years': years,
+        'ranks': ranks,
+        'heavy': heavy,
+        'fingerprint': fingerprint,
+        'built_at': time.time(),
+    }
+
+def suggest_from(index, query, limit=10):
+    """Returns up to `limit` ranked suggestions from `index` for titles starting with `query`."""
+    prefix = normalize(query)
+    if not prefix or index is None:
+        return []
+    limit = max(0, min(int(limit), TOP_K))
+
+    top = index['heavy'].get(prefix)
+    if top is None:
+        keys = index['keys']
+        lo = bisect.bisect_left(keys, prefix)
+        hi = bisect.bisect_left(keys, prefix + _SENTINEL, lo)
+        top = heapq.nlargest(TOP_K, set(index['positions'][lo:hi]), key=index['ranks'].__getitem__)
+
+    return [
+        {'title': index['titles'][pos], 'genre': index['genres'][pos], 'release_year': index['years'][pos]}
+        for pos in top[:limit]
+    ]
+
+def suggest(query, limit=10):
+    """Returns suggestions from the process-wide index, or None if it has not been built."""
+    index = _index
+    if index is None:
+        return None
+    return suggest_from(index, query, limit)
+
+def invalidate():
+    """Forces the next ensure_fresh() call to re-check the catalog fingerprint."""
+    global _last_check
+    _last_check = 0.0
+
+def ensure_fresh(fetch_fingerprint, fetch_rows):
+    """
+    Builds the process-wide index on first use and rebuilds it when the catalog
+    fingerprint changes. The fingerprint is checked at most every REFRESH_CHECK_SECONDS.
+    """
+    global _index, _last_check
+    now = time.time()
+    if _index is not None and now - _last_check < REFRESH_CHECK_SECONDS:
+        return _index
+
+    with _build_lock:
+        # Another thread may have refreshed the index while we waited for the lock
+        if _index is not None and time.time() - _last_check < REFRESH_CHECK_SECONDS:
+            return _index
+        fingerprint = fetch_fingerprint()
+        if _index is None or _index['fingerprint'] != fingerprint:
+            _index = build_index(fetch_rows(), fingerprint)
+        _last_check = time.time()
+    return _index
@@ -1,36 +1,58 @@
 import streamlit as st
 import hashlib
-import pandas as pd
 from datetime import datetime, timedelta
+import importlib.util
 import random
 import json
 import re
 import os
+import tempfile
+import threading
+import time
+from modules import activity_logger, autocomplete, instrumentation, metrics, query_cache, scheduler, tmdb
+
+# pandas (and modules.tmdb_files, which needs it) is imported inside the bulk import
+# functions, so pages that never import data do not pay for it at startup.
 
 # --- Robust MySQL import for error handling ---
-try:
-    import mysql.connector
-    MYSQL_AVAILABLE = True
-except ImportError:
-    mysql = None
-    MYSQL_AVAILABLE = False
-
-try:
-    import pymysql
-    PYMySQL_AVAILABLE = True
-except ImportError:
-    pymysql = None
-    PYMySQL_AVAILABLE = False
+# Availability is checked without importing; the drivers load on the first connection.
+MYSQL_AVAILABLE = importlib.util.find_spec("mysql") is not None and importlib.util.find_spec("mysql.connector") is not None
+PYMySQL_AVAILABLE = importlib.util.find_spec("pymysql") is not None
+mysql = None
+pymysql = None
+
+def _load_drivers():
+    global mysql, pymysql, MYSQL_AVAILABLE, PYMySQL_AVAILABLE
+    if MYSQL_AVAILABLE and mysql is None:
+        try:
+            import mysql.connector
+        except ImportError:
+            MYSQL_AVAILABLE = False
+    if PYMySQL_AVAILABLE and pymysql is None:
+        try:
+            import pymysql
+        except ImportError:
+            PYMySQL_AVAILABLE = False
 
 # --- Database Connection Config ---
-DB_CONFIG = {
-    'host': st.secrets["mysql"]["host"],
-    'database': st.secrets["mysql"]["database"],
-    'user': st.secrets["mysql"]["user"],
-    'password': st.secrets["mysql"]["password"]
-}
-
-def get_conn():
+# Read from st.secrets on first use rather than at import time
+DB_CONFIG = None
+
+def get_db_config():
+    global DB_CONFIG
+    if DB_CONFIG is None:
+        DB_CONFIG = {
+            'host': st.secrets["mysql"]["host"],
+            'database': st.secrets["mysql"]["database"],
+            'user': st.secrets["mysql"]["user"],
+            'password': st.secrets["mysql"]["password"]
+        }
+    return DB_CONFIG
+
+def get_conn(local_infile=False):
+    """Opens a connection; local_infile=True allows LOAD DATA LOCAL INFILE on it."""
+    _load_drivers()
+    config = get_db_config()
     print("DEBUG: MYSQL_AVAILABLE =", MYSQL_AVAILABLE)
     print("DEBUG: PYMySQL_AVAILABLE =", PYMySQL_AVAILABLE)
     print("DEBUG: mysql =", mysql)
@@ -40,10 +62,11 @@ def get_conn():
         try:
             print("Trying mysql.connector.connect...")
             conn = mysql.connector.connect(
-                host=DB_CONFIG['host'],
-                user=DB_CONFIG['user'],
-                password=DB_CONFIG['password'],
-                database=DB_CONFIG['database']
+                host=config['host'],
+                user=config['user'],
+                password=config['password'],
+                database=config['database'],
+                allow_local_infile=local_infile
             )
             print("✅ Connected using mysql.connector")
             return conn
@@ -54,11 +77,12 @@ def get_conn():
         try:
             print("Trying pymysql.connect...")
             conn = pymysql.connect(
-                host=DB_CONFIG['host'],
-                user=DB_CONFIG['user'],
-                password=DB_CONFIG['password'],
-                database=DB_CONFIG['database'],
-                charset='utf8mb4'
+                host=config['host'],
+                user=config['user'],
+                password=config['password'],
+                database=config['database'],
+                charset='utf8mb4',
+                local_infile=local_infile
             )
             print("✅ Connected using PyMySQL")
             return conn
@@ -76,9 +100,12 @@ def get_conn():
 def get_cursor(conn):
     # Try to get a dictionary cursor if possible
     try:
-        return conn.cursor(dictionary=True)
+        cursor = conn.cursor(dictionary=True)
     except Exception:
-        return conn.cursor()
+        cursor = conn.cursor()
+    if instrumentation.ENABLED:
+        return instrumentation.InstrumentedCursor(cursor, conn)
+    return cursor
 
 def diagnose_database():
     """Diagnostic function to check database schema and tables."""
@@ -178,7 +205,10 @@ CREATE_TABLES_SQL = [
 ]
 
 def auto_migrate_users_table():
-    """Automatically add missing columns to the users table if they do not exist."""
+    """
+    Automatically add missing columns to the users table if they do not exist.
+    Returns the errors (empty when the table is complete).
+    """
     required_columns = {
         'full_name': "VARCHAR(255) DEFAULT NULL",
         'date_joined': "DATETIME DEFAULT CURRENT_TIMESTAMP",
@@ -188,11 +218,13 @@ def auto_migrate_users_table():
         'favorite_genres': "VARCHAR(255) DEFAULT NULL",
         'is_admin': "BOOLEAN NOT NULL DEFAULT FALSE"
     }
+    errors = []
     conn = get_conn()
     cursor = get_cursor(conn)
     try:
         cursor.execute("SHOW COLUMNS FROM users")
-        existing_columns = set(row[0] for row in cursor.fetchall())
+        # Dictionary cursors return the column name under 'Field'
+        existing_columns = set(row['Field'] if isinstance(row, dict) else row[0] for row in cursor.fetchall())
         for col, col_def in required_columns.items():
             if col not in existing_columns:
                 try:
@@ -200,15 +232,38 @@ def auto_migrate_users_table():
                     print(f"[MIGRATION] Added missing column: {col}")
                 except Exception as e:
                     print(f"[MIGRATION] Error adding column {col}: {e}")
+                    errors.append(f"users.{col}: {e}")
         conn.commit()
     except Exception as e:
         print(f"[MIGRATION] Error checking/updating users table: {e}")
+        errors.append(f"users: {e}")
     finally:
         cursor.close()
         conn.close()
+    return errors
 
-def init_database():
-    auto_migrate_users_table()
+# The schema is verified once per process (by the first session or by modules/warmup);
+# later reruns and sessions skip the DDL round trips.
+_schema_verified = False
+_schema_lock = threading.Lock()
+
+def init_database(force=False):
+    """
+    Creates missing tables, columns and indexes, once per process unless force=True.
+    Returns the errors of this check (empty when the schema is complete or was already
+    verified); an incomplete schema is checked again on the next call.
+    """
+    global _schema_verified
+    with _schema_lock:
+        if _schema_verified and not force:
+            return []
+        errors = _create_schema()
+        _schema_verified = not errors
+        return errors
+
+def _create_schema():
+    """Returns the errors of the DDL statements (empty on success)."""
+    errors = []
     conn = get_conn()
     cursor = get_cursor(conn)
 
@@ -226,7 +281,7 @@ def init_database():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """,
-        """
+        f"""
         CREATE TABLE IF NOT EXISTS movies (
             id INT AUTO_INCREMENT PRIMARY KEY,
             title VARCHAR(255) NOT NULL,
@@ -240,7 +295,17 @@ def init_database():
             audio_languages VARCHAR(255),
             uploaded_by INT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (uploaded_by) REFERENCES users(id)
+            tmdb_id INT NULL,
+            keywords TEXT,
+            metadata_synced_at TIMESTAMP NULL,
+            updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+            natural_key VARCHAR(300) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin
+                AS ({NATURAL_KEY_EXPR}) STORED,
+            has_poster BOOLEAN AS ({HAS_POSTER_EXPR}) STORED NOT NULL,
+            FOREIGN KEY (uploaded_by) REFERENCES users(id),
+            UNIQUE KEY uq_movies_natural_key (natural_key),
+            KEY idx_movies_has_poster (has_poster, created_at),
+            KEY idx_movies_updated_at (updated_at)
         )
         """,
         """
@@ -297,6 +362,73 @@ def init_database():
             FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
             FOREIGN KEY (movie_id) REFERENCES movies(id) ON DELETE CASCADE
         )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS movie_genres (
+            movie_id INT NOT NULL,
+            genre VARCHAR(100) NOT NULL,
+            PRIMARY KEY (movie_id, genre),
+            KEY idx_movie_genres_genre (genre, movie_id),
+            FOREIGN KEY (movie_id) REFERENCES movies(id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS movie_languages (
+            movie_id INT NOT NULL,
+            language VARCHAR(100) NOT NULL,
+            PRIMARY KEY (movie_id, language),
+            KEY idx_movie_languages_language (language, movie_id),
+            FOREIGN KEY (movie_id) REFERENCES movies(id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS dashboard_rollup (
+            metric_date DATE NOT NULL,
+            metric VARCHAR(50) NOT NULL,
+            dimension VARCHAR(255) NOT NULL DEFAULT '',
+            value DOUBLE NOT NULL DEFAULT 0,
+            payload MEDIUMTEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (metric_date, metric, dimension)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS import_jobs (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            source_key CHAR(40) NOT NULL,
+            source_name VARCHAR(255),
+            uploaded_by INT,
+            status ENUM('running', 'failed', 'completed') NOT NULL DEFAULT 'running',
+            rows_committed BIGINT NOT NULL DEFAULT 0,
+            rows_inserted BIGINT NOT NULL DEFAULT 0,
+            rows_rejected BIGINT NOT NULL DEFAULT 0,
+            rows_updated BIGINT NOT NULL DEFAULT 0,
+            rows_skipped BIGINT NOT NULL DEFAULT 0,
+            last_error TEXT,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            KEY idx_import_jobs_source (source_key, status)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS trending_movies (
+            rank_position INT NOT NULL PRIMARY KEY,
+            movie_id INT NOT NULL,
+            score DOUBLE NOT NULL DEFAULT 0,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (movie_id) REFERENCES movies(id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS poster_backfill (
+            movie_id INT NOT NULL PRIMARY KEY,
+            status ENUM('resolved', 'not_found', 'failed') NOT NULL,
+            attempts INT NOT NULL DEFAULT 1,
+            last_error VARCHAR(255),
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            KEY idx_poster_backfill_status (status, updated_at),
+            FOREIGN KEY (movie_id) REFERENCES movies(id) ON DELETE CASCADE
+        )
         """
     ]
 
@@ -306,11 +438,257 @@ def init_database():
             cursor.execute(command)
         except Exception as err:
             st.error(f"Error creating table: {err}")
+            errors.append(f"create table: {err}")
 
+    # After the CREATE TABLEs, so a fresh database gets the users columns on the first
+    # (and, with the once-per-process check, only) run; idx_users_date_joined needs them
+    errors += auto_migrate_users_table()
+    errors += ensure_columns(cursor)
+    errors += ensure_indexes(cursor)
     conn.commit()
     cursor.close()
     conn.close()
-    st.success("Database tables checked and created successfully!")
+    migrate_movie_natural_key()
+    migrate_movie_tag_tables()
+    if not errors:
+        st.success("Database tables checked and created successfully!")
+    return errors
+
+# Natural key of a movie: normalized title + release year + type. Stored as a generated
+# column with a binary collation so the unique index matches movie_natural_key() exactly.
+NATURAL_KEY_EXPR = "CONCAT(LOWER(TRIM(title)), '|', COALESCE(release_year, ''), '|', COALESCE(type, ''))"
+# Whether a movie has a poster the app can display (an absolute URL that is not one of
+# the old placeholder images). Generated, so every insert and update keeps it current
+# and adding the column computes it for existing rows.
+HAS_POSTER_EXPR = "COALESCE(TRIM(poster_url) LIKE 'http%' AND poster_url NOT LIKE '%/placeholder\\_%', FALSE)"
+
+# Columns added after the first release of a table: (table, column, definition)
+REQUIRED_COLUMNS = [
+    ("movies", "natural_key", f"VARCHAR(300) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin AS ({NATURAL_KEY_EXPR}) STORED"),
+    ("import_jobs", "rows_updated", "BIGINT NOT NULL DEFAULT 0"),
+    ("import_jobs", "rows_skipped", "BIGINT NOT NULL DEFAULT 0"),
+    ("movies", "tmdb_id", "INT NULL"),
+    ("movies", "keywords", "TEXT"),
+    ("movies", "metadata_synced_at", "TIMESTAMP NULL"),
+    ("movies", "has_poster", f"BOOLEAN AS ({HAS_POSTER_EXPR}) STORED NOT NULL"),
+    ("movies", "updated_at", "TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)"),
+]
+
+# Secondary indexes needed by time-windowed queries: (index name, table, columns)
+REQUIRED_INDEXES = [
+    ("idx_activity_log_created_at", "activity_log", "created_at"),
+    ("idx_users_date_joined", "users", "date_joined"),
+    ("idx_movies_created_at", "movies", "created_at"),
+    ("idx_watch_sessions_started_at", "watch_sessions", "started_at, movie_id"),
+    ("idx_history_watched_at", "history", "watched_at, movie_id"),
+    ("idx_watchlist_added_on", "watchlist", "added_on, movie_id"),
+    ("idx_ratings_created_at", "ratings", "created_at, movie_id"),
+    ("idx_movies_has_poster", "movies", "has_poster, created_at"),
+    ("idx_movies_updated_at", "movies", "updated_at"),
+]
+
+def ensure_indexes(cursor):
+    """Creates any missing index from REQUIRED_INDEXES. Does not commit. Returns the errors."""
+    cursor.execute("""
+        SELECT DISTINCT table_name AS table_name, index_name AS index_name
+        FROM information_schema.statistics
+        WHERE table_schema = DATABASE()
+    """)
+    existing = {(row['table_name'], row['index_name']) for row in cursor.fetchall()}
+    errors = []
+    for index_name, table_name, columns in REQUIRED_INDEXES:
+        if (table_name, index_name) in existing:
+            continue
+        try:
+            cursor.execute(f"CREATE INDEX {index_name} ON {table_name}({columns})")
+            print(f"[MIGRATION] Created index {index_name}")
+        except Exception as e:
+            print(f"[MIGRATION] Error creating index {index_name}: {e}")
+            errors.append(f"index {index_name}: {e}")
+    return errors
+
+def ensure_columns(cursor):
+    """Adds any missing column from REQUIRED_COLUMNS. Does not commit. Returns the errors."""
+    cursor.execute("""
+        SELECT table_name AS table_name, column_name AS column_name
+        FROM information_schema.columns
+        WHERE table_schema = DATABASE()
+    """)
+    existing = {(row['table_name'], row['column_name']) for row in cursor.fetchall()}
+    errors = []
+    for table_name, column, definition in REQUIRED_COLUMNS:
+        if (table_name, column) in existing:
+            continue
+        try:
+            cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} {definition}")
+            print(f"[MIGRATION] Added column {table_name}.{column}")
+        except Exception as e:
+            print(f"[MIGRATION] Error adding column {table_name}.{column}: {e}")
+            errors.append(f"{table_name}.{column}: {e}")
+    return errors
+
+def migrate_movie_natural_key():
+    """
+    Merges duplicate movies (same natural key) into the oldest row and adds the
+    uq_movies_natural_key unique index. References in every table with a movie_id
+    column are repointed to the kept row; rows that would then collide with an
+    existing reference (e.g. the same user's rating of both copies) are dropped.
+    Runs once: does nothing when the unique index already exists.
+    """
+    conn = get_conn()
+    cursor = get_cursor(conn)
+    merged = 0
+    try:
+        cursor.execute("""
+            SELECT COUNT(*) AS n FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = 'movies' AND index_name = 'uq_movies_natural_key'
+        """)
+        if cursor.fetchone()['n']:
+            return 0
+        cursor.execute("SELECT GET_LOCK('movies_natural_key', 0) AS acquired")
+        lock = cursor.fetchone()
+        if not lock or not lock['acquired']:
+            print("[MIGRATION] Another process is deduplicating movies; skipping.")
+            return 0
+
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS movie_duplicates")
+        cursor.execute("""
+            CREATE TEMPORARY TABLE movie_duplicates (duplicate_id INT PRIMARY KEY, keep_id INT NOT NULL)
+            SELECT m.id AS duplicate_id, k.keep_id
+            FROM movies m
+            JOIN (SELECT natural_key, MIN(id) AS keep_id FROM movies GROUP BY natural_key HAVING COUNT(*) > 1) k
+              ON k.natural_key = m.natural_key
+            WHERE m.id <> k.keep_id
+        """)
+        merged = cursor.rowcount
+        if merged > 0:
+            cursor.execute("""
+                SELECT DISTINCT table_name AS table_name FROM information_schema.columns
+                WHERE table_schema = DATABASE() AND column_name = 'movie_id'
+            """)
+            for row in cursor.fetchall():
+                table = row['table_name']
+                cursor.execute(f"UPDATE IGNORE {table} t JOIN movie_duplicates d ON t.movie_id = d.duplicate_id SET t.movie_id = d.keep_id")
+                cursor.execute(f"DELETE t FROM {table} t JOIN movie_duplicates d ON t.movie_id = d.duplicate_id")
+            cursor.execute("DELETE m FROM movies m JOIN movie_duplicates d ON m.id = d.duplicate_id")
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS movie_duplicates")
+        conn.commit()
+        cursor.execute("CREATE UNIQUE INDEX uq_movies_natural_key ON movies(natural_key)")
+        print(f"[MIGRATION] Merged {max(merged, 0)} duplicate movie(s) and added uq_movies_natural_key")
+    except Exception as e:
+        conn.rollback()
+        print(f"[MIGRATION] Error deduplicating movies: {e}")
+        return 0
+    finally:
+        try:
+            cursor.execute("DO RELEASE_LOCK('movies_natural_key')")
+        except Exception:
+            pass
+        cursor.close()
+        conn.close()
+    if merged > 0:
+        invalidate_catalog_caches('catalog', 'ratings', 'trending', 'model')
+    return max(merged, 0)
+
+# --- GENRE & LANGUAGE TAGS ---
+
+TAG_BATCH_SIZE = 5000
+
+def split_tags(value):
+    """Splits a comma-separated genre/language string into unique, trimmed values."""
+    if value is None:
+        return []
+    tags = []
+    for tag in str(value).split(','):
+        tag = tag.strip()[:100]
+        if tag and tag.lower() != 'nan' and tag not in tags:
+            tags.append(tag)
+    return tags
+
+def _sync_movie_tags(cursor, movies):
+    """
+    Rewrites the movie_genres/movie_languages rows for the given movies.
+    `movies` is a list of (movie_id, genre, audio_languages) tuples. Does not commit.
+    """
+    for start in range(0, len(movies), TAG_BATCH_SIZE):
+        batch = movies[start:start + TAG_BATCH_SIZE]
+        ids = [m[0] for m in batch]
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"DELETE FROM movie_genres WHERE movie_id IN ({placeholders})", ids)
+        cursor.execute(f"DELETE FROM movie_languages WHERE movie_id IN ({placeholders})", ids)
+
+        genre_rows = [(movie_id, g) for movie_id, genre, _ in batch for g in split_tags(genre)]
+        language_rows = [(movie_id, lang) for movie_id, _, languages in batch for lang in split_tags(languages)]
+        if genre_rows:
+            cursor.executemany("INSERT IGNORE INTO movie_genres (movie_id, genre) VALUES (%s, %s)", genre_rows)
+        if language_rows:
+            cursor.executemany("INSERT IGNORE INTO movie_languages (movie_id, language) VALUES (%s, %s)", language_rows)
+
+def _sync_movie_tags_for_keys(cursor, natural_keys):
+    """
+    Re-syncs tags for the movies with the given natural keys (used after bulk upserts).
+    Looked up through the uq_movies_natural_key index, so only the upserted movies are read.
+    """
+    natural_keys = list(dict.fromkeys(natural_keys))
+    for start in range(0, len(natural_keys), TAG_BATCH_SIZE):
+        batch = natural_keys[start:start + TAG_BATCH_SIZE]
+        placeholders = ", ".join(["%s"] * len(batch))
+        cursor.execute(f"SELECT id, genre, audio_languages FROM movies WHERE natural_key IN ({placeholders})", batch)
+        rows = cursor.fetchall()
+        _sync_movie_tags(cursor, [(r['id'], r['genre'], r['audio_languages']) for r in rows])
+
+# Movies with genres or languages but no tag rows yet
+UNTAGGED_MOVIES_FILTER = """
+    AND NOT EXISTS (SELECT 1 FROM movie_genres mg WHERE mg.movie_id = m.id)
+    AND NOT EXISTS (SELECT 1 FROM movie_languages ml WHERE ml.movie_id = m.id)
+    AND (COALESCE(m.genre, '') <> '' OR COALESCE(m.audio_languages, '') <> '')
+"""
+
+def backfill_movie_tags(only_untagged=False):
+    """
+    Populates movie_genres/movie_languages from the comma-separated movie columns, in id
+    batches committed one at a time. only_untagged=True skips movies that already have
+    tag rows, so an interrupted backfill resumes where it stopped.
+    """
+    conn = get_conn()
+    cursor = get_cursor(conn)
+    synced = 0
+    last_id = 0
+    try:
+        while True:
+            cursor.execute(
+                f"""
+                SELECT m.id, m.genre, m.audio_languages FROM movies m
+                WHERE m.id > %s {UNTAGGED_MOVIES_FILTER if only_untagged else ''}
+                ORDER BY m.id LIMIT %s
+                """,
+                (last_id, TAG_BATCH_SIZE)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            _sync_movie_tags(cursor, [(r['id'], r['genre'], r['audio_languages']) for r in rows])
+            conn.commit()
+            synced += len(rows)
+            last_id = rows[-1]['id']
+        if synced or not only_untagged:
+            invalidate_catalog_caches()
+            print(f"[MIGRATION] Synced genre/language tags for {synced} movies")
+        return synced
+    except Exception as e:
+        conn.rollback()
+        print(f"[MIGRATION] Error backfilling genre/language tags: {e}")
+        return synced
+    finally:
+        cursor.close()
+        conn.close()
+
+def migrate_movie_tag_tables():
+    """
+    Backfills tag rows for every movie that has genres or languages but no tag rows,
+    which covers both a fresh migration and one interrupted part way through.
+    """
+    return backfill_movie_tags(only_untagged=True)
 
 # --- User Management Functions ---
 def add_user(username, email, password_hash, phone=None, is_admin=False):
@@ -476,25 +854,30 @@ def create_tables():
 
 # --- ACTIVITY LOGGING ---
 
-def log_activity(user_id, action, details=""):
-    """Logs user activity to the activity_log table."""
+def _write_activity_batch(events):
+    """Writes a batch of (user_id, action, details, created_at) events in one multi-row INSERT."""
     conn = get_conn()
     cursor = get_cursor(conn)
-    
     try:
-        cursor.execute(
-            "INSERT INTO activity_log (user_id, action, details) VALUES (%s, %s, %s)",
-            (user_id, action, details)
+        cursor.executemany(
+            "INSERT INTO activity_log (user_id, action, details, created_at) VALUES (%s, %s, %s, %s)",
+            events
         )
         conn.commit()
-        return True
-    except Exception as e:
-        st.error(f"Error logging activity: {e}")
-        return False
     finally:
         cursor.close()
         conn.close()
 
+def log_activity(user_id, action, details=""):
+    """
+    Logs user activity to the activity_log table.
+    The event is buffered in-process and written in batches by a background
+    thread, so callers never wait on the audit write.
+    """
+    activity_logger.start(_write_activity_batch)
+    activity_logger.enqueue((user_id, action, details, datetime.now()))
+    return True
+
 def get_user_activity(user_id, limit=5):
     """Retrieves recent activity for a user."""
     conn = get_conn()
@@ -517,92 +900,245 @@ def get_user_activity(user_id, limit=5):
         conn.close()
 
 # --- DASHBOARD METRICS ---
+# The admin dashboard is served from dashboard_rollup, a small table of daily
+# aggregates refreshed by a periodic job, so renders never scan the raw tables.
 
-def get_dashboard_metrics():
-    """Fetches various metrics for the admin dashboard."""
+DASHBOARD_ROLLUP_INTERVAL_SECONDS = 600
+DASHBOARD_ROLLUP_DAYS = 8  # Days of daily aggregates recomputed on every run
+DASHBOARD_WINDOW_DAYS = 7
+# When this process last refreshed from a dashboard view (see get_dashboard_snapshot)
+_rollup_refresh_attempted_at = 0.0
+
+def refresh_dashboard_rollup():
+    """
+    Recomputes the dashboard aggregates and writes them to dashboard_rollup.
+    Only the last DASHBOARD_ROLLUP_DAYS of time-series data are rescanned (via the
+    created_at/date_joined indexes). A MySQL named lock keeps concurrent app processes
+    from running the job at the same time. Returns True if the rollup was written.
+    """
     conn = get_conn()
     cursor = get_cursor(conn)
-    metrics = {
-        'total_users': 0,
-        'total_movies': 0,
-        'total_watchlist': 0,
-        'total_watched': 0,
-        'movies_by_genre': [],
-        'recent_uploads': [],
-        'recent_activity': 0,
-        'avg_watch_time': 0
-    }
-
     try:
-        # Total users
-        cursor.execute("SELECT COUNT(*) as total_users FROM users")
-        result = cursor.fetchone()
-        if result: metrics['total_users'] = result['total_users']
+        cursor.execute("SELECT GET_LOCK('dashboard_rollup', 0) AS acquired")
+        lock = cursor.fetchone()
+        if not lock or not lock['acquired']:
+            print("[ROLLUP] Another process is refreshing the dashboard rollup; skipping.")
+            return False
 
-        # Total movies
-        cursor.execute("SELECT COUNT(*) as total_movies FROM movies")
-        result = cursor.fetchone()
-        if result: metrics['total_movies'] = result['total_movies']
+        cursor.execute("SELECT CURDATE() AS today, CURDATE() - INTERVAL %s DAY AS since", (DASHBOARD_ROLLUP_DAYS - 1,))
+        dates = cursor.fetchone()
+        today, since = dates['today'], dates['since']
+        rows = []
 
-        # Total watchlist items
-        cursor.execute("SELECT COUNT(*) as total_watchlist FROM watchlist")
-        result = cursor.fetchone()
-        if result: metrics['total_watchlist'] = result['total_watchlist']
+        # Point-in-time totals, stored against today's date
+        cursor.execute("""
+            SELECT (SELECT COUNT(*) FROM users) AS total_users,
+                   (SELECT COUNT(*) FROM movies) AS total_movies,
+                   (SELECT COUNT(*) FROM watchlist) AS total_watchlist,
+                   (SELECT COUNT(*) FROM history) AS total_watched,
+                   (SELECT AVG(duration_minutes) FROM watch_sessions WHERE duration_minutes > 0) AS avg_watch_time
+        """)
+        totals = cursor.fetchone() or {}
+        for metric, value in totals.items():
+            rows.append((today, metric, '', float(value or 0), None))
+
+        cursor.execute("SELECT genre, COUNT(*) AS count FROM movie_genres GROUP BY genre")
+        for row in cursor.fetchall():
+            rows.append((today, 'genre', row['genre'], row['count'], None))
 
-        # Total watched movies (history)
-        cursor.execute("SELECT COUNT(*) as total_watched FROM history")
-        result = cursor.fetchone()
-        if result: metrics['total_watched'] = result['total_watched']
+        # Daily time series for the rollup window
+        cursor.execute("""
+            SELECT DATE(date_joined) AS day, COUNT(*) AS count FROM users
+            WHERE date_joined >= %s GROUP BY DATE(date_joined)
+        """, (since,))
+        rows.extend((row['day'], 'signups', '', row['count'], None) for row in cursor.fetchall())
 
-        # Movies by genre
-        cursor.execute("SELECT genre, COUNT(*) as count FROM movies WHERE genre IS NOT NULL AND genre != '' GROUP BY genre ORDER BY count DESC")
-        result = cursor.fetchall()
-        if result: metrics['movies_by_genre'] = result
+        cursor.execute("""
+            SELECT DATE(created_at) AS day, COUNT(*) AS count FROM movies
+            WHERE created_at >= %s GROUP BY DATE(created_at)
+        """, (since,))
+        rows.extend((row['day'], 'uploads', '', row['count'], None) for row in cursor.fetchall())
 
-        # Recent uploads
-        cursor.execute("SELECT title, created_at FROM movies ORDER BY created_at DESC LIMIT 5")
-        result = cursor.fetchall()
-        if result: metrics['recent_uploads'] = result
-        
-        # Recent activity count (log entries in the last 7 days)
-        cursor.execute("SELECT COUNT(*) as activity_count FROM activity_log WHERE created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)")
-        result = cursor.fetchone()
-        if result: metrics['recent_activity'] = result['activity_count']
+        cursor.execute("""
+            SELECT DATE(a.created_at) AS day, u.username, COUNT(*) AS count
+            FROM activity_log a
+            JOIN users u ON u.id = a.user_id
+            WHERE a.created_at >= %s
+            GROUP BY DATE(a.created_at), u.id, u.username
+        """, (since,))
+        daily_activity = {}
+        for row in cursor.fetchall():
+            rows.append((row['day'], 'user_actions', row['username'], row['count'], None))
+            daily_activity[row['day']] = daily_activity.get(row['day'], 0) + row['count']
+        rows.extend((day, 'activity', '', count, None) for day, count in daily_activity.items())
 
-        # Average watch time per user
-        cursor.execute("SELECT AVG(duration_minutes) as avg_watch FROM watch_sessions WHERE duration_minutes > 0")
-        result = cursor.fetchone()
-        if result and result.get('avg_watch') is not None:
-            metrics['avg_watch_time'] = round(result['avg_watch'], 2)
+        # Small "latest N" tables, stored as JSON payloads
+        cursor.execute("SELECT username, email, date_joined FROM users ORDER BY date_joined DESC LIMIT 10")
+        rows.append((today, 'recent_signups', '', 0, json.dumps(cursor.fetchall(), default=str)))
+
+        cursor.execute("SELECT title, created_at FROM movies ORDER BY created_at DESC LIMIT 5")
+        rows.append((today, 'recent_uploads', '', 0, json.dumps(cursor.fetchall(), default=str)))
 
+        cursor.execute("""
+            SELECT u.username, a.action, a.details, a.created_at
+            FROM activity_log a
+            JOIN users u ON u.id = a.user_id
+            WHERE u.role = 'admin' AND a.created_at >= %s
+            ORDER BY a.created_at DESC
+            LIMIT 20
+        """, (since,))
+        rows.append((today, 'admin_activity', '', 0, json.dumps(cursor.fetchall(), default=str)))
+
+        cursor.execute("DELETE FROM dashboard_rollup WHERE metric_date >= %s", (since,))
+        cursor.executemany(
+            "INSERT INTO dashboard_rollup (metric_date, metric, dimension, value, payload) VALUES (%s, %s, %s, %s, %s)",
+            rows
+        )
+        conn.commit()
+        print(f"[ROLLUP] Dashboard rollup refreshed ({len(rows)} rows).")
+        return True
     except Exception as e:
-        print(f"Error fetching dashboard metrics: {e}")
+        conn.rollback()
+        print(f"[ROLLUP] Error refreshing dashboard rollup: {e}")
+        return False
+    finally:
+        try:
+            cursor.execute("DO RELEASE_LOCK('dashboard_rollup')")
+        except Exception:
+            pass
+        cursor.close()
+        conn.close()
+
+def start_dashboard_rollup_job():
+    """Starts the periodic rollup job in this process (no-op if already running)."""
+    return scheduler.start_periodic(
+        'dashboard_rollup', DASHBOARD_ROLLUP_INTERVAL_SECONDS, refresh_dashboard_rollup, run_immediately=False
+    )
+
+def _read_dashboard_rollup():
+    """Reads every rollup row the dashboard needs in a single query."""
+    conn = get_conn()
+    cursor = get_cursor(conn)
+    try:
+        cursor.execute("""
+            SELECT metric_date, metric, dimension, value, payload, updated_at,
+                   CURDATE() AS today, TIMESTAMPDIFF(SECOND, updated_at, NOW()) AS age_seconds
+            FROM dashboard_rollup
+            WHERE metric_date >= CURDATE() - INTERVAL %s DAY
+        """, (DASHBOARD_ROLLUP_DAYS - 1,))
+        return cursor.fetchall()
     finally:
         cursor.close()
         conn.close()
 
+def _shape_dashboard_metrics(rows):
+    """Turns rollup rows into the metrics dict consumed by the dashboards."""
+    metrics = {
+        'total_users': 0,
+        'total_movies': 0,
+        'total_watchlist': 0,
+        'total_watched': 0,
+        'avg_watch_time': 0,
+        'movies_uploaded_today': 0,
+        'user_growth_pct': 0,
+        'recent_activity': 0,
+        'weekly_signups': [],
+        'genre_distribution': [],
+        'movies_by_genre': [],
+        'most_active_users': [],
+        'recent_signups': [],
+        'recent_uploads': [],
+        'admin_activity': [],
+        'rollup_updated_at': None,
+    }
+    if not rows:
+        return metrics
+
+    today = rows[0]['today']
+    window_start = today - timedelta(days=DASHBOARD_WINDOW_DAYS - 1)
+    # Point-in-time metrics come from the most recent run
+    run_dates = [row['metric_date'] for row in rows if row['metric'] == 'total_users']
+    latest_date = max(run_dates) if run_dates else today
+    signups = {}
+    actions_by_user = {}
+    genres = []
+
+    for row in rows:
+        metric, day, value = row['metric'], row['metric_date'], row['value']
+        if metric in ('total_users', 'total_movies', 'total_watchlist', 'total_watched') and day == latest_date:
+            metrics[metric] = int(value)
+        elif metric == 'avg_watch_time' and day == latest_date:
+            metrics['avg_watch_time'] = round(value, 2)
+        elif metric == 'genre' and day == latest_date:
+            genres.append({'genre': row['dimension'], 'count': int(value)})
+        elif metric in ('recent_signups', 'recent_uploads', 'admin_activity') and day == latest_date:
+            metrics[metric] = json.loads(row['payload'] or '[]')
+        elif day < window_start:
+            continue
+        elif metric == 'signups':
+            signups[day] = int(value)
+        elif metric == 'uploads' and day == today:
+            metrics['movies_uploaded_today'] = int(value)
+        elif metric == 'activity':
+            metrics['recent_activity'] += int(value)
+        elif metric == 'user_actions':
+            actions_by_user[row['dimension']] = actions_by_user.get(row['dimension'], 0) + int(value)
+
+    metrics['weekly_signups'] = [
+        {'signup_date': day, 'count': signups.get(day, 0)}
+        for day in (window_start + timedelta(days=i) for i in range(DASHBOARD_WINDOW_DAYS))
+    ]
+    new_users = sum(signups.values())
+    previous_users = metrics['total_users'] - new_users
+    if previous_users > 0:
+        metrics['user_growth_pct'] = round(new_users * 100.0 / previous_users, 1)
+    metrics['genre_distribution'] = sorted(genres, key=lambda g: g['count'], reverse=True)
+    metrics['movies_by_genre'] = metrics['genre_distribution']
+    metrics['most_active_users'] = [
+        {'username': username, 'action_count': count}
+        for username, count in sorted(actions_by_user.items(), key=lambda item: item[1], reverse=True)[:10]
+    ]
+    metrics['rollup_updated_at'] = max(row['updated_at'] for row in rows)
     return metrics
 
+def get_dashboard_snapshot():
+    """
+    Returns every admin dashboard metric from the rollup table in one query.
+    Starts the periodic rollup job, and refreshes synchronously if the rollup is
+    missing or more than two intervals old. Like get_trending_movies, each process
+    tries that at most once per interval, so a rollup that keeps failing (or a lost
+    lock race) does not rescan the raw tables on every Platform Stats view.
+    """
+    global _rollup_refresh_attempted_at
+    start_dashboard_rollup_job()
+    rows = _read_dashboard_rollup()
+    run_ages = [row['age_seconds'] for row in rows if row['metric'] == 'total_users']
+    is_stale = not run_ages or min(run_ages) > 2 * DASHBOARD_ROLLUP_INTERVAL_SECONDS
+    now = time.time()
+    if is_stale and now - _rollup_refresh_attempted_at >= DASHBOARD_ROLLUP_INTERVAL_SECONDS:
+        _rollup_refresh_attempted_at = now
+        if refresh_dashboard_rollup():
+            rows = _read_dashboard_rollup()
+    return _shape_dashboard_metrics(rows)
+
+def get_dashboard_metrics():
+    """Fetches various metrics for the admin dashboard."""
+    try:
+        snapshot = get_dashboard_snapshot()
+    except Exception as e:
+        print(f"Error fetching dashboard metrics: {e}")
+        snapshot = _shape_dashboard_metrics([])
+
+    keys = ['total_users', 'total_movies', 'total_watchlist', 'total_watched',
+            'movies_by_genre', 'recent_uploads', 'recent_activity', 'avg_watch_time']
+    return {key: snapshot[key] for key in keys}
+
 # --- NEW ADVANCED DASHBOARD ---
 def get_advanced_dashboard_metrics():
     """Fetches a comprehensive set of metrics for the advanced admin dashboard."""
     try:
-        conn = get_conn()
-        cursor = get_cursor(conn)
-        metrics = {}
-        # Example: total users
-        cursor.execute("SELECT COUNT(*) as total_users FROM users")
-        row = cursor.fetchone()
-        if row and isinstance(row, dict):
-            metrics['total_users'] = row.get('total_users', 0)
-        else:
-            metrics['total_users'] = 0
-        # Add more metrics as needed...
-        cursor.close()
-        conn.close()
-        return metrics
+        return get_dashboard_snapshot()
     except Exception as e:
-        import streamlit as st
         st.error(f"Dashboard metrics error: {e}")
         print(f"[Dashboard Metrics Error] {e}")
         return {}
@@ -640,8 +1176,49 @@ def reset_user_password_by_admin(user_id, new_password):
 
 # --- SEARCH AUTOCOMPLETE ---
 
+def get_catalog_fingerprint():
+    """Returns a cheap fingerprint of the movies table used to detect catalog changes."""
+    conn = get_conn()
+    cursor = get_cursor(conn)
+    try:
+        cursor.execute("SELECT COUNT(*) AS total, MAX(id) AS max_id, MAX(created_at) AS last_added FROM movies")
+        row = cursor.fetchone()
+        return (row['total'], row['max_id'], str(row['last_added'])) if row else None
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_autocomplete_rows():
+    """Returns every title with its watch count, used to build the autocomplete index."""
+    conn = get_conn()
+    cursor = get_cursor(conn)
+    try:
+        cursor.execute("""
+            SELECT m.id, m.title, m.genre, m.release_year, COUNT(h.movie_id) AS popularity
+            FROM movies m
+            LEFT JOIN history h ON h.movie_id = m.id
+            GROUP BY m.id
+        """)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
 def get_movie_suggestions(query, limit=10):
-    """Gets movie title suggestions for autocomplete."""
+    """
+    Gets movie title suggestions for autocomplete.
+    Served from the in-memory autocomplete index; falls back to SQL if it cannot be built.
+    """
+    try:
+        autocomplete.ensure_fresh(get_catalog_fingerprint, get_autocomplete_rows)
+        suggestions = autocomplete.suggest(query, limit)
+        if suggestions is not None:
+            metrics.cache_requests.inc(cache='autocomplete', result='hit')
+            return suggestions
+    except Exception as e:
+        print(f"[AUTOCOMPLETE] Index unavailable, falling back to SQL: {e}")
+
+    metrics.cache_requests.inc(cache='autocomplete', result='miss')
     conn = get_conn()
     cursor = get_cursor(conn)
     
@@ -663,90 +1240,275 @@ def get_movie_suggestions(query, limit=10):
 
 # --- BULK UPLOAD ---
 
-def bulk_upload_movies(csv_data, uploaded_by):
+# --- BULK IMPORT ---
+
+IMPORT_CHUNK_SIZE = 5000  # Source rows per chunk; each chunk is one transaction
+INSERT_BATCH_SIZE = 1000  # Rows per executemany call
+MAX_REPORTED_ERRORS = 100
+MOVIE_IMPORT_COLUMNS = ['title', 'type', 'genre', 'release_year', 'description', 'cast', 'poster_url', 'trailer_url', 'audio_languages']
+# Columns an import may change on an existing movie (the ON DUPLICATE KEY UPDATE list)
+MOVIE_UPDATE_COLUMNS = ['genre', 'description', 'cast', 'poster_url', 'trailer_url', 'audio_languages']
+
+UPSERT_MOVIE_SQL = """
+    INSERT INTO movies (title, type, genre, release_year, description, cast, poster_url, trailer_url, audio_languages, uploaded_by)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        genre=VALUES(genre), description=VALUES(description), cast=VALUES(cast),
+        poster_url=VALUES(poster_url), trailer_url=VALUES(trailer_url),
+        audio_languages=VALUES(audio_languages)
+"""
+
+def validate_movie_chunk(chunk, first_row_number=2, line_numbers=None):
     """
-    Bulk upload movies from a pandas DataFrame.
-    This function is more robust, validates data, and uses executemany for efficiency.
+    Validates and cleans a DataFrame of movie rows with vectorized pandas operations.
+    Returns (rows, errors): `rows` is a DataFrame with MOVIE_IMPORT_COLUMNS for the valid
+    rows, `errors` a list of messages using CSV line numbers (header is line 1). Rows are
+    numbered from `first_row_number`, or by `line_numbers` (one per row) when given.
+    Raises ValueError if the 'title' column is missing.
     """
-    conn = get_conn()
-    cursor = get_cursor(conn)
-    
-    # List to hold movie data tuples for insertion
-    movies_to_insert = []
-    # List to hold detailed error messages
-    errors = []
-    success_count = 0
-
-    required_columns = ['title', 'type', 'genre', 'release_year', 'description', 'cast', 'poster_url', 'trailer_url']
-    
-    # Normalize column names (e.g., "Title " -> "title")
-    csv_data.columns = csv_data.columns.str.strip().str.lower()
-
-    for index, row in csv_data.iterrows():
+    import pandas as pd
+    chunk = chunk.rename(columns=lambda c: str(c).strip().lower())
+    if 'title' not in chunk.columns:
+        raise ValueError("Missing required column: 'title'. Please check the CSV file.")
+    if line_numbers is None:
+        line_numbers = range(first_row_number, first_row_number + len(chunk))
+    line_numbers = pd.Series(list(line_numbers), index=chunk.index, dtype=object)
+
+    def text(column):
+        if column not in chunk.columns:
+            return pd.Series('', index=chunk.index, dtype=object)
+        return chunk[column].fillna('').astype(str).str.strip()
+
+    rows = pd.DataFrame({column: text(column) for column in MOVIE_IMPORT_COLUMNS if column != 'release_year'})
+    rows['title'] = rows['title'].str.replace(r'\s+', ' ', regex=True)
+    # 'type' must be 'Movie' or 'Series', defaulting to 'Movie'
+    rows['type'] = rows['type'].str.capitalize()
+    rows['type'] = rows['type'].where(rows['type'].isin(['Movie', 'Series']), 'Movie')
+
+    raw_year = text('release_year')
+    year = pd.to_numeric(raw_year, errors='coerce')
+    bad_year = raw_year.ne('') & (year.isna() | (year % 1 != 0))
+    empty_title = rows['title'].eq('')
+
+    errors = pd.concat([
+        "Row " + line_numbers[empty_title].astype(str) + ": 'title' cannot be empty.",
+        "Row " + line_numbers[bad_year & ~empty_title].astype(str) + ": Invalid 'release_year' for title '"
+            + rows['title'][bad_year & ~empty_title] + "'. Must be a whole number.",
+    ]).sort_index(kind='stable')
+
+    valid = ~empty_title & ~bad_year
+    rows['release_year'] = year.where(valid).astype('Int64')
+    return rows.loc[valid, MOVIE_IMPORT_COLUMNS], errors.tolist()
+
+def movie_natural_keys(rows):
+    """Computes the natural key of validated rows, matching the movies.natural_key column."""
+    years = rows['release_year'].astype('string').fillna('')
+    return rows['title'].str.strip().str.lower() + '|' + years + '|' + rows['type'].fillna('')
+
+def _classify_movie_rows(cursor, rows):
+    """
+    Splits validated rows into the ones that need writing and a count of each outcome.
+    Repeated natural keys within `rows` keep their last occurrence; rows whose updatable
+    columns already match the stored movie are skipped.
+    Returns (rows_to_write, {'inserted', 'updated', 'skipped'}).
+    """
+    import pandas as pd
+    keys = movie_natural_keys(rows)
+    repeated = keys.duplicated(keep='last')
+    rows, keys = rows[~repeated], keys[~repeated]
+
+    found = []
+    unique_keys = keys.tolist()
+    for start in range(0, len(unique_keys), INSERT_BATCH_SIZE):
+        batch = unique_keys[start:start + INSERT_BATCH_SIZE]
+        placeholders = ", ".join(["%s"] * len(batch))
+        cursor.execute(
+            f"SELECT natural_key, {', '.join(MOVIE_UPDATE_COLUMNS)} FROM movies WHERE natural_key IN ({placeholders})",
+            batch
+        )
+        found.extend(cursor.fetchall())
+    stored = pd.DataFrame(found, columns=['natural_key'] + MOVIE_UPDATE_COLUMNS).drop_duplicates('natural_key').set_index('natural_key')
+
+    is_new = ~keys.isin(stored.index).to_numpy()
+    current = stored.reindex(keys).fillna('').astype(str).to_numpy()
+    incoming = rows[MOVIE_UPDATE_COLUMNS].fillna('').astype(str).to_numpy()
+    changed = (current != incoming).any(axis=1)
+
+    counts = {
+        'inserted': int(is_new.sum()),
+        'updated': int((~is_new & changed).sum()),
+        'skipped': int(repeated.sum() + (~is_new & ~changed).sum()),
+    }
+    return rows[is_new | changed], counts
+
+def _movie_rows_to_tuples(rows, uploaded_by):
+    """Converts validated rows to parameter tuples (missing years become NULL)."""
+    values = rows.astype(object).where(rows.notna(), None)
+    values['uploaded_by'] = uploaded_by
+    return list(values.itertuples(index=False, name=None))
+
+# --- LOAD DATA fast path ---
+# Large batches are written to a staging TSV, loaded into a per-connection temporary
+# table with LOAD DATA LOCAL INFILE and merged into movies with one INSERT ... SELECT
+# (same upsert semantics as UPSERT_MOVIE_SQL). This needs local_infile enabled on the
+# server and on the connection (get_conn(local_infile=True)); otherwise, or with
+# DB_LOAD_DATA=0, rows go through batched executemany instead.
+LOAD_DATA_ENABLED = os.environ.get("DB_LOAD_DATA", "1").lower() not in ("0", "false", "no", "off")
+LOAD_DATA_MIN_ROWS = 500
+_load_data_available = None  # Set to False after the server/client rejects LOAD DATA LOCAL
+# Errors meaning LOAD DATA LOCAL is switched off, not that this load failed:
+# ER_NOT_ALLOWED_COMMAND, ER_CLIENT_LOCAL_FILES_DISABLED, CR_LOAD_DATA_LOCAL_INFILE_REJECTED
+LOCAL_INFILE_ERROR_CODES = {1148, 3948, 2068}
+LOCAL_INFILE_ERROR_MESSAGES = ("loading local data is disabled", "command is not allowed", "local infile file request rejected")
+
+def _is_local_infile_rejected(error):
+    """True if `error` (from either driver) says LOAD DATA LOCAL is disabled or not allowed."""
+    code = getattr(error, 'errno', None)
+    if code is None and error.args and isinstance(error.args[0], int):
+        code = error.args[0]
+    if code is not None:
+        return code in LOCAL_INFILE_ERROR_CODES
+    message = str(error).lower()
+    return any(text in message for text in LOCAL_INFILE_ERROR_MESSAGES)
+
+MOVIE_STAGING_TABLE_SQL = """
+    CREATE TEMPORARY TABLE IF NOT EXISTS movies_import_staging (
+        title VARCHAR(255) NOT NULL,
+        type VARCHAR(20),
+        genre VARCHAR(255),
+        release_year INT NULL,
+        description TEXT,
+        cast TEXT,
+        poster_url TEXT,
+        trailer_url TEXT,
+        audio_languages VARCHAR(255),
+        uploaded_by INT NULL
+    ) CHARACTER SET utf8mb4
+"""
+
+MERGE_MOVIE_STAGING_SQL = """
+    INSERT INTO movies (title, type, genre, release_year, description, cast, poster_url, trailer_url, audio_languages, uploaded_by)
+    SELECT title, type, genre, release_year, description, cast, poster_url, trailer_url, audio_languages, uploaded_by
+    FROM movies_import_staging
+    ON DUPLICATE KEY UPDATE
+        genre=VALUES(genre), description=VALUES(description), cast=VALUES(cast),
+        poster_url=VALUES(poster_url), trailer_url=VALUES(trailer_url),
+        audio_languages=VALUES(audio_languages)
+"""
+
+def write_staging_tsv(rows, uploaded_by, path):
+    """
+    Writes validated rows as a TSV in LOAD DATA's default format: tab-separated,
+    newline-terminated, backslash escapes and \\N for NULL.
+    """
+    import pandas as pd
+    def field(series):
+        text = series.astype('string')
+        for raw, escaped in (('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r')):
+            text = text.str.replace(raw, escaped, regex=False)
+        return text.fillna('\\N')
+
+    fields = [field(rows[column]) for column in MOVIE_IMPORT_COLUMNS]
+    fields.append(pd.Series('\\N' if uploaded_by is None else str(uploaded_by), index=rows.index))
+    lines = fields[0].str.cat(fields[1:], sep='\t')
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for line in lines:
+            f.write(line)
+            f.write('\n')
+
+def _load_movie_rows(cursor, rows, uploaded_by):
+    """
+    Loads rows through the staging table and merges them into movies. Does not commit.
+    Returns the affected row count, or None if LOAD DATA LOCAL is not available (which
+    disables the fast path for the process). Any other error is raised.
+    """
+    global _load_data_available
+    fd, path = tempfile.mkstemp(prefix='movies_import_', suffix='.tsv')
+    os.close(fd)
+    try:
+        write_staging_tsv(rows, uploaded_by, path)
+        cursor.execute(MOVIE_STAGING_TABLE_SQL)
+        cursor.execute("DELETE FROM movies_import_staging")
         try:
-            # --- Data Validation and Cleaning ---
-            title = str(row['title']).strip()
-            if not title:
-                errors.append(f"Row {index + 2}: 'title' cannot be empty.")
-                continue
-
-            # Ensure 'type' is either 'Movie' or 'Series', default to 'Movie'
-            item_type = str(row.get('type', 'Movie')).strip().capitalize()
-            if item_type not in ['Movie', 'Series']:
-                item_type = 'Movie'
-
-            # Safely convert release_year to integer
-            try:
-                release_year = int(row.get('release_year')) if pd.notna(row.get('release_year')) else None
-            except (ValueError, TypeError):
-                errors.append(f"Row {index + 2}: Invalid 'release_year' for title '{title}'. Must be a whole number.")
-                continue
-
-            # Prepare a tuple with all the data for insertion
-            movie_data = (
-                title,
-                item_type,
-                str(row.get('genre', '')).strip(),
-                release_year,
-                str(row.get('description', '')).strip(),
-                str(row.get('cast', '')).strip(),
-                str(row.get('poster_url', '')).strip(),
-                str(row.get('trailer_url', '')).strip(),
-                uploaded_by
+            cursor.execute(
+                """
+                LOAD DATA LOCAL INFILE %s INTO TABLE movies_import_staging CHARACTER SET utf8mb4
+                (title, type, genre, release_year, description, cast, poster_url, trailer_url, audio_languages, uploaded_by)
+                """,
+                (path,)
             )
-            movies_to_insert.append(movie_data)
-
-        except KeyError as e:
-            errors.append(f"Row {index + 2}: Missing required column: {e}. Please check the CSV file.")
         except Exception as e:
-            errors.append(f"Row {index + 2}: An unexpected error occurred for title '{row.get('title', 'N/A')}': {e}")
+            if not _is_local_infile_rejected(e):
+                raise
+            _load_data_available = False
+            print(f"[IMPORT] LOAD DATA LOCAL INFILE unavailable, falling back to batched inserts: {e}")
+            return None
+        _load_data_available = True
+        cursor.execute(MERGE_MOVIE_STAGING_SQL)
+        affected = max(cursor.rowcount, 0)
+        cursor.execute("DELETE FROM movies_import_staging")
+        return affected
+    finally:
+        os.remove(path)
+
+def upsert_movie_rows(cursor, rows, uploaded_by):
+    """
+    Upserts validated rows on the movies natural key and syncs their tags. Does not commit.
+    Only new and changed rows are written, so re-importing the same data is a no-op.
+    Uses the LOAD DATA fast path for large batches when available, else batched executemany.
+    Returns {'inserted': n, 'updated': n, 'skipped': n}.
+    """
+    rows, counts = _classify_movie_rows(cursor, rows)
+    if rows.empty:
+        return counts
+    loaded = None
+    if LOAD_DATA_ENABLED and _load_data_available is not False and len(rows) >= LOAD_DATA_MIN_ROWS:
+        loaded = _load_movie_rows(cursor, rows, uploaded_by)
+    if loaded is None:
+        params = _movie_rows_to_tuples(rows, uploaded_by)
+        for start in range(0, len(params), INSERT_BATCH_SIZE):
+            cursor.executemany(UPSERT_MOVIE_SQL, params[start:start + INSERT_BATCH_SIZE])
+    # Keep the genre/language join tables in step with the uploaded rows
+    _sync_movie_tags_for_keys(cursor, movie_natural_keys(rows).tolist())
+    return counts
+
+def format_upsert_counts(counts):
+    """Formats the counts returned by upsert_movie_rows for messages and logs."""
+    return f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['skipped']} unchanged or duplicate"
+
+def bulk_upload_movies(csv_data, uploaded_by):
+    """
+    Bulk upload movies from a pandas DataFrame.
+    Rows are validated in one vectorized pass and upserted in bounded batches.
+    For large CSV files use ingest_movies_csv, which never holds the whole file.
+    """
+    try:
+        rows, errors = validate_movie_chunk(csv_data)
+    except ValueError as e:
+        return False, str(e)
 
     # --- Bulk Insert into Database ---
-    if not movies_to_insert:
+    if rows.empty:
         error_message = "No valid movies to upload. Please check the errors below."
         if errors:
-            error_message += "\\n" + "\\n".join(errors)
+            error_message += "\\n" + "\\n".join(errors[:MAX_REPORTED_ERRORS])
         return False, error_message
 
+    conn = get_conn(local_infile=LOAD_DATA_ENABLED)
+    cursor = get_cursor(conn)
     try:
-        sql = """
-            INSERT INTO movies (title, type, genre, release_year, description, cast, poster_url, trailer_url, uploaded_by)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                genre=VALUES(genre), description=VALUES(description), cast=VALUES(cast),
-                poster_url=VALUES(poster_url), trailer_url=VALUES(trailer_url);
-        """
-        cursor.executemany(sql, movies_to_insert)
+        counts = upsert_movie_rows(cursor, rows, uploaded_by)
         conn.commit()
-        success_count = cursor.rowcount
+        if counts['inserted'] or counts['updated']:
+            invalidate_catalog_caches('catalog', 'model')
         
         # Log the bulk upload activity
-        log_activity(uploaded_by, "bulk_upload", f"Attempted to upload {len(csv_data)} movies. Succeeded: {success_count}. Failed: {len(errors)}.")
+        log_activity(uploaded_by, "bulk_upload", f"Attempted to upload {len(csv_data)} movies: {format_upsert_counts(counts)}. Failed: {len(errors)}.")
 
         # Prepare final message
-        message = f"Successfully processed {success_count} movie(s)."
+        message = f"Successfully processed {len(rows)} movie(s): {format_upsert_counts(counts)}."
         if errors:
-            message += f"\\n\\nEncountered {len(errors)} error(s):\\n- " + "\\n- ".join(errors)
+            message += f"\\n\\nEncountered {len(errors)} error(s):\\n- " + "\\n- ".join(errors[:MAX_REPORTED_ERRORS])
         
         return True, message
 
@@ -757,10 +1519,181 @@ def bulk_upload_movies(csv_data, uploaded_by):
         cursor.close()
         conn.close()
 
+def import_source_key(source, source_name=""):
+    """Fingerprints an upload (name, size and first MB) so a re-upload of the same file resumes its import."""
+    digest = hashlib.sha1(str(source_name).encode("utf-8"))
+    position = source.tell()
+    head = source.read(1024 * 1024)
+    digest.update(head if isinstance(head, bytes) else str(head).encode("utf-8"))
+    source.seek(0, os.SEEK_END)
+    digest.update(str(source.tell()).encode("utf-8"))
+    source.seek(position)
+    return digest.hexdigest()
+
+def get_resumable_import(source_key):
+    """Returns the unfinished import job for a source, if any."""
+    conn = get_conn()
+    cursor = get_cursor(conn)
+    try:
+        cursor.execute(
+            "SELECT * FROM import_jobs WHERE source_key = %s AND status <> 'completed' ORDER BY id DESC LIMIT 1",
+            (source_key,)
+        )
+        return cursor.fetchone()
+    except Exception as e:
+        print(f"[IMPORT] Error reading import jobs: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+def ingest_movies_csv(source, uploaded_by, source_name=None, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """
+    Streams a CSV file (path or file-like object) into `movies` in chunks of `chunk_size`
+    rows. Each chunk is validated with validate_movie_chunk and committed in its own
+    transaction together with the job's checkpoint in import_jobs, so memory stays
+    bounded and an interrupted import resumes after the last committed chunk when the
+    same file is ingested again.
+    `progress(rows_done, fraction)` is called after every chunk; fraction may be None.
+    Returns (success, message).
+    """
+    import pandas as pd
+    source_name = source_name or getattr(source, 'name', None) or str(source)
+    opened = None
+    if isinstance(source, (str, os.PathLike)):
+        source = opened = open(source, 'rb')
+    try:
+        source_key = import_source_key(source, source_name)
+        total_bytes = source.seek(0, os.SEEK_END) or None
+        source.seek(0)
+
+        job = get_resumable_import(source_key)
+        job_id, done, rejected = None, 0, 0
+        counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+        errors = []
+        conn = get_conn(local_infile=LOAD_DATA_ENABLED)
+        cursor = get_cursor(conn)
+        try:
+            if job:
+                cursor.execute("UPDATE import_jobs SET status = 'running', last_error = NULL WHERE id = %s", (job['id'],))
+                job_id, done, rejected = job['id'], job['rows_committed'], job['rows_rejected']
+                counts = {'inserted': job['rows_inserted'], 'updated': job['rows_updated'], 'skipped': job['rows_skipped']}
+                print(f"[IMPORT] Resuming '{source_name}' after {done} row(s).")
+            else:
+                cursor.execute(
+                    "INSERT INTO import_jobs (source_key, source_name, uploaded_by) VALUES (%s, %s, %s)",
+                    (source_key, source_name[:255], uploaded_by)
+                )
+                job_id = cursor.lastrowid
+            conn.commit()
+
+            reader = pd.read_csv(
+                source, dtype=str, chunksize=chunk_size,
+                skiprows=range(1, done + 1) if done else None
+            )
+            for chunk in reader:
+                rows, chunk_errors = validate_movie_chunk(chunk, first_row_number=done + 2)
+                if not rows.empty:
+                    for outcome, count in upsert_movie_rows(cursor, rows, uploaded_by).items():
+                        counts[outcome] += count
+                done += len(chunk)
+                rejected += len(chunk_errors)
+                errors.extend(chunk_errors[:MAX_REPORTED_ERRORS - len(errors)])
+                cursor.execute(
+                    """
+                    UPDATE import_jobs SET rows_committed = %s, rows_inserted = %s, rows_updated = %s,
+                        rows_skipped = %s, rows_rejected = %s
+                    WHERE id = %s
+                    """,
+                    (done, counts['inserted'], counts['updated'], counts['skipped'], rejected, job_id)
+                )
+                conn.commit()
+                if progress:
+                    progress(done, min(source.tell() / total_bytes, 1.0) if total_bytes else None)
+
+            cursor.execute("UPDATE import_jobs SET status = 'completed' WHERE id = %s", (job_id,))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            try:
+                cursor.execute("UPDATE import_jobs SET status = 'failed', last_error = %s WHERE id = %s", (str(e)[:2000], job_id))
+                conn.commit()
+            except Exception:
+                pass
+            if done:
+                invalidate_catalog_caches('catalog', 'model')
+            return False, f"Import stopped after {done} row(s): {e}. Upload the same file again to resume."
+        finally:
+            cursor.close()
+            conn.close()
+    finally:
+        if opened:
+            opened.close()
+
+    invalidate_catalog_caches('catalog', 'model')
+    log_activity(uploaded_by, "bulk_upload", f"Imported '{source_name}': {done} rows, {format_upsert_counts(counts)}, {rejected} rejected.")
+    message = f"Successfully processed {done} row(s): {format_upsert_counts(counts)}."
+    if rejected:
+        message += f"\\n\\nEncountered {rejected} error(s):\\n- " + "\\n- ".join(errors)
+        if rejected > len(errors):
+            message += f"\\n- ... and {rejected - len(errors)} more"
+    return True, message
+
 # --- PAGINATION ---
 
-def get_movie_filter_bounds():
-    """Gets the min/max year and distinct genres/languages for filter widgets."""
+# Process-wide result cache shared by every session (plus the optional shared tier,
+# see modules/query_cache). Entries are tagged 'catalog' (movies and their tags),
+# 'ratings', 'trending' or 'model' (the recommendation model's inputs) and are
+# invalidated by the write functions (and the trending job); TTLs are a safety net for
+# writes made by other processes without a shared tier.
+FILTER_BOUNDS_TTL_SECONDS = 600
+CATALOG_CACHE_TTL_SECONDS = 300
+catalog_cache = query_cache.QueryCache(shared=query_cache.shared_tier_from_env())
+
+# The recommendation model is rebuilt when this version changes. It is read from the
+# database, so imports run by other processes (import_catalog.py, other replicas) are
+# seen within MODEL_VERSION_CHECK_SECONDS; writes to the movies' text columns in this
+# process invalidate the 'model' tag so they are seen on the next render.
+MODEL_VERSION_CHECK_SECONDS = 60
+
+def _query_model_version():
+    """Returns ((count, max id, last update), ok); served from the idx_movies_updated_at index."""
+    conn = get_conn()
+    cursor = get_cursor(conn)
+    try:
+        cursor.execute("SELECT COUNT(*) AS total, MAX(id) AS max_id, MAX(updated_at) AS last_updated FROM movies")
+        row = cursor.fetchone()
+        return (row['total'], row['max_id'], str(row['last_updated'])), True
+    except Exception as err:
+        print(f"Error reading the movies version: {err}")
+        return None, False
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_model_version():
+    """Cheap version of the movies the recommendation model is built from."""
+    return catalog_cache.get_or_compute('model_version', {}, _query_model_version, MODEL_VERSION_CHECK_SECONDS, tags=('model',))
+
+def get_model_movies():
+    """
+    Reads the movie rows the recommendation model is built from, bypassing catalog_cache:
+    the model keeps its own copy, and a cached list could predate the version it is built for.
+    """
+    movies, ok = _query_all_movies()
+    if not ok:
+        raise RuntimeError("could not read movies for the recommendation model")
+    return movies
+
+def invalidate_catalog_caches(*tags):
+    """Marks cached catalog reads as stale after a write. Defaults to the 'catalog' tag."""
+    tags = tags or ('catalog',)
+    catalog_cache.invalidate(*tags)
+    if 'catalog' in tags:
+        autocomplete.invalidate()
+
+def _query_movie_filter_bounds():
+    """Queries the filter bounds. Returns (bounds, ok) so failures are not cached."""
     conn = get_conn()
     cursor = get_cursor(conn)
     bounds = {
@@ -776,33 +1709,46 @@ def get_movie_filter_bounds():
             bounds['min_year'] = year_res['min_y']
             bounds['max_year'] = year_res['max_y']
 
-        cursor.execute("SELECT DISTINCT genre FROM movies WHERE genre IS NOT NULL AND genre != ''")
-        genres_res = cursor.fetchall()
-        if genres_res:
-            genres = set()
-            for row in genres_res:
-                genres.update(g.strip() for g in row['genre'].split(','))
-            bounds['genres'] = sorted(list(genres))
-        
-        cursor.execute("SELECT DISTINCT audio_languages FROM movies WHERE audio_languages IS NOT NULL AND audio_languages != ''")
-        lang_res = cursor.fetchall()
-        if lang_res:
-            languages = set()
-            for row in lang_res:
-                languages.update(lang.strip() for lang in row['audio_languages'].split(','))
-            bounds['audio_languages'] = sorted(list(languages))
+        # Both lookups are index-only scans over the normalized tag tables
+        cursor.execute("SELECT DISTINCT genre FROM movie_genres ORDER BY genre")
+        bounds['genres'] = [row['genre'] for row in cursor.fetchall()]
+
+        cursor.execute("SELECT DISTINCT language FROM movie_languages ORDER BY language")
+        bounds['audio_languages'] = [row['language'] for row in cursor.fetchall()]
+        return bounds, True
 
     except Exception as err:
         print(f"Error getting filter bounds: {err}")
+        return bounds, False
     finally:
         cursor.close()
         conn.close()
-    return bounds
+
+def get_movie_filter_bounds():
+    """
+    Gets the min/max year and distinct genres/languages for filter widgets.
+    Served from catalog_cache until the next catalog write (or FILTER_BOUNDS_TTL_SECONDS),
+    so reruns do no database work.
+    """
+    bounds = catalog_cache.get_or_compute('filter_bounds', {}, _query_movie_filter_bounds, FILTER_BOUNDS_TTL_SECONDS, tags=('catalog',))
+    # Hand out copies so callers cannot mutate the shared snapshot
+    return {key: list(value) if isinstance(value, list) else value for key, value in bounds.items()}
 
 def get_movies_paginated(page=1, per_page=12, query=None, movie_type=None, genres=None, year_range=None, rating_filter=None, audio_languages=None, sort_by='popularity'):
     """
     Gets movies with pagination and advanced filtering.
+    Results are cached per normalized filter combination until the catalog or ratings change.
     """
+    params = dict(page=page, per_page=per_page, query=query, movie_type=movie_type, genres=genres, year_range=year_range,
+                  rating_filter=rating_filter, audio_languages=audio_languages, sort_by=sort_by)
+    movies, total_movies = catalog_cache.get_or_compute(
+        'movies_paginated', params, lambda: _query_movies_paginated(**params),
+        CATALOG_CACHE_TTL_SECONDS, tags=('catalog', 'ratings')
+    )
+    return list(movies), total_movies
+
+def _query_movies_paginated(page, per_page, query, movie_type, genres, year_range, rating_filter, audio_languages, sort_by):
+    """Runs the paginated catalog query. Returns ((movies, total), ok) so failures are not cached."""
     conn = get_conn()
     cursor = get_cursor(conn)
     params = []
@@ -828,8 +1774,8 @@ def get_movies_paginated(page=1, per_page=12, query=None, movie_type=None, genre
         params.append(movie_type)
 
     if genres:
-        genre_placeholders = " OR ".join(["FIND_IN_SET(%s, m.genre) > 0"] * len(genres))
-        where_clauses.append(f"({genre_placeholders})")
+        genre_placeholders = ", ".join(["%s"] * len(genres))
+        where_clauses.append(f"EXISTS (SELECT 1 FROM movie_genres mg WHERE mg.movie_id = m.id AND mg.genre IN ({genre_placeholders}))")
         params.extend(genres)
 
     if year_range:
@@ -837,8 +1783,8 @@ def get_movies_paginated(page=1, per_page=12, query=None, movie_type=None, genre
         params.extend(year_range)
     
     if audio_languages:
-        lang_placeholders = " OR ".join(["FIND_IN_SET(%s, m.audio_languages) > 0"] * len(audio_languages))
-        where_clauses.append(f"({lang_placeholders})")
+        lang_placeholders = ", ".join(["%s"] * len(audio_languages))
+        where_clauses.append(f"EXISTS (SELECT 1 FROM movie_languages ml WHERE ml.movie_id = m.id AND ml.language IN ({lang_placeholders}))")
         params.extend(audio_languages)
         
     where_sql = " AND ".join(where_clauses) if where_clauses else ""
@@ -855,7 +1801,7 @@ def get_movies_paginated(page=1, per_page=12, query=None, movie_type=None, genre
             having_sql = " HAVING avg_rating < 3"
 
     # --- DYNAMIC ORDER BY CLAUSE ---
-    order_by_sql = " ORDER BY CASE WHEN m.poster_url IS NOT NULL AND TRIM(m.poster_url) <> '' THEN 0 ELSE 1 END, "
+    order_by_sql = " ORDER BY m.has_poster DESC, "
     if sort_by == 'rating':
         order_by_sql += "avg_rating DESC, m.id"
     elif sort_by == 'year':
@@ -876,7 +1822,9 @@ def get_movies_paginated(page=1, per_page=12, query=None, movie_type=None, genre
         total_movies = result['total'] if result else 0
     except Exception as err:
         print(f"Error counting movies: {err}")
-        return [], 0
+        cursor.close()
+        conn.close()
+        return ([], 0), False
 
     # --- DATA QUERY ---
     pagination_sql = " LIMIT %s OFFSET %s"
@@ -894,10 +1842,10 @@ def get_movies_paginated(page=1, per_page=12, query=None, movie_type=None, genre
     try:
         cursor.execute(select_sql, params + [per_page, offset])
         movies = cursor.fetchall()
-        return movies, total_movies
+        return (movies, total_movies), True
     except Exception as err:
         print(f"Error fetching paginated movies: {err}")
-        return [], 0
+        return ([], 0), False
     finally:
         cursor.close()
         conn.close()
@@ -1032,6 +1980,9 @@ def delete_user(user_id, admin_id):
         
         # Commit the transaction
         conn.commit()
+        # The user's reviews are gone and their uploads lost their uploader
+        invalidate_catalog_caches('catalog', 'ratings', 'watchlist')
+        invalidate_user_caches(user_id)
         
         if cursor.rowcount > 0:
             log_activity(admin_id, "admin_delete_user", f"Admin successfully deleted user with ID: {user_id} and all associated data.")
@@ -1067,13 +2018,15 @@ def add_movie(title, item_type, genre, release_year, description, cast, poster_u
             """,
             (title, item_type, genre, release_year, description, cast, poster_url, trailer_url, audio_languages, uploaded_by)
         )
+        _sync_movie_tags(cursor, [(cursor.lastrowid, genre, audio_languages)])
         conn.commit()
+        invalidate_catalog_caches('catalog', 'model')
         log_activity(uploaded_by, "add_movie", f"Added movie: {title}")
         return True
     except Exception as err:
-        # Error 1062 is for a duplicate entry (e.g., same title)
+        # Error 1062 is for a duplicate entry (same title, year and type)
         if err.errno == 1062:
-            st.warning(f"A movie with the title '{title}' already exists.")
+            st.warning(f"'{title}' ({item_type}, {release_year}) already exists.")
         else:
             # For any other database errors
             st.error(f"Database Error: {err}")
@@ -1083,17 +2036,21 @@ def add_movie(title, item_type, genre, release_year, description, cast, poster_u
         conn.close()
 
 def get_all_movies():
-    """Retrieves all movies from the database for the admin panel."""
+    """Retrieves all movies from the database for the admin panel (cached until the next catalog write)."""
+    return list(catalog_cache.get_or_compute('all_movies', {}, _query_all_movies, CATALOG_CACHE_TTL_SECONDS, tags=('catalog',)))
+
+def _query_all_movies():
+    """Returns (movies, ok) so failures are not cached."""
     conn = get_conn()
     cursor = get_cursor(conn)
     try:
         # Now selecting all fields required by the recommender system
-        cursor.execute("SELECT id, title, type, genre, release_year, description, cast, poster_url FROM movies ORDER BY id DESC")
+        cursor.execute("SELECT id, title, type, genre, release_year, description, cast, keywords, poster_url, has_poster FROM movies ORDER BY id DESC")
         movies = cursor.fetchall()
-        return movies
+        return movies, True
     except Exception as e:
         st.error(f"Database error fetching movies: {e}")
-        return []
+        return [], False
     finally:
         cursor.close()
         conn.close()
@@ -1135,6 +2092,36 @@ def search_movies(query, genre=None, language=None, year=None, limit=50):
     conn.close()
     return movies
 
+# --- PER-USER CACHE ---
+# Profile tabs read the same per-user rows on every rerun. They are cached under a
+# "user:<id>" tag whose version the write functions below bump, so a user's next rerun
+# after a change sees fresh data while unchanged data is served from memory. Entries
+# that embed movie rows are also tagged 'catalog'.
+
+USER_CACHE_TTL_SECONDS = 300
+user_cache = query_cache.QueryCache(shared=query_cache.shared_tier_from_env())
+
+def _user_tag(user_id):
+    return f"user:{user_id}"
+
+def invalidate_user_caches(user_id):
+    """Marks every cached read for this user as stale (in all processes when a shared tier is configured)."""
+    user_cache.invalidate(_user_tag(user_id))
+
+def _cached_for_user(namespace, user_id, compute, tags=('catalog',)):
+    return user_cache.get_or_compute(namespace, {'user_id': user_id}, compute, USER_CACHE_TTL_SECONDS,
+                                     tags=(_user_tag(user_id),) + tuple(tags))
+
+# Movie cards read counts and reviews per movie. They live in catalog_cache under a
+# "movie:<id>" tag, so an action on one card only refreshes that card's entries.
+
+def invalidate_movie_caches(movie_id):
+    catalog_cache.invalidate(f"movie:{movie_id}")
+
+def _cached_for_movie(namespace, movie_id, compute, tags=(), **params):
+    return catalog_cache.get_or_compute(namespace, dict(params, movie_id=movie_id), compute, CATALOG_CACHE_TTL_SECONDS,
+                                        tags=(f"movie:{movie_id}",) + tuple(tags))
+
 # --- WATCHLIST & HISTORY FUNCTIONS ---
 
 def add_to_watchlist(user_id, movie_id):
@@ -1150,6 +2137,8 @@ def add_to_watchlist(user_id, movie_id):
         conn.commit()
         
         if cursor.rowcount > 0:
+            invalidate_user_caches(user_id)
+            invalidate_movie_caches(movie_id)
             log_activity(user_id, "add_to_watchlist", f"Added movie {movie_id} to watchlist")
             return True
         return False
@@ -1172,6 +2161,8 @@ def remove_from_watchlist(user_id, movie_id):
         conn.commit()
         
         if cursor.rowcount > 0:
+            invalidate_user_caches(user_id)
+            invalidate_movie_caches(movie_id)
             log_activity(user_id, "remove_from_watchlist", f"Removed movie {movie_id} from watchlist")
             return True
         return False
@@ -1182,7 +2173,10 @@ def remove_from_watchlist(user_id, movie_id):
         conn.close()
 
 def get_watchlist(user_id):
-    """Get user's watchlist"""
+    """Get user's watchlist (cached until the user's next write)"""
+    return list(_cached_for_user('watchlist', user_id, lambda: _query_watchlist(user_id)))
+
+def _query_watchlist(user_id):
     conn = get_conn()
     cursor = get_cursor(conn)
     
@@ -1196,7 +2190,7 @@ def get_watchlist(user_id):
     
     cursor.close()
     conn.close()
-    return movies
+    return movies, True
 
 def add_to_history(user_id, movie_id, status='watched'):
     """Add movie to user's history"""
@@ -1211,6 +2205,7 @@ def add_to_history(user_id, movie_id, status='watched'):
         """, (user_id, movie_id, status, status))
         conn.commit()
         
+        invalidate_user_caches(user_id)
         log_activity(user_id, "add_to_history", f"Added movie {movie_id} to history with status: {status}")
         return True
     except Exception:
@@ -1220,7 +2215,10 @@ def add_to_history(user_id, movie_id, status='watched'):
         conn.close()
 
 def get_history(user_id):
-    """Get user's watch history"""
+    """Get user's watch history (cached until the user's next write)"""
+    return list(_cached_for_user('history', user_id, lambda: _query_history(user_id)))
+
+def _query_history(user_id):
     conn = get_conn()
     cursor = get_cursor(conn)
     
@@ -1234,18 +2232,21 @@ def get_history(user_id):
     
     cursor.close()
     conn.close()
-    return movies
+    return movies, True
 
 def is_in_watchlist(user_id, movie_id):
-    """Checks if a movie is already in the user's watchlist."""
+    """Checks if a movie is already in the user's watchlist (one cached query per user, not per card)."""
+    return movie_id in _cached_for_user('watchlist_ids', user_id, lambda: _query_watchlist_ids(user_id), tags=())
+
+def _query_watchlist_ids(user_id):
     conn = get_conn()
-    if conn is None: return False
+    if conn is None: return frozenset(), False
     cursor = get_cursor(conn)
     try:
-        cursor.execute("SELECT 1 FROM watchlist WHERE user_id = %s AND movie_id = %s", (user_id, movie_id))
-        return cursor.fetchone() is not None
+        cursor.execute("SELECT movie_id FROM watchlist WHERE user_id = %s", (user_id,))
+        return frozenset(row['movie_id'] for row in cursor.fetchall()), True
     except Exception:
-        return False
+        return frozenset(), False
     finally:
         cursor.close()
         conn.close()
@@ -1324,69 +2325,82 @@ def delete_otps(email, purpose):
     cursor.close()
     conn.close()
 
-def get_user_stats(user_id):
+def _query_user_profile(user_id):
     """
-    Retrieves various statistics for a given user.
+    Reads everything the profile stats and badges need in one round trip: one row per
+    watched genre (most watched first), each carrying the user-level aggregates, or a
+    single row with a NULL genre when the user has no genre history.
+    Returns (profile, ok).
     """
-    stats = {
-        "member_since": None,
-        "total_watched": 0,
-        "most_watched_genre": "N/A",
-        "average_rating": 0.0,
-        "total_reviews": 0
-    }
-    
+    profile = {'date_joined': None, 'watched': 0, 'history_rows': 0, 'average_rating': None, 'total_reviews': 0, 'genres': []}
     conn = get_conn()
     cursor = get_cursor(conn)
-    
     try:
-        # Get user's join date
-        cursor.execute("SELECT date_joined FROM users WHERE id = %s", (user_id,))
-        user_data = cursor.fetchone()
-        if user_data:
-            stats["member_since"] = user_data['date_joined']
-            
-        # 2. Get total movies watched
-        cursor.execute("SELECT COUNT(DISTINCT movie_id) as total FROM history WHERE user_id = %s", (user_id,))
-        watched_data = cursor.fetchone()
-        if watched_data:
-            stats["total_watched"] = watched_data['total']
-            
-        # 3. Get most watched genre
         cursor.execute("""
-            SELECT m.genre, COUNT(h.movie_id) AS watch_count
-            FROM history h
-            JOIN movies m ON h.movie_id = m.id
-            WHERE h.user_id = %s AND m.genre IS NOT NULL AND m.genre != ''
-            GROUP BY m.genre
-            ORDER BY watch_count DESC
-            LIMIT 1
-        """, (user_id,))
-        genre_data = cursor.fetchone()
-        if genre_data:
-            stats["most_watched_genre"] = genre_data['genre']
-            
-        # 4. Get average rating and total reviews
-        cursor.execute("SELECT AVG(rating) as avg_r, COUNT(id) as total_r FROM reviews WHERE user_id = %s", (user_id,))
-        rating_data = cursor.fetchone()
-        if rating_data and rating_data['avg_r'] is not None:
-            stats["average_rating"] = float(rating_data['avg_r'])
-            stats["total_reviews"] = rating_data['total_r']
-
+            SELECT u.date_joined,
+                   (SELECT COUNT(DISTINCT movie_id) FROM history WHERE user_id = u.id) AS watched,
+                   (SELECT COUNT(*) FROM history WHERE user_id = u.id) AS history_rows,
+                   rv.avg_rating, rv.total_reviews,
+                   g.genre, g.watch_count
+            FROM users u
+            CROSS JOIN (SELECT AVG(rating) AS avg_rating, COUNT(*) AS total_reviews FROM ratings WHERE user_id = %s) rv
+            LEFT JOIN (
+                SELECT m.genre, COUNT(*) AS watch_count
+                FROM history h
+                JOIN movies m ON h.movie_id = m.id
+                WHERE h.user_id = %s AND m.genre IS NOT NULL AND m.genre != ''
+                GROUP BY m.genre
+            ) g ON TRUE
+            WHERE u.id = %s
+            ORDER BY g.watch_count DESC, g.genre
+        """, (user_id, user_id, user_id))
+        rows = cursor.fetchall()
+        if rows:
+            first = rows[0]
+            profile.update(
+                date_joined=first['date_joined'],
+                watched=first['watched'] or 0,
+                history_rows=first['history_rows'] or 0,
+                average_rating=float(first['avg_rating']) if first['avg_rating'] is not None else None,
+                total_reviews=first['total_reviews'] or 0,
+                genres=[(row['genre'], row['watch_count']) for row in rows if row['genre'] is not None],
+            )
+        return profile, True
     except Exception as err:
-        print(f"Error fetching user stats: {err}")
-        # Return default stats on error
-    
+        print(f"Error fetching user profile aggregates: {err}")
+        return profile, False
     finally:
         cursor.close()
         conn.close()
-        
+
+def get_user_profile(user_id):
+    """Per-user aggregates behind get_user_stats and get_user_badges (cached until the user's next write)."""
+    return _cached_for_user('user_profile', user_id, lambda: _query_user_profile(user_id))
+
+def get_user_stats(user_id):
+    """
+    Retrieves various statistics for a given user.
+    """
+    profile = get_user_profile(user_id)
+    stats = {
+        "member_since": profile['date_joined'],
+        "total_watched": profile['watched'],
+        "most_watched_genre": profile['genres'][0][0] if profile['genres'] else "N/A",
+        "average_rating": 0.0,
+        "total_reviews": 0
+    }
+    if profile['average_rating'] is not None:
+        stats["average_rating"] = profile['average_rating']
+        stats["total_reviews"] = profile['total_reviews']
     return stats
 
 def get_rating_summary(movie_id):
     """
-    Calculates the average rating and review count for a given movie.
+    Calculates the average rating and review count for a given movie (cached per movie).
     """
+    return _cached_for_movie('rating_summary', movie_id, lambda: _query_rating_summary(movie_id), tags=('ratings',))
+
+def _query_rating_summary(movie_id):
     conn = get_conn()
     cursor = get_cursor(conn)
     try:
@@ -1401,9 +2415,9 @@ def get_rating_summary(movie_id):
             (movie_id,)
         )
         summary = cursor.fetchone()
-        return summary
+        return summary, True
     except Exception:
-        return {'average_rating': 0, 'review_count': 0}
+        return {'average_rating': 0, 'review_count': 0}, False
     finally:
         cursor.close()
         conn.close()
@@ -1412,6 +2426,9 @@ def get_reviews_for_movie(movie_id, limit=5):
     """
     Retrieves all reviews for a specific movie, including the username of the reviewer.
     """
+    return list(_cached_for_movie('movie_reviews', movie_id, lambda: _query_reviews_for_movie(movie_id, limit), tags=('ratings',), limit=limit))
+
+def _query_reviews_for_movie(movie_id, limit):
     conn = get_conn()
     cursor = get_cursor(conn)
     try:
@@ -1427,9 +2444,9 @@ def get_reviews_for_movie(movie_id, limit=5):
             (movie_id, limit)
         )
         reviews = cursor.fetchall()
-        return reviews
+        return reviews, True
     except Exception:
-        return []
+        return [], False
     finally:
         cursor.close()
         conn.close()
@@ -1453,6 +2470,9 @@ def add_or_update_review(movie_id, user_id, rating, review):
             (movie_id, user_id, rating, review)
         )
         conn.commit()
+        invalidate_catalog_caches('ratings')
+        invalidate_user_caches(user_id)
+        invalidate_movie_caches(movie_id)
         return True
     except Exception as err:
         st.error(f"Database error while submitting review: {err}")
@@ -1463,61 +2483,126 @@ def add_or_update_review(movie_id, user_id, rating, review):
 
 # --- You can add more database functions below (e.g., for user auth, movie management) ---
 
-def parse_json_column(data, key_to_extract, limit=3):
+def get_import_uploader_id(user_id=None):
     """
-    Parses a JSON string from a DataFrame column, extracts specific keys,
-    and returns a comma-separated string.
+    Returns the id of the user recorded as the uploader of an import: `user_id` if that
+    user exists, otherwise (when no id is given) the first admin. None if there is no such user.
     """
+    conn = get_conn()
+    cursor = get_cursor(conn)
     try:
-        items = json.loads(data)
-        if isinstance(items, list):
-            names = [item.get(key_to_extract, '') for item in items[:limit]]
-            return ', '.join(filter(None, names))
-    except (json.JSONDecodeError, TypeError):
-        return ''
-    return ''
+        if user_id is None:
+            cursor.execute("SELECT id FROM users WHERE role = 'admin' ORDER BY id LIMIT 1")
+        else:
+            cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
+        row = cursor.fetchone()
+        return row['id'] if row else None
+    finally:
+        cursor.close()
+        conn.close()
 
-def populate_from_tmdb_files(movies_df, credits_df, uploaded_by_id):
+def load_movie_chunks(chunks, uploaded_by, dry_run=False, progress=None, first_line=2):
     """
-    Merges, transforms, and uploads TMDB data from pandas DataFrames.
+    Validates and upserts an iterable of raw movie DataFrames, committing one transaction
+    per chunk. With `dry_run` the chunks are only validated and nothing is written.
+    `progress(stats)` is called after every chunk.
+    Chunks are expected to keep their source row positions in an integer index (as the
+    chunks of pd.read_csv/read_json and tmdb_files.transform_movies do), so error lines
+    are source file lines (`first_line` being the file's first data row) even when a
+    transform dropped rows; a chunk can report how many source rows it was made from
+    in chunk.attrs['source_rows'].
+    Returns (success, stats): stats holds the source rows processed, the rows dropped
+    before validation, the valid rows and their upsert counts, the number of rejected
+    rows, the first MAX_REPORTED_ERRORS messages, the elapsed seconds and, on failure,
+    the database error (earlier chunks stay committed).
     """
-    st.info("Step 1: Normalizing and merging datasets...")
-
-    # Normalize column names to be safe (lowercase, no extra spaces)
-    movies_df.columns = movies_df.columns.str.strip().str.lower()
-    credits_df.columns = credits_df.columns.str.strip().str.lower()
-
-    # --- DEBUGGING STEP ---
-    st.info("Debugging: Columns found in `movies.csv` after normalization:")
-    st.write(list(movies_df.columns))
-    # --- END DEBUGGING STEP ---
-
-    # Rename movie_id in credits to 'id' for a clean merge
-    if 'movie_id' in credits_df.columns:
-        credits_df.rename(columns={'movie_id': 'id'}, inplace=True)
-    
-    df = movies_df.merge(credits_df, on='id')
-
-    st.info("Step 2: Transforming data for the database...")
-    upload_df = pd.DataFrame()
-    
-    # After merging, pandas appends _x and _y if column names conflict. We'll use title_x.
-    upload_df['title'] = df['title_x'].fillna('').str.strip()
-    upload_df['type'] = 'Movie'
-    upload_df['genre'] = df['genres'].apply(lambda x: parse_json_column(x, 'name', limit=5))
-    upload_df['release_year'] = pd.to_datetime(df['release_date'], errors='coerce').dt.year.fillna(0).astype(int)
-    upload_df['description'] = df['overview'].fillna('')
-    upload_df['cast'] = df['cast'].apply(lambda x: parse_json_column(x, 'name', limit=4))
-    
-    # Set poster_url to empty since it's not in the source CSV. We'll fetch it later.
-    upload_df['poster_url'] = ''
-    
-    upload_df['trailer_url'] = ''
-
-    st.info(f"Step 3: Preparing to upload {len(upload_df)} movies...")
-    success, message = bulk_upload_movies(upload_df, uploaded_by_id)
-
-    return success, message
+    import pandas as pd
+    started = time.perf_counter()
+    stats = {'rows': 0, 'dropped': 0, 'valid': 0, 'inserted': 0, 'updated': 0, 'skipped': 0, 'rejected': 0, 'errors': [],
+             'seconds': 0.0, 'error': None}
+    conn = cursor = None
+    if not dry_run:
+        conn = get_conn(local_infile=LOAD_DATA_ENABLED)
+        cursor = get_cursor(conn)
+    try:
+        for chunk in chunks:
+            if pd.api.types.is_integer_dtype(chunk.index):
+                rows, chunk_errors = validate_movie_chunk(chunk, line_numbers=chunk.index + first_line)
+            else:
+                rows, chunk_errors = validate_movie_chunk(chunk, first_row_number=stats['rows'] + first_line)
+            stats['valid'] += len(rows)
+            if not dry_run and not rows.empty:
+                for outcome, count in upsert_movie_rows(cursor, rows, uploaded_by).items():
+                    stats[outcome] += count
+                conn.commit()
+            source_rows = chunk.attrs.get('source_rows', len(chunk))
+            stats['rows'] += source_rows
+            stats['dropped'] += source_rows - len(chunk)
+            stats['rejected'] += len(chunk_errors)
+            stats['errors'].extend(chunk_errors[:MAX_REPORTED_ERRORS - len(stats['errors'])])
+            stats['seconds'] = time.perf_counter() - started
+            if progress:
+                progress(stats)
+    except Exception as e:
+        if conn is not None:
+            conn.rollback()
+        stats['error'] = str(e)
+    finally:
+        if conn is not None:
+            cursor.close()
+            conn.close()
+    stats['seconds'] = time.perf_counter() - started
+    if not dry_run and (stats['inserted'] or stats['updated']):
+        invalidate_catalog_caches('catalog', 'model')
+    return stats['error'] is None, stats
+
+def populate_from_tmdb_files(movies_source, credits_source, uploaded_by_id, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """
+    Transforms and uploads the TMDB movies/credits files (DataFrames, paths or file objects).
+    The credits file is reduced to cast names first, chunk by chunk; the movies file is
+    then transformed (JSON columns decoded in bulk, see modules/tmdb_files) and upserted
+    in chunks of `chunk_size`, one transaction each. Paths and file objects are streamed,
+    so large dumps are never held in memory as a whole.
+    `progress(rows_done, fraction)` is called after every chunk; fraction may be None.
+    Returns (success, message) with the upsert counts and throughput.
+    """
+    import pandas as pd
+    from modules import tmdb_files
+    st.info("Step 1: Parsing credits...")
+    cast_by_id = tmdb_files.read_cast_lookup(credits_source)
+
+    st.info("Step 2: Transforming and uploading movies...")
+    if isinstance(movies_source, pd.DataFrame):
+        total_rows = len(movies_source)
+        fraction = lambda: done / total_rows if total_rows else None
+    else:
+        # File objects report progress by read position, like ingest_movies_csv
+        total_bytes = movies_source.seek(0, os.SEEK_END) if hasattr(movies_source, 'seek') else None
+        if total_bytes:
+            movies_source.seek(0)
+        fraction = lambda: min(movies_source.tell() / total_bytes, 1.0) if total_bytes else None
+    chunks = (tmdb_files.transform_movies(chunk, cast_by_id) for chunk in tmdb_files.iter_movies(movies_source, chunk_size))
+
+    done = 0
+    def report(stats):
+        nonlocal done
+        done = stats['rows']
+        if progress:
+            progress(done, fraction())
+
+    success, stats = load_movie_chunks(chunks, uploaded_by_id, progress=report)
+    if not success:
+        return False, f"A database error occurred after {done} row(s): {stats['error']}"
+
+    rate = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0
+    log_activity(uploaded_by_id, "tmdb_import", f"Imported {stats['rows']} TMDB rows in {stats['seconds']:.1f}s: {format_upsert_counts(stats)}, {stats['rejected']} rejected.")
+    print(f"[IMPORT] TMDB files: {stats['rows']} rows in {stats['seconds']:.2f}s ({rate:,.0f} rows/s)")
+    message = f"Processed {stats['rows']:,} TMDB row(s) in {stats['seconds']:.1f}s ({rate:,.0f} rows/s): {format_upsert_counts(stats)}."
+    if stats['dropped']:
+        message += f" {stats['dropped']:,} movie(s) without credits were skipped."
+    if stats['rejected']:
+        message += f"\\n\\nEncountered {stats['rejected']} error(s):\\n- " + "\\n- ".join(stats['errors'])
+    return True, message
 
 def set_user_verified(email):
     """Sets a user's is_verified status to TRUE."""
@@ -1606,6 +2691,7 @@ def start_watch_session(user_id, movie_id):
             (user_id, movie_id)
         )
         conn.commit()
+        invalidate_user_caches(user_id)
         session_id = cursor.lastrowid
         return session_id
     except Exception as err:
@@ -1631,6 +2717,10 @@ def end_watch_session(session_id):
             (session_id,)
         )
         conn.commit()
+        cursor.execute("SELECT user_id FROM watch_sessions WHERE id = %s", (session_id,))
+        session = cursor.fetchone()
+        if session:
+            invalidate_user_caches(session['user_id'])
         return True
     except Exception as err:
         print(f"Error ending watch session: {err}")
@@ -1639,79 +2729,392 @@ def end_watch_session(session_id):
         cursor.close()
         conn.close()
 
-def get_trending_movies(limit=10):
+# --- TRENDING ---
+# The trending list is materialized into trending_movies by a periodic job, so the
+# home page reads it with one primary-key range scan. Each interaction contributes
+# weight * 0.5 ** (age / half-life), so a movie fades out gradually instead of
+# dropping off at a fixed window boundary.
+
+TRENDING_REFRESH_INTERVAL_SECONDS = 900
+TRENDING_HALF_LIFE_DAYS = 7
+TRENDING_LOOKBACK_DAYS = 90  # Older events contribute less than 0.02% of a fresh one
+TRENDING_SIZE = 100
+# (table, timestamp column, weight expression)
+TRENDING_SIGNALS = [
+    ("watch_sessions", "started_at", "1.0"),
+    ("history", "watched_at", "1.0"),
+    ("watchlist", "added_on", "0.5"),
+    ("ratings", "created_at", "rating / 5.0"),
+]
+# When this process last refreshed from a page view (see get_trending_movies)
+_trending_refresh_attempted_at = 0.0
+
+def refresh_trending_movies():
     """
-    Fetches trending movies with a multi-level fallback system.
-    1. Tries most-watched movies in the last 30 days.
-    2. If none, tries most-watched movies of all time.
-    3. If still none, falls back to the highest-rated movies.
+    Recomputes the time-decayed trending ranking and replaces the contents of
+    trending_movies in one transaction. Falls back to the newest movies when there
+    is no recent activity. Guarded by a MySQL named lock like the dashboard rollup.
+    Returns True if the table was written.
     """
     conn = get_conn()
     cursor = get_cursor(conn)
     try:
-        # 1. Try to get movies based on recent watch sessions (last 30 days)
-        cursor.execute("""
-            SELECT m.*, COUNT(ws.id) as watch_count
-            FROM movies m
-            JOIN watch_sessions ws ON m.id = ws.movie_id
-            WHERE ws.started_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-              AND m.poster_url IS NOT NULL AND m.poster_url LIKE 'http%'
-            GROUP BY m.id
-            HAVING watch_count > 0
-            ORDER BY watch_count DESC
+        cursor.execute("SELECT GET_LOCK('trending_movies', 0) AS acquired")
+        lock = cursor.fetchone()
+        if not lock or not lock['acquired']:
+            print("[TRENDING] Another process is refreshing trending movies; skipping.")
+            return False
+
+        half_life_seconds = TRENDING_HALF_LIFE_DAYS * 86400
+        events_sql = " UNION ALL ".join(
+            f"""SELECT movie_id, {weight} * POW(0.5, TIMESTAMPDIFF(SECOND, {column}, NOW()) / %s) AS score
+                FROM {table} WHERE {column} >= NOW() - INTERVAL %s DAY"""
+            for table, column, weight in TRENDING_SIGNALS
+        )
+        params = [half_life_seconds, TRENDING_LOOKBACK_DAYS] * len(TRENDING_SIGNALS)
+        cursor.execute(f"""
+            SELECT e.movie_id, SUM(e.score) AS score
+            FROM ({events_sql}) e
+            JOIN movies m ON m.id = e.movie_id
+            WHERE m.has_poster = 1
+            GROUP BY e.movie_id
+            ORDER BY score DESC
             LIMIT %s
-        """, (limit,))
-        trending_movies = cursor.fetchall()
+        """, params + [TRENDING_SIZE])
+        ranked = [(row['movie_id'], float(row['score'])) for row in cursor.fetchall()]
 
-        # 2. If no recent trending movies, get top-watched of all time
-        if not trending_movies:
-            print("No trending movies in last 30 days. Falling back to all-time watch count.")
+        if not ranked:
+            print("[TRENDING] No recent activity. Falling back to most recently added movies.")
             cursor.execute("""
-                SELECT m.*, COUNT(ws.id) as watch_count
-                FROM movies m
-                JOIN watch_sessions ws ON m.id = ws.movie_id
-                WHERE m.poster_url IS NOT NULL AND m.poster_url LIKE 'http%'
-                GROUP BY m.id
-                HAVING watch_count > 0
-                ORDER BY watch_count DESC
+                SELECT id FROM movies
+                WHERE has_poster = 1
+                ORDER BY created_at DESC
                 LIMIT %s
-            """, (limit,))
-            trending_movies = cursor.fetchall()
+            """, (TRENDING_SIZE,))
+            ranked = [(row['id'], 0.0) for row in cursor.fetchall()]
 
-        # 3. If still no movies with any watch history, get the highest-rated ones
-        if not trending_movies:
-            print("No watch history found. Falling back to top-rated movies.")
-            cursor.execute("""
-                SELECT m.*, AVG(r.rating) as avg_rating, COUNT(r.id) as review_count
-                FROM movies m
-                JOIN reviews r ON m.id = r.movie_id
-                WHERE m.poster_url IS NOT NULL AND m.poster_url LIKE 'http%'
-                GROUP BY m.id
-                HAVING COUNT(r.id) > 0
-                ORDER BY avg_rating DESC, review_count DESC
-                LIMIT %s
-            """, (limit,))
-            trending_movies = cursor.fetchall()
+        cursor.execute("DELETE FROM trending_movies")
+        cursor.executemany(
+            "INSERT INTO trending_movies (rank_position, movie_id, score) VALUES (%s, %s, %s)",
+            [(position, movie_id, score) for position, (movie_id, score) in enumerate(ranked, start=1)]
+        )
+        conn.commit()
+        invalidate_catalog_caches('trending')
+        print(f"[TRENDING] Trending movies refreshed ({len(ranked)} movies).")
+        return True
+    except Exception as e:
+        conn.rollback()
+        print(f"[TRENDING] Error refreshing trending movies: {e}")
+        return False
+    finally:
+        try:
+            cursor.execute("DO RELEASE_LOCK('trending_movies')")
+        except Exception:
+            pass
+        cursor.close()
+        conn.close()
 
-        # 4. If there are no rated movies, fall back to the most recently added movies.
-        if not trending_movies:
-            print("No rated movies found. Falling back to most recently added movies.")
-            cursor.execute("""
-                SELECT *
-                FROM movies
-                WHERE poster_url IS NOT NULL AND poster_url LIKE 'http%'
-                ORDER BY created_at DESC
-                LIMIT %s
-            """, (limit,))
-            trending_movies = cursor.fetchall()
-            
-        return trending_movies
+def start_trending_job():
+    """Starts the periodic trending materialization in this process (no-op if already running)."""
+    return scheduler.start_periodic(
+        'trending_movies', TRENDING_REFRESH_INTERVAL_SECONDS, refresh_trending_movies, run_immediately=False
+    )
+
+def _read_trending_movies(limit):
+    """Reads the materialized ranking. Returns ((movies, age_seconds), ok); an empty table is not cached."""
+    conn = get_conn()
+    cursor = get_cursor(conn)
+    try:
+        cursor.execute("""
+            SELECT m.*, t.score AS trending_score,
+                   TIMESTAMPDIFF(SECOND, t.computed_at, NOW()) AS age_seconds
+            FROM trending_movies t
+            JOIN movies m ON m.id = t.movie_id
+            WHERE t.rank_position <= %s
+            ORDER BY t.rank_position
+        """, (limit,))
+        movies = cursor.fetchall()
+        age = movies[0]['age_seconds'] if movies else None
+        return (movies, age), bool(movies)
     except Exception as err:
         print(f"Error getting trending movies: {err}")
-        return []
+        return ([], None), False
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_trending_movies(limit=10):
+    """
+    Fetches trending movies from the materialized trending_movies table (cached in
+    catalog_cache). Starts the refresh job, and refreshes synchronously if the table
+    is empty or more than two intervals old. Each process tries that at most once per
+    interval, so a stale list (or a lost lock race) does not cost every page view a
+    GET_LOCK round trip.
+    """
+    global _trending_refresh_attempted_at
+    start_trending_job()
+
+    def read():
+        return catalog_cache.get_or_compute(
+            'trending', {'limit': limit}, lambda: _read_trending_movies(limit),
+            CATALOG_CACHE_TTL_SECONDS, tags=('catalog', 'trending')
+        )
+
+    movies, age = read()
+    now = time.time()
+    if ((age is None or age > 2 * TRENDING_REFRESH_INTERVAL_SECONDS)
+            and now - _trending_refresh_attempted_at >= TRENDING_REFRESH_INTERVAL_SECONDS):
+        _trending_refresh_attempted_at = now
+        if refresh_trending_movies():
+            movies, age = read()
+    return list(movies)
+
+# --- POSTER BACKFILL ---
+# Movies without a usable poster are dropped by the recommender and the trending
+# fallback. A periodic job resolves them through modules/tmdb in batches and records
+# the outcome per movie in poster_backfill, so runs resume where the last one stopped:
+# resolved and recently not-found movies are skipped, failures are retried a few times.
+
+POSTER_BACKFILL_INTERVAL_SECONDS = 3600
+POSTER_BACKFILL_BATCH_SIZE = 200
+POSTER_BACKFILL_MAX_ATTEMPTS = 5
+POSTER_NOT_FOUND_RETRY_DAYS = 30
+# Poster URLs the app cannot display (empty, relative or the old placeholder URLs)
+MISSING_POSTER_SQL = "m.has_poster = 0"
+
+def _next_posterless_movies(cursor, after_id, limit):
+    cursor.execute(f"""
+        SELECT m.id, m.title, m.release_year
+        FROM movies m
+        LEFT JOIN poster_backfill b ON b.movie_id = m.id
+        WHERE m.id > %s AND {MISSING_POSTER_SQL}
+          AND (b.movie_id IS NULL
+               OR (b.status = 'failed' AND b.attempts < %s)
+               OR (b.status = 'not_found' AND b.updated_at < NOW() - INTERVAL %s DAY))
+        ORDER BY m.id
+        LIMIT %s
+    """, (after_id, POSTER_BACKFILL_MAX_ATTEMPTS, POSTER_NOT_FOUND_RETRY_DAYS, limit))
+    return cursor.fetchall()
+
+def _write_poster_batch(cursor, movies, posters):
+    """Writes resolved posters with one UPDATE and records every outcome. Does not commit."""
+    found = [(movie['id'], posters[(movie['title'], movie['release_year'])]) for movie in movies
+             if posters.get((movie['title'], movie['release_year']))]
+    if found:
+        cases = " ".join(["WHEN %s THEN %s"] * len(found))
+        placeholders = ", ".join(["%s"] * len(found))
+        cursor.execute(
+            f"UPDATE movies SET poster_url = CASE id {cases} END WHERE id IN ({placeholders})",
+            [value for pair in found for value in pair] + [movie_id for movie_id, _ in found]
+        )
+    outcomes = []
+    for movie in movies:
+        key = (movie['title'], movie['release_year'])
+        if key not in posters:
+            outcomes.append((movie['id'], 'failed', 'TMDb lookup failed'))
+        else:
+            outcomes.append((movie['id'], 'resolved' if posters[key] else 'not_found', None))
+    cursor.executemany(
+        """
+        INSERT INTO poster_backfill (movie_id, status, last_error) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE status = VALUES(status), last_error = VALUES(last_error), attempts = attempts + 1
+        """,
+        outcomes
+    )
+    return len(found)
+
+def backfill_missing_posters(batch_size=POSTER_BACKFILL_BATCH_SIZE, max_batches=None):
+    """
+    Resolves posters for movies without one, one batch (one transaction) at a time.
+    Guarded by a MySQL named lock so only one process runs it.
+    Returns {'scanned', 'resolved', 'not_found', 'failed'} for this run, or None if skipped.
+    """
+    api_key = tmdb.get_api_key()
+    if not api_key:
+        print("[POSTERS] No TMDb API key configured; skipping poster backfill.")
+        return None
+    conn = get_conn()
+    cursor = get_cursor(conn)
+    summary = {'scanned': 0, 'resolved': 0, 'not_found': 0, 'failed': 0}
+    try:
+        cursor.execute("SELECT GET_LOCK('poster_backfill', 0) AS acquired")
+        lock = cursor.fetchone()
+        if not lock or not lock['acquired']:
+            print("[POSTERS] Another process is backfilling posters; skipping.")
+            return None
+
+        last_id, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            movies = _next_posterless_movies(cursor, last_id, batch_size)
+            if not movies:
+                break
+            posters = tmdb.resolve_posters([(m['title'], m['release_year']) for m in movies], api_key=api_key)
+            resolved = _write_poster_batch(cursor, movies, posters)
+            conn.commit()
+            if resolved:
+                invalidate_catalog_caches()
+            summary['scanned'] += len(movies)
+            summary['resolved'] += resolved
+            summary['failed'] += sum(1 for m in movies if (m['title'], m['release_year']) not in posters)
+            summary['not_found'] = summary['scanned'] - summary['resolved'] - summary['failed']
+            last_id = movies[-1]['id']
+            batches += 1
+        print(f"[POSTERS] Backfill run: {summary}")
+        return summary
+    except Exception as e:
+        conn.rollback()
+        print(f"[POSTERS] Error backfilling posters: {e}")
+        return summary
+    finally:
+        try:
+            cursor.execute("DO RELEASE_LOCK('poster_backfill')")
+        except Exception:
+            pass
+        cursor.close()
+        conn.close()
+
+def start_poster_backfill_job(run_now=False):
+    """Starts the periodic poster backfill in this process (no-op if already running)."""
+    started = scheduler.start_periodic('poster_backfill', POSTER_BACKFILL_INTERVAL_SECONDS, backfill_missing_posters)
+    if run_now and not started:
+        scheduler.run_now('poster_backfill')
+    return started
+
+def get_poster_backfill_status():
+    """Returns how many movies still lack a poster and the backfill outcomes recorded so far."""
+    conn = get_conn()
+    cursor = get_cursor(conn)
+    status = {'missing': 0, 'resolved': 0, 'not_found': 0, 'failed': 0, 'job': scheduler.job_status().get('poster_backfill')}
+    try:
+        cursor.execute(f"SELECT COUNT(*) AS missing FROM movies m WHERE {MISSING_POSTER_SQL}")
+        status['missing'] = cursor.fetchone()['missing']
+        cursor.execute("SELECT status, COUNT(*) AS n FROM poster_backfill GROUP BY status")
+        for row in cursor.fetchall():
+            status[row['status']] = row['n']
+    except Exception as e:
+        print(f"[POSTERS] Error reading backfill status: {e}")
     finally:
         cursor.close()
         conn.close()
+    return status
+
+# --- METADATA SYNC ---
+# Fills in what the catalog files lack (trailers, spoken languages, keywords, and cast or
+# genres when empty) from TMDb's details endpoint, in batches. Values entered by admins
+# are never overwritten; keywords feed the recommender. Movies TMDb does not know are
+# marked synced too, and everything is refreshed after METADATA_RESYNC_DAYS.
+
+METADATA_SYNC_INTERVAL_SECONDS = 3600
+METADATA_SYNC_BATCH_SIZE = 100
+METADATA_RESYNC_DAYS = 90
+
+def _next_unsynced_movies(cursor, after_id, limit):
+    cursor.execute("""
+        SELECT id, title, release_year, tmdb_id
+        FROM movies
+        WHERE id > %s AND (metadata_synced_at IS NULL OR metadata_synced_at < NOW() - INTERVAL %s DAY)
+        ORDER BY id
+        LIMIT %s
+    """, (after_id, METADATA_RESYNC_DAYS, limit))
+    return cursor.fetchall()
+
+def _write_metadata_batch(cursor, movies, metadata):
+    """Writes fetched metadata with one executemany and resyncs tags. Does not commit."""
+    def fill(column):
+        return f"{column} = IF({column} IS NULL OR {column} = '', %s, {column})"
+
+    rows = []
+    for movie in movies:
+        key = (movie['title'], movie['release_year'], movie['tmdb_id'])
+        if key not in metadata:
+            continue  # Lookup failed; retried on the next run
+        meta = metadata[key] or {}
+        rows.append((
+            meta.get('tmdb_id'), meta.get('keywords') or None,
+            meta.get('trailer_url'), (meta.get('audio_languages') or '')[:255] or None,
+            (meta.get('genre') or '')[:100] or None, meta.get('cast') or None,
+            meta.get('poster_url'), movie['id'],
+        ))
+    if not rows:
+        return 0
+    cursor.executemany(f"""
+        UPDATE movies SET
+            tmdb_id = COALESCE(%s, tmdb_id),
+            keywords = COALESCE(%s, keywords),
+            {fill('trailer_url')},
+            {fill('audio_languages')},
+            {fill('genre')},
+            {fill('cast')},
+            poster_url = IF(has_poster, poster_url, COALESCE(%s, poster_url)),
+            metadata_synced_at = NOW()
+        WHERE id = %s
+    """, rows)
+    placeholders = ", ".join(["%s"] * len(rows))
+    cursor.execute(f"SELECT id, genre, audio_languages FROM movies WHERE id IN ({placeholders})", [row[-1] for row in rows])
+    _sync_movie_tags(cursor, [(r['id'], r['genre'], r['audio_languages']) for r in cursor.fetchall()])
+    return len(rows)
+
+def sync_movie_metadata(batch_size=METADATA_SYNC_BATCH_SIZE, max_batches=None):
+    """
+    Fetches TMDb metadata for movies not synced recently, one batch (one transaction) at
+    a time. Guarded by a MySQL named lock so only one process runs it.
+    Returns {'scanned', 'synced', 'not_found', 'failed'} for this run, or None if skipped.
+    """
+    api_key = tmdb.get_api_key()
+    if not api_key:
+        print("[METADATA] No TMDb API key configured; skipping metadata sync.")
+        return None
+    conn = get_conn()
+    cursor = get_cursor(conn)
+    summary = {'scanned': 0, 'synced': 0, 'not_found': 0, 'failed': 0}
+    written_total = 0
+    try:
+        cursor.execute("SELECT GET_LOCK('metadata_sync', 0) AS acquired")
+        lock = cursor.fetchone()
+        if not lock or not lock['acquired']:
+            print("[METADATA] Another process is syncing metadata; skipping.")
+            return None
+
+        last_id, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            movies = _next_unsynced_movies(cursor, last_id, batch_size)
+            if not movies:
+                break
+            metadata = tmdb.fetch_metadata_bulk([(m['title'], m['release_year'], m['tmdb_id']) for m in movies], api_key=api_key)
+            written = _write_metadata_batch(cursor, movies, metadata)
+            conn.commit()
+            written_total += written
+            if written:
+                invalidate_catalog_caches()
+            summary['scanned'] += len(movies)
+            summary['not_found'] += sum(1 for value in metadata.values() if value is None)
+            summary['failed'] += len(movies) - written
+            summary['synced'] = summary['scanned'] - summary['not_found'] - summary['failed']
+            last_id = movies[-1]['id']
+            batches += 1
+        print(f"[METADATA] Sync run: {summary}")
+        return summary
+    except Exception as e:
+        conn.rollback()
+        print(f"[METADATA] Error syncing metadata: {e}")
+        return summary
+    finally:
+        try:
+            cursor.execute("DO RELEASE_LOCK('metadata_sync')")
+        except Exception:
+            pass
+        cursor.close()
+        conn.close()
+        # Keywords, genres and cast feed the recommendation model: rebuild it once per run, not per batch
+        if written_total:
+            invalidate_catalog_caches('model')
+
+def start_metadata_sync_job(run_now=False):
+    """Starts the periodic metadata sync in this process (no-op if already running)."""
+    started = scheduler.start_periodic('metadata_sync', METADATA_SYNC_INTERVAL_SECONDS, sync_movie_metadata)
+    if run_now and not started:
+        scheduler.run_now('metadata_sync')
+    return started
 
 def update_movie_poster(movie_id, new_poster_url):
     """Updates the poster URL for a specific movie."""
@@ -1724,6 +3127,7 @@ def update_movie_poster(movie_id, new_poster_url):
             (new_poster_url, movie_id)
         )
         conn.commit()
+        invalidate_catalog_caches()
         print(f"Update executed. Rows affected: {cursor.rowcount}")
         return cursor.rowcount > 0
     except Exception as e:
@@ -1743,6 +3147,7 @@ def add_recommendation_feedback(user_id, movie_id, feedback='not_interested'):
             (user_id, movie_id, feedback)
         )
         conn.commit()
+        invalidate_user_caches(user_id)
         return True
     except Exception as err:
         if err.errno == 1062: # Duplicate entry
@@ -1754,7 +3159,10 @@ def add_recommendation_feedback(user_id, movie_id, feedback='not_interested'):
         conn.close()
 
 def get_user_recommendation_feedback_ids(user_id):
-    """Gets all movie IDs a user has marked as not interested."""
+    """Gets all movie IDs a user has marked as not interested (cached until the user's next write)."""
+    return list(_cached_for_user('recommendation_feedback', user_id, lambda: _query_recommendation_feedback_ids(user_id), tags=()))
+
+def _query_recommendation_feedback_ids(user_id):
     conn = get_conn()
     cursor = get_cursor(conn)
     try:
@@ -1763,10 +3171,10 @@ def get_user_recommendation_feedback_ids(user_id):
             (user_id,)
         )
         excluded_ids = [row['movie_id'] for row in cursor.fetchall()]
-        return excluded_ids
+        return excluded_ids, True
     except Exception as err:
         print(f"Database error fetching feedback: {err}")
-        return []
+        return [], False
     finally:
         cursor.close()
         conn.close()
@@ -1774,7 +3182,11 @@ def get_user_recommendation_feedback_ids(user_id):
 def get_reviews_for_user(user_id):
     """
     Retrieves all reviews written by a specific user, including movie details.
+    Cached until the user's next write.
     """
+    return list(_cached_for_user('user_reviews', user_id, lambda: _query_reviews_for_user(user_id)))
+
+def _query_reviews_for_user(user_id):
     conn = get_conn()
     cursor = get_cursor(conn)
     try:
@@ -1788,10 +3200,10 @@ def get_reviews_for_user(user_id):
             ''',
             (user_id,)
         )
-        return cursor.fetchall()
+        return cursor.fetchall(), True
     except Exception as e:
         print(f"Error fetching user reviews: {e}")
-        return []
+        return [], False
     finally:
         cursor.close()
         conn.close()
@@ -1800,40 +3212,22 @@ def get_user_badges(user_id):
     """
     Returns a list of badges/achievements for the user based on their activity.
     """
+    profile = get_user_profile(user_id)
     badges = []
-    conn = get_conn()
-    cursor = get_cursor(conn)
-    try:
-        # First Watch
-        cursor.execute("SELECT COUNT(*) as cnt FROM history WHERE user_id = %s", (user_id,))
-        watched_count = cursor.fetchone()['cnt']
-        if watched_count >= 1:
-            badges.append({'name': 'First Watch', 'description': 'Watched your first movie/series!'})
-        # 10 Movies Watched
-        if watched_count >= 10:
-            badges.append({'name': '10 Movies Watched', 'description': 'Watched 10 or more movies/series!'})
-        # First Review
-        cursor.execute("SELECT COUNT(*) as cnt FROM reviews WHERE user_id = %s", (user_id,))
-        review_count = cursor.fetchone()['cnt']
-        if review_count >= 1:
-            badges.append({'name': 'First Review', 'description': 'Wrote your first review!'})
-        # Genre Master (watched 5+ in a genre)
-        cursor.execute('''
-            SELECT m.genre, COUNT(*) as cnt
-            FROM history h
-            JOIN movies m ON h.movie_id = m.id
-            WHERE h.user_id = %s AND m.genre IS NOT NULL AND m.genre != ''
-            GROUP BY m.genre
-        ''', (user_id,))
-        for row in cursor.fetchall():
-            if row['cnt'] >= 5:
-                badges.append({'name': f"{row['genre']} Master", 'description': f"Watched 5+ in {row['genre']} genre!"})
-    except Exception as e:
-        print(f"Error fetching badges: {e}")
-    finally:
-        cursor.close()
-        conn.close()
-    return badges 
+    # First Watch
+    if profile['history_rows'] >= 1:
+        badges.append({'name': 'First Watch', 'description': 'Watched your first movie/series!'})
+    # 10 Movies Watched
+    if profile['history_rows'] >= 10:
+        badges.append({'name': '10 Movies Watched', 'description': 'Watched 10 or more movies/series!'})
+    # First Review
+    if profile['total_reviews'] >= 1:
+        badges.append({'name': 'First Review', 'description': 'Wrote your first review!'})
+    # Genre Master (watched 5+ in a genre)
+    for genre, count in profile['genres']:
+        if count >= 5:
+            badges.append({'name': f"{genre} Master", 'description': f"Watched 5+ in {genre} genre!"})
+    return badges
 
 def update_user_profile_custom(user_id, profile_pic, bio, favorite_genres):
     """
@@ -1865,7 +3259,11 @@ def get_continue_watching(user_id):
     """
     Returns a list of movies/series the user started but has not finished.
     Includes active watch sessions (no ended_at) or history status not 'watched'.
+    Cached until the user's next write.
     """
+    return list(_cached_for_user('continue_watching', user_id, lambda: _query_continue_watching(user_id)))
+
+def _query_continue_watching(user_id):
     conn = get_conn()
     cursor = get_cursor(conn)
     try:
@@ -1892,40 +3290,56 @@ def get_continue_watching(user_id):
             if m['id'] not in seen:
                 result.append(m)
                 seen.add(m['id'])
-        return result
+        return result, True
     except Exception as e:
         print(f"Error fetching continue watching: {e}")
-        return []
+        return [], False
     finally:
         cursor.close()
         conn.close()
 
 def get_watchlist_count(movie_id):
-    """Return the number of users who have added the movie to their watchlist."""
+    """Return the number of users who have added the movie to their watchlist (cached per movie)."""
+    return _cached_for_movie('watchlist_count', movie_id, lambda: _query_watchlist_count(movie_id), tags=('watchlist',))
+
+def _query_watchlist_count(movie_id):
     conn = get_conn()
     cursor = get_cursor(conn)
     try:
-        cursor.execute("SELECT COUNT(*) FROM watchlist WHERE movie_id = %s", (movie_id,))
-        count = cursor.fetchone()[0]
-        return count
+        cursor.execute("SELECT COUNT(*) AS n FROM watchlist WHERE movie_id = %s", (movie_id,))
+        count = cursor.fetchone()['n']
+        return count, True
     except Exception as e:
         print(f"[DB] get_watchlist_count error: {e}")
-        return 0
+        return 0, False
     finally:
         cursor.close()
         conn.close()
 
 def get_review_count(movie_id):
-    """Return the number of reviews for the movie."""
+    """Return the number of reviews for the movie (cached per movie)."""
+    return _cached_for_movie('review_count', movie_id, lambda: _query_review_count(movie_id), tags=('ratings',))
+
+def _query_review_count(movie_id):
     conn = get_conn()
     cursor = get_cursor(conn)
     try:
-        cursor.execute("SELECT COUNT(*) FROM ratings WHERE movie_id = %s AND review IS NOT NULL AND review != ''", (movie_id,))
-        count = cursor.fetchone()[0]
-        return count
+        cursor.execute("SELECT COUNT(*) AS n FROM ratings WHERE movie_id = %s AND review IS NOT NULL AND review != ''", (movie_id,))
+        count = cursor.fetchone()['n']
+        return count, True
     except Exception as e:
         print(f"[DB] get_review_count error: {e}")
-        return 0
+        return 0, False
     finally:
         cursor.close()
-        conn.close() 
\ No newline at end of file
+        conn.close()
+
+# --- INSTRUMENTATION ---
+# Connection acquire time and open connections are always exported via modules.metrics.
+get_conn = metrics.tracked_connect(get_conn)
+
+# When DB_INSTRUMENTATION is on, time connection setup and every function that
+# talks to the database; per-statement timings come from get_cursor().
+if instrumentation.ENABLED:
+    get_conn = instrumentation.timed_connect(get_conn)
+    instrumentation.instrument_module(globals(), exclude={'get_conn', 'get_cursor'})
@@ -0,0 +1,228 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from modules import tmdb
+
+# Pillow is imported on first use (it loads numpy), keeping it out of app startup
+
+# --- Configuration ---
+IMAGE_CACHE_DIR = os.environ.get("IMAGE_CACHE_DIR", os.path.join(".cache", "images"))
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get("IMAGE_CACHE_MAX_MB", "512")) * 1024 * 1024
+# Cards in the 3-5 column grid are at most ~340 CSS px wide
+THUMBNAIL_WIDTH = 342
+THUMBNAIL_QUALITY = 80
+FETCH_TIMEOUT_SECONDS = 10
+FETCH_WORKERS = 8
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+# Broken URLs are not retried on every rerun
+FAILURE_TTL_SECONDS = 600
+
+_thumbnail_format = None
+_lock = threading.Lock()
+_url_locks = {}
+_failures = {}  # url -> retry_after
+_cache_bytes = None  # Running total of the thumbnail store, computed lazily
+# Misses seen while rendering are downloaded here, off the script thread
+_background = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="image-cache")
+_pending = set()
+
+def thumbnail_format():
+    """WEBP if Pillow was built with WebP support, else JPEG."""
+    global _thumbnail_format
+    if _thumbnail_format is None:
+        from PIL import features
+        _thumbnail_format = "WEBP" if features.check("webp") else "JPEG"
+    return _thumbnail_format
+
+def _extension():
+    return "webp" if thumbnail_format() == "WEBP" else "jpg"
+
+def _url_key(url, width):
+    return hashlib.sha1(f"{width}|{url}".encode("utf-8")).hexdigest()
+
+def _index_path(url, width):
+    return os.path.join(IMAGE_CACHE_DIR, "urls", _url_key(url, width))
+
+def _thumb_path(digest, width):
+    return os.path.join(IMAGE_CACHE_DIR, "thumbs", digest[:2], f"{digest}-{width}.{_extension()}")
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def make_thumbnail(data, width=THUMBNAIL_WIDTH):
+    """
+    Returns `data` (any Pillow-readable image) resized to `width` px wide, encoded as
+    thumbnail_format(). Raises OSError or ValueError for unreadable or oversized images.
+    """
+    from PIL import Image
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert("RGB")
+            if image.width > width:
+                image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+            out = io.BytesIO()
+            if thumbnail_format() == "WEBP":
+                image.save(out, "WEBP", quality=THUMBNAIL_QUALITY, method=4)
+            else:
+                image.save(out, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+            return out.getvalue()
+    except Image.DecompressionBombError as e:
+        raise ValueError(str(e)) from e
+
+def _lookup(url, width):
+    """Returns the cached thumbnail path for a URL, touching it for LRU, or None."""
+    try:
+        with open(_index_path(url, width), "r") as f:
+            path = _thumb_path(f.read().strip(), width)
+        os.utime(path)
+        return path
+    except OSError:
+        return None
+
+def _store(url, width, data):
+    """Stores a thumbnail under the hash of its content and points the URL index at it."""
+    global _cache_bytes
+    digest = hashlib.sha256(data).hexdigest()
+    path = _thumb_path(digest, width)
+    if not os.path.exists(path):
+        _write_atomic(path, data)
+        with _lock:
+            if _cache_bytes is not None:
+                _cache_bytes += len(data)
+    _write_atomic(_index_path(url, width), digest.encode("ascii"))
+    return path
+
+def evict(max_bytes=None):
+    """Deletes the least recently used thumbnails until the store fits in `max_bytes`."""
+    global _cache_bytes
+    max_bytes = IMAGE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    for root, _, files in os.walk(os.path.join(IMAGE_CACHE_DIR, "thumbs")):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+    # URL index entries pointing at evicted files are treated as misses by _lookup
+    with _lock:
+        _cache_bytes = total
+    return total
+
+def _maybe_evict():
+    global _cache_bytes
+    with _lock:
+        known = _cache_bytes
+    if known is None or known > IMAGE_CACHE_MAX_BYTES:
+        evict()
+
+def poster_path(url, width=THUMBNAIL_WIDTH):
+    """
+    Returns a local thumbnail path for a remote poster URL, downloading and resizing it
+    on first use, or None if the URL cannot be fetched or decoded (retried after
+    FAILURE_TTL_SECONDS). Downloads reuse the pooled TMDb HTTP session.
+    """
+    if not url or not isinstance(url, str) or not url.strip().startswith("http"):
+        return None
+    url = url.strip()
+    path = _lookup(url, width)
+    if path:
+        return path
+    if _failures.get(url, 0) > time.time():
+        return None
+
+    with _lock:
+        url_lock = _url_locks.setdefault(url, threading.Lock())
+    try:
+        with url_lock:
+            # Another thread may have fetched it while we waited
+            path = _lookup(url, width)
+            if path:
+                return path
+            try:
+                response = tmdb.get_session().get(url, timeout=FETCH_TIMEOUT_SECONDS)
+                response.raise_for_status()
+                if len(response.content) > MAX_SOURCE_BYTES:
+                    raise ValueError("image too large")
+                path = _store(url, width, make_thumbnail(response.content, width))
+            except (requests.exceptions.RequestException, OSError, ValueError) as e:
+                print(f"[IMAGES] Could not cache {url}: {e}")
+                _failures[url] = time.time() + FAILURE_TTL_SECONDS
+                return None
+    finally:
+        with _lock:
+            _url_locks.pop(url, None)
+    _maybe_evict()
+    return path
+
+def _fetch_in_background(url, width):
+    try:
+        poster_path(url, width)
+    finally:
+        with _lock:
+            _pending.discard((url, width))
+
+def poster_source(url, width=THUMBNAIL_WIDTH):
+    """
+    Returns what a card should show for a poster URL without waiting for a download:
+    the cached thumbnail path, or on a miss the remote URL itself (the browser fetches
+    it) while the thumbnail is cached in the background for the next render.
+    Returns None for unusable URLs and for recent failures.
+    """
+    if not url or not isinstance(url, str) or not url.strip().startswith("http"):
+        return None
+    url = url.strip()
+    path = _lookup(url, width)
+    if path:
+        return path
+    if _failures.get(url, 0) > time.time():
+        return None
+    with _lock:
+        if (url, width) not in _pending:
+            _pending.add((url, width))
+            _background.submit(_fetch_in_background, url, width)
+    return url
+
+def prefetch(urls, width=THUMBNAIL_WIDTH, workers=FETCH_WORKERS):
+    """Caches the posters of a page concurrently, so the grid renders from local files."""
+    urls = [url for url in dict.fromkeys(urls) if url and isinstance(url, str) and _lookup(url.strip(), width) is None]
+    if not urls:
+        return
+    with ThreadPoolExecutor(max_workers=min(workers, len(urls)), thread_name_prefix="image-cache") as pool:
+        list(pool.map(lambda url: poster_path(url, width), urls))
+
+def placeholder_path(width=THUMBNAIL_WIDTH):
+    """Returns a locally generated "no poster" image (2:3, like TMDb posters)."""
+    path = os.path.join(IMAGE_CACHE_DIR, f"placeholder-{width}.{_extension()}")
+    if not os.path.exists(path):
+        from PIL import Image, ImageDraw
+        height = width * 3 // 2
+        image = Image.new("RGB", (width, height), (46, 46, 46))
+        draw = ImageDraw.Draw(image)
+        text = "No Poster"
+        left, top, right, bottom = draw.textbbox((0, 0), text)
+        draw.text(((width - (right - left)) / 2, (height - (bottom - top)) / 2), text, fill=(255, 255, 255))
+        out = io.BytesIO()
+        image.save(out, thumbnail_format(), quality=THUMBNAIL_QUALITY)
+        _write_atomic(path, out.getvalue())
+    return path
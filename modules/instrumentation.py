@@ -0,0 +1,234 @@
+import functools
+import os
+import re
+import threading
+import time
+from collections import deque
+
+# --- Configuration (per environment) ---
+# DB_INSTRUMENTATION=1 turns timing on; DB_SLOW_QUERY_MS sets the slow-statement
+# threshold; DB_EXPLAIN_SLOW=0 disables EXPLAIN capture for slow SELECTs.
+ENABLED = os.environ.get("DB_INSTRUMENTATION", "0").lower() in ("1", "true", "yes", "on")
+SLOW_QUERY_MS = float(os.environ.get("DB_SLOW_QUERY_MS", "200"))
+EXPLAIN_SLOW = os.environ.get("DB_EXPLAIN_SLOW", "1").lower() in ("1", "true", "yes", "on")
+
+# Latency bucket upper bounds in milliseconds (the last bucket is +Inf)
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SLOW_LOG_SIZE = 100
+
+class Histogram:
+    """A fixed-bucket latency histogram (milliseconds) that is safe to share across threads."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms):
+        index = len(BUCKETS_MS)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def percentile(self, pct):
+        """Approximates a percentile as the upper bound of the bucket that contains it."""
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100.0
+        running = 0
+        for i, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target:
+                return float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 3),
+            'buckets': list(zip([str(b) for b in BUCKETS_MS] + ['+Inf'], self.counts)),
+        }
+
+# --- In-process registry ---
+_registry_lock = threading.Lock()
+functions = {}     # name -> {'latency': Histogram, 'errors': int}
+statements = {}    # normalized SQL -> {'latency': Histogram, 'rows': int}
+connection_acquire = Histogram()
+slow_queries = deque(maxlen=SLOW_LOG_SIZE)
+
+def normalize_sql(sql):
+    """Collapses whitespace and IN-lists so identical statements share one registry entry."""
+    sql = " ".join(str(sql).split())
+    sql = re.sub(r"IN \((?:%s, )*%s\)", "IN (...)", sql)
+    return sql[:500]
+
+def _function_entry(name):
+    entry = functions.get(name)
+    if entry is None:
+        with _registry_lock:
+            entry = functions.setdefault(name, {'latency': Histogram(), 'errors': 0})
+    return entry
+
+def _statement_entry(sql):
+    entry = statements.get(sql)
+    if entry is None:
+        with _registry_lock:
+            entry = statements.setdefault(sql, {'latency': Histogram(), 'rows': 0})
+    return entry
+
+def record_statement(sql, ms, rows):
+    """Records one executed statement; returns True if it crossed the slow threshold."""
+    key = normalize_sql(sql)
+    entry = _statement_entry(key)
+    entry['latency'].observe(ms)
+    if rows and rows > 0:
+        entry['rows'] += rows
+    return ms >= SLOW_QUERY_MS
+
+def instrument_function(func, name=None):
+    """Wraps a function so each call's latency (and failures) are recorded."""
+    entry_name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        entry = _function_entry(entry_name)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            entry['errors'] += 1
+            raise
+        finally:
+            entry['latency'].observe((time.perf_counter() - started) * 1000)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+def instrument_module(namespace, uses=("get_conn",), exclude=()):
+    """
+    Wraps every function in a module namespace (e.g. `globals()`) that opens database
+    connections, i.e. whose code references one of the names in `uses`.
+    """
+    module_name = namespace.get('__name__')
+    for name, value in list(namespace.items()):
+        if not callable(value) or name in exclude or getattr(value, '__instrumented__', False):
+            continue
+        code = getattr(value, '__code__', None)
+        if code is None or getattr(value, '__module__', None) != module_name:
+            continue
+        if any(used in code.co_names for used in uses):
+            namespace[name] = instrument_function(value)
+
+def timed_connect(connect):
+    """Wraps a connection factory so connection acquire time is recorded."""
+
+    @functools.wraps(connect)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return connect(*args, **kwargs)
+        finally:
+            connection_acquire.observe((time.perf_counter() - started) * 1000)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+class InstrumentedCursor:
+    """
+    Cursor proxy that times execute/executemany and records row counts.
+    Slow SELECTs are logged and, when enabled, EXPLAINed on the same connection
+    when the cursor is closed (after its results have been consumed).
+    """
+
+    def __init__(self, cursor, conn):
+        self._cursor = cursor
+        self._conn = conn
+        self._explain = []
+
+    def _timed(self, method, sql, params):
+        started = time.perf_counter()
+        try:
+            return method(sql, params) if params is not None else method(sql)
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            rows = getattr(self._cursor, 'rowcount', -1)
+            if record_statement(sql, ms, rows):
+                print(f"[SLOW_QUERY] {ms:.1f} ms, {rows} row(s): {normalize_sql(sql)}")
+                entry = {'sql': normalize_sql(sql), 'ms': round(ms, 3), 'rows': rows, 'at': time.time(), 'explain': None}
+                slow_queries.append(entry)
+                if EXPLAIN_SLOW and str(sql).lstrip().upper().startswith("SELECT"):
+                    self._explain.append((entry, sql, params))
+
+    def execute(self, sql, params=None):
+        return self._timed(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, seq_params):
+        return self._timed(self._cursor.executemany, sql, seq_params)
+
+    def _run_explains(self):
+        for entry, sql, params in self._explain:
+            explain_cursor = None
+            try:
+                explain_cursor = self._conn.cursor()
+                explain_cursor.execute("EXPLAIN " + str(sql), params)
+                columns = [col[0] for col in explain_cursor.description or []]
+                plan = [dict(zip(columns, row)) if not isinstance(row, dict) else row for row in explain_cursor.fetchall()]
+                entry['explain'] = plan
+                print(f"[SLOW_QUERY] EXPLAIN: {plan}")
+            except Exception as e:
+                entry['explain'] = f"EXPLAIN failed: {e}"
+            finally:
+                if explain_cursor is not None:
+                    explain_cursor.close()
+        self._explain = []
+
+    def close(self):
+        if self._explain:
+            self._run_explains()
+        return self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+def snapshot():
+    """Returns the registry as plain dicts, slowest statements first."""
+    return {
+        'enabled': ENABLED,
+        'slow_query_ms': SLOW_QUERY_MS,
+        'connection_acquire': connection_acquire.summary(),
+        'functions': sorted(
+            ({'name': name, 'errors': entry['errors'], **entry['latency'].summary()} for name, entry in list(functions.items())),
+            key=lambda row: row['total_ms'], reverse=True
+        ),
+        'statements': sorted(
+            ({'sql': sql, 'rows': entry['rows'], **entry['latency'].summary()} for sql, entry in list(statements.items())),
+            key=lambda row: row['total_ms'], reverse=True
+        ),
+        'slow_queries': list(slow_queries),
+    }
+
+def reset():
+    """Clears all recorded measurements."""
+    global connection_acquire
+    with _registry_lock:
+        functions.clear()
+        statements.clear()
+        slow_queries.clear()
+        connection_acquire = Histogram()
@@ -0,0 +1,338 @@
+import bisect
+import functools
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules import profiling
+
+# Port for the /metrics endpoint; METRICS_PORT=0 disables the exporter.
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9102"))
+# Loopback only by default; set METRICS_HOST=0.0.0.0 to let a scraper on another host in
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+PREFIX = "movieapp_"
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+_collectors = []
+_readiness_checks = []
+_registry_lock = threading.Lock()
+_server = None
+_server_lock = threading.Lock()
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = PREFIX + name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._render_samples())
+        return lines
+
+class Counter(_Metric):
+    """A monotonically increasing count."""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self):
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in list(self._values.items())]
+
+class Gauge(_Metric):
+    """A value that can go up and down, or be computed on scrape via set_function()."""
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._functions = {}
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, func, **labels):
+        self._functions[self._key(labels)] = func
+
+    def _render_samples(self):
+        values = dict(self._values)
+        for key, func in list(self._functions.items()):
+            try:
+                values[key] = func()
+            except Exception:
+                continue
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in values.items()]
+
+class Histogram(_Metric):
+    """Bucketed observations (seconds by default) with a running sum and count."""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Context manager that observes the elapsed wall time of its block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_samples(self):
+        lines = []
+        for key, (counts, total, count) in list(self._values.items()):
+            running = 0
+            for bound, bucket_count in zip(list(self.buckets) + ["+Inf"], counts):
+                running += bucket_count
+                le = _format_labels(self.label_names, key, [("le", bound)])
+                lines.append(f"{self.name}_bucket{le} {running}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+def timed(histogram, **labels):
+    """Decorator that observes each call's latency in `histogram` with fixed labels."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, **labels)
+        return wrapper
+
+    return decorator
+
+class SectionTimer:
+    """
+    Times consecutive sections of a page render without re-indenting them:
+    each start() closes the previous section; stop() closes the last one.
+    Timings also go to the rerun profiler when one is active (modules.profiling).
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self._section = None
+        self._started = 0.0
+
+    def start(self, section):
+        self.stop()
+        self._section = section
+        self._started = time.perf_counter()
+
+    def stop(self):
+        if self._section is not None:
+            elapsed = time.perf_counter() - self._started
+            section_seconds.observe(elapsed, page=self.page, section=self._section)
+            profiling.record_section(self.page, self._section, self._started, elapsed)
+            self._section = None
+
+def register_collector(func):
+    """Registers a callable returning extra exposition lines, evaluated on each scrape."""
+    with _registry_lock:
+        if func not in _collectors:
+            _collectors.append(func)
+
+def render():
+    """Returns every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in list(_registry):
+        lines.extend(metric.render())
+    for collector in list(_collectors):
+        try:
+            lines.extend(collector())
+        except Exception as e:
+            lines.append(f"# collector {getattr(collector, '__name__', collector)} failed: {e}")
+    return "\n".join(lines) + "\n"
+
+def register_readiness_check(func):
+    """Registers a callable returning (ready, detail), evaluated on each GET /ready."""
+    with _registry_lock:
+        if func not in _readiness_checks:
+            _readiness_checks.append(func)
+
+def readiness():
+    """Returns (ready, detail lines): ready only if every registered check is."""
+    ready, lines = True, []
+    for check in list(_readiness_checks):
+        try:
+            ok, detail = check()
+        except Exception as e:
+            ok, detail = False, f"check {getattr(check, '__name__', check)} failed: {e}"
+        ready = ready and bool(ok)
+        lines.append(detail)
+    return ready, lines
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/ready":
+            # For health checks: 503 until the process can serve traffic at full speed
+            ready, lines = readiness()
+            self._send(200 if ready else 503, "\n".join(["ready" if ready else "not ready"] + lines) + "\n",
+                       "text/plain; charset=utf-8")
+            return
+        if path != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        self._send(200, render(), "text/plain; version=0.0.4; charset=utf-8")
+
+    def _send(self, status, text, content_type):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are frequent; keep them out of the Streamlit log
+        pass
+
+def start_http_server(port=None, host=None):
+    """
+    Serves /metrics and /ready from a daemon thread (once per process). Returns the server, or
+    None if the exporter is disabled or the port is already taken by another process.
+    """
+    global _server
+    port = METRICS_PORT if port is None else port
+    if not port:
+        return None
+    if _server is not None:
+        return _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        try:
+            server = ThreadingHTTPServer((host or METRICS_HOST, port), _MetricsHandler)
+        except OSError as e:
+            print(f"[METRICS] Could not start exporter on port {port}: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+        _server = server
+        print(f"[METRICS] Exporter listening on {host or METRICS_HOST}:{server.server_address[1]}/metrics")
+        return _server
+
+# --- Application metrics ---
+section_seconds = Histogram("section_render_seconds", "Time spent rendering each section of a page.", ["page", "section"])
+recommender_seconds = Histogram("recommender_seconds", "Recommender latency by operation.", ["operation"])
+db_connect_seconds = Histogram("db_connect_seconds", "Time to acquire a database connection.")
+db_connections_in_use = Gauge("db_connections_in_use", "Database connections currently checked out.")
+db_connect_failures = Counter("db_connect_failures_total", "Failed attempts to acquire a database connection.")
+cache_requests = Counter("cache_requests_total", "Cache lookups by cache and result (hit/miss).", ["cache", "result"])
+tmdb_request_seconds = Histogram("tmdb_request_seconds", "TMDb API call latency.", ["endpoint", "outcome"])
+
+def tracked_connect(connect):
+    """
+    Wraps a connection factory to record acquire latency, failures and the number of
+    connections currently open (decremented when the connection object is released).
+    """
+
+    @functools.wraps(connect)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            conn = connect(*args, **kwargs)
+        except Exception:
+            db_connect_failures.inc()
+            raise
+        finally:
+            db_connect_seconds.observe(time.perf_counter() - started)
+        try:
+            weakref.finalize(conn, db_connections_in_use.dec)
+            db_connections_in_use.inc()
+        except TypeError:
+            pass
+        return conn
+
+    return wrapper
+
+def _collect_database():
+    """Exports the modules.instrumentation registry (only populated when DB_INSTRUMENTATION is on)."""
+    from modules import activity_logger, instrumentation
+
+    lines = [
+        f"# HELP {PREFIX}activity_log_pending Activity events waiting to be written.",
+        f"# TYPE {PREFIX}activity_log_pending gauge",
+        f"{PREFIX}activity_log_pending {activity_logger.pending()}",
+        f"# HELP {PREFIX}activity_log_events_total Activity events by outcome.",
+        f"# TYPE {PREFIX}activity_log_events_total counter",
+    ]
+    for outcome in ('enqueued', 'written', 'dropped'):
+        lines.append(f'{PREFIX}activity_log_events_total{{outcome="{outcome}"}} {activity_logger.stats[outcome]}')
+    if not instrumentation.ENABLED:
+        return lines
+
+    name = f"{PREFIX}db_function_seconds"
+    lines += [f"# HELP {name} Latency of modules.database functions.", f"# TYPE {name} histogram"]
+    for row in instrumentation.snapshot()['functions']:
+        running = 0
+        for bound, count in row['buckets']:
+            running += count
+            le = bound if bound == '+Inf' else float(bound) / 1000
+            lines.append(f'{name}_bucket{_format_labels(("function", "le"), (row["name"], le))} {running}')
+        lines.append(f'{name}_sum{_format_labels(("function",), (row["name"],))} {row["total_ms"] / 1000}')
+        lines.append(f'{name}_count{_format_labels(("function",), (row["name"],))} {row["count"]}')
+    lines += [f"# HELP {PREFIX}db_function_errors_total Failed calls of modules.database functions.",
+              f"# TYPE {PREFIX}db_function_errors_total counter"]
+    for row in instrumentation.snapshot()['functions']:
+        lines.append(f'{PREFIX}db_function_errors_total{_format_labels(("function",), (row["name"],))} {row["errors"]}')
+    lines += [f"# HELP {PREFIX}db_slow_queries Slow statements currently held in the slow-query log.",
+              f"# TYPE {PREFIX}db_slow_queries gauge",
+              f"{PREFIX}db_slow_queries {len(instrumentation.slow_queries)}"]
+    return lines
+
+register_collector(_collect_database)
@@ -0,0 +1,203 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+# --- Configuration ---
+# STREAMLIT_PROFILE=1 (or "sample") profiles every rerun with the sampling profiler,
+# STREAMLIT_PROFILE=cprofile uses the deterministic profiler instead. A single rerun
+# can also be profiled by opening the page with ?profile=1 (or ?profile=cprofile):
+# honoured for admins, and for everyone only when STREAMLIT_PROFILE_QUERY=1.
+PROFILE_MODE = os.environ.get("STREAMLIT_PROFILE", "").strip().lower()
+PROFILE_QUERY_FOR_ALL = os.environ.get("STREAMLIT_PROFILE_QUERY", "").strip().lower() in ("1", "true", "yes", "on")
+PROFILE_DIR = os.environ.get("STREAMLIT_PROFILE_DIR", "profiles")
+# Oldest profile files are deleted beyond this many
+PROFILE_MAX_FILES = int(os.environ.get("STREAMLIT_PROFILE_MAX_FILES", "200"))
+SAMPLE_INTERVAL_SECONDS = float(os.environ.get("STREAMLIT_PROFILE_INTERVAL_MS", "5")) / 1000
+MAX_STACK_DEPTH = 128
+
+_local = threading.local()
+
+def _normalize_mode(value):
+    value = (value or "").strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return None
+    return "cprofile" if value in ("cprofile", "deterministic") else "sample"
+
+def _is_admin(user):
+    return bool(user) and bool(user.get('is_admin') or user.get('role') == 'admin')
+
+def requested_mode():
+    """
+    Returns 'sample', 'cprofile' or None for the current rerun (env var first, then ?profile=).
+    The query parameter is removed once read, so it profiles a single rerun, and is
+    ignored unless the session is an admin's or STREAMLIT_PROFILE_QUERY is set.
+    """
+    mode = _normalize_mode(PROFILE_MODE)
+    if mode:
+        return mode
+    try:
+        import streamlit as st
+        mode = _normalize_mode(st.query_params.pop("profile", None))
+        if mode and (PROFILE_QUERY_FOR_ALL or _is_admin(st.session_state.get('user'))):
+            return mode
+    except Exception:
+        pass
+    return None
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class _Sampler(threading.Thread):
+    """Samples the call stack of one thread at a fixed interval."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name="rerun-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = []  # (timestamp, (outermost, ..., innermost))
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples.append((time.perf_counter(), tuple(reversed(stack))))
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+class RerunProfiler:
+    """
+    Profiles one script rerun. Section timings are reported by metrics.SectionTimer;
+    on exit the profile is written to PROFILE_DIR as:
+      - <page>-<timestamp>.folded: collapsed stacks (one "frame;frame;... count" per
+        line, rooted at the page section) for flamegraph.pl, speedscope or inferno
+      - <page>-<timestamp>.prof: pstats output in cprofile mode (snakeviz, flameprof)
+      - <page>-<timestamp>.json: per-section wall times and the totals
+    """
+
+    def __init__(self, page, mode="sample", output_dir=None):
+        self.page = page
+        self.mode = mode
+        self.output_dir = output_dir or PROFILE_DIR
+        self.sections = []  # (section, started, elapsed)
+        self.output_files = []
+        self._sampler = None
+        self._profile = None
+
+    def record_section(self, section, started, elapsed):
+        self.sections.append((section, started, elapsed))
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = _Sampler(threading.get_ident(), SAMPLE_INTERVAL_SECONDS)
+            self._sampler.start()
+        _local.profiler = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # st.rerun()/st.stop() end a rerun by raising; the profile is still written
+        self.elapsed = time.perf_counter() - self.started
+        _local.profiler = None
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        try:
+            self.write()
+        except OSError as e:
+            print(f"[PROFILE] Could not write profile: {e}")
+        return False
+
+    def _section_at(self, timestamp):
+        for section, started, elapsed in self.sections:
+            if started <= timestamp <= started + elapsed:
+                return section
+        return "other"
+
+    def folded_stacks(self):
+        """Aggregates samples into collapsed-stack counts, each rooted at page;section."""
+        counts = {}
+        for timestamp, stack in (self._sampler.samples if self._sampler else []):
+            key = ";".join((self.page, self._section_at(timestamp)) + stack)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def summary(self):
+        totals = {}
+        for section, _, elapsed in self.sections:
+            totals[section] = totals.get(section, 0.0) + elapsed
+        return {
+            'page': self.page,
+            'mode': self.mode,
+            'total_ms': round(self.elapsed * 1000, 3),
+            'sections_ms': {section: round(seconds * 1000, 3) for section, seconds in totals.items()},
+            'samples': len(self._sampler.samples) if self._sampler else None,
+        }
+
+    def write(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stem = os.path.join(self.output_dir, f"{self.page}-{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}")
+        if self._profile is not None:
+            self._profile.dump_stats(stem + ".prof")
+            self.output_files.append(stem + ".prof")
+        else:
+            with open(stem + ".folded", "w", encoding="utf-8") as f:
+                for stack, count in sorted(self.folded_stacks().items()):
+                    f.write(f"{stack} {count}\n")
+            self.output_files.append(stem + ".folded")
+        summary = self.summary()
+        with open(stem + ".json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        self.output_files.append(stem + ".json")
+        print(f"[PROFILE] {self.page}: {summary['total_ms']} ms {summary['sections_ms']} -> {stem}.*")
+        prune(self.output_dir)
+
+def prune(output_dir=None, max_files=None):
+    """Deletes the oldest files in the profile directory beyond max_files (PROFILE_MAX_FILES)."""
+    output_dir = output_dir or PROFILE_DIR
+    max_files = PROFILE_MAX_FILES if max_files is None else max_files
+    paths = [os.path.join(output_dir, name) for name in os.listdir(output_dir)]
+    files = sorted((os.path.getmtime(path), path) for path in paths if os.path.isfile(path))
+    for _, path in files[:max(0, len(files) - max_files)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def active():
+    """Returns the profiler running on this thread, if any."""
+    return getattr(_local, 'profiler', None)
+
+def record_section(page, section, started, elapsed):
+    """Hook for metrics.SectionTimer; forwards timings to the active profiler."""
+    profiler = active()
+    if profiler is not None:
+        profiler.record_section(section, started, elapsed)
+
+def profile_rerun(page):
+    """
+    Context manager wrapping one rerun of a page. Does nothing unless profiling was
+    requested, or when a profiler is already running (e.g. the admin panel rendered
+    from inside app.py).
+    """
+    if active() is not None:
+        return nullcontext()
+    mode = requested_mode()
+    if not mode:
+        return nullcontext()
+    return RerunProfiler(page, mode)
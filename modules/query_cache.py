@@ -0,0 +1,303 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from modules import metrics
+
+# Optional Redis client for the shared tier
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+# --- Configuration ---
+# QUERY_CACHE_SHARED selects the shared tier: "" (in-process only), "disk" or "redis".
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get("QUERY_CACHE_MAX_ENTRIES", "512"))
+QUERY_CACHE_SHARED = os.environ.get("QUERY_CACHE_SHARED", "").strip().lower()
+QUERY_CACHE_DIR = os.environ.get("QUERY_CACHE_DIR", os.path.join(".cache", "query_cache"))
+# Most files the disk tier keeps; free-text search keys would otherwise grow it forever
+QUERY_CACHE_DISK_MAX_ENTRIES = int(os.environ.get("QUERY_CACHE_DISK_MAX_ENTRIES", "4096"))
+# How often (per process) a write sweeps expired and surplus files from the disk tier
+DISK_SWEEP_SECONDS = 60
+QUERY_CACHE_REDIS_URL = os.environ.get("QUERY_CACHE_REDIS_URL", "redis://localhost:6379/0")
+# How long a process trusts its view of the shared tag versions (writes made by
+# other processes become visible after at most this long)
+TAG_SYNC_SECONDS = 5
+
+def normalize_params(params):
+    """
+    Turns keyword parameters into a stable, hashable key: empty values collapse to
+    None, strings are stripped and list-like values are sorted.
+    """
+    def norm(value):
+        if isinstance(value, str):
+            value = value.strip()
+            return value or None
+        if isinstance(value, (list, set, frozenset)):
+            return tuple(sorted(norm(v) for v in value)) or None
+        if isinstance(value, tuple):
+            return tuple(norm(v) for v in value) or None
+        return value
+    return tuple(sorted((key, norm(value)) for key, value in params.items()))
+
+def make_key(namespace, params):
+    digest = hashlib.sha1(repr(normalize_params(params)).encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}"
+
+class DiskTier:
+    """
+    Shared tier on the local filesystem (one pickle per key), usable by every process on the host.
+    Each file's mtime is set to its entry's expiry, so sweep() can drop expired files, and
+    the ones closest to expiry beyond max_entries, without unpickling them.
+    """
+
+    def __init__(self, directory=QUERY_CACHE_DIR, max_entries=QUERY_CACHE_DISK_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._swept_at = 0
+        os.makedirs(os.path.join(directory, "tags"), exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pkl")
+
+    def _write(self, path, data):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if entry[0] <= time.time():
+            self._remove(path)
+            return None
+        return entry
+
+    def set(self, key, entry, ttl):
+        path = self._path(key)
+        self._write(path, pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+        os.utime(path, (entry[0], entry[0]))
+        if time.time() - self._swept_at >= DISK_SWEEP_SECONDS:
+            self.sweep()
+
+    def sweep(self):
+        """Removes expired entries, then the ones expiring soonest until at most max_entries are left."""
+        self._swept_at = now = time.time()
+        live = []
+        try:
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if not item.is_file():
+                        continue
+                    try:
+                        expires_at = item.stat().st_mtime
+                    except OSError:
+                        continue
+                    if item.name.endswith(".tmp"):
+                        # Left behind by a writer that died mid-write
+                        if expires_at < now - DISK_SWEEP_SECONDS:
+                            self._remove(item.path)
+                    elif expires_at <= now:
+                        self._remove(item.path)
+                    else:
+                        live.append((expires_at, item.path))
+        except OSError as e:
+            print(f"[QUERY_CACHE] Disk tier sweep failed: {e}")
+            return
+        live.sort()
+        for _, path in live[:max(0, len(live) - self.max_entries)]:
+            self._remove(path)
+
+    def tag_version(self, tag):
+        try:
+            with open(os.path.join(self.directory, "tags", tag), "r") as f:
+                return int(f.read() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def bump(self, tag):
+        # Nanosecond timestamps keep versions unique without cross-process locking
+        self._write(os.path.join(self.directory, "tags", tag), str(time.time_ns()).encode())
+
+class RedisTier:
+    """Shared tier on Redis (or any server speaking its protocol)."""
+
+    def __init__(self, url=QUERY_CACHE_REDIS_URL):
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        data = self.client.get("qc:" + key)
+        return pickle.loads(data) if data else None
+
+    def set(self, key, entry, ttl):
+        self.client.set("qc:" + key, pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL), ex=max(1, int(ttl)))
+
+    def tag_version(self, tag):
+        return int(self.client.get("qc:tag:" + tag) or 0)
+
+    def bump(self, tag):
+        self.client.incr("qc:tag:" + tag)
+
+def shared_tier_from_env():
+    """Builds the shared tier selected by QUERY_CACHE_SHARED, or None."""
+    try:
+        if QUERY_CACHE_SHARED == "disk":
+            return DiskTier()
+        if QUERY_CACHE_SHARED == "redis":
+            if not REDIS_AVAILABLE:
+                print("[QUERY_CACHE] QUERY_CACHE_SHARED=redis but the redis package is not installed.")
+                return None
+            return RedisTier()
+    except Exception as e:
+        print(f"[QUERY_CACHE] Shared tier unavailable, using in-process cache only: {e}")
+    return None
+
+class QueryCache:
+    """
+    Two-tier read-through cache for query results.
+    Tier 1 is an in-process LRU with per-entry TTL; tier 2 is an optional shared
+    store (DiskTier/RedisTier). Entries carry the versions of their tags at the time
+    they were computed, so invalidate(tag) makes every dependent entry stale at once.
+    """
+
+    def __init__(self, max_entries=QUERY_CACHE_MAX_ENTRIES, shared=None):
+        self.max_entries = max_entries
+        self.shared = shared
+        self._entries = OrderedDict()  # key -> (expires_at, versions, value)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._local_versions = {}
+        self._shared_versions = {}  # tag -> (checked_at, version)
+
+    def _shared_version(self, tag):
+        if self.shared is None:
+            return 0
+        checked = self._shared_versions.get(tag)
+        if checked and time.time() - checked[0] < TAG_SYNC_SECONDS:
+            return checked[1]
+        try:
+            version = self.shared.tag_version(tag)
+        except Exception as e:
+            print(f"[QUERY_CACHE] Could not read tag version for '{tag}': {e}")
+            version = checked[1] if checked else 0
+        self._shared_versions[tag] = (time.time(), version)
+        return version
+
+    def _versions(self, tags):
+        return tuple((tag, self._local_versions.get(tag, 0), self._shared_version(tag)) for tag in tags)
+
+    def _get_local(self, key, versions, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= now or entry[1] != versions:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[2]
+
+    def _set_local(self, key, expires_at, versions, value):
+        with self._lock:
+            self._entries[key] = (expires_at, versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, key, versions, now):
+        if self.shared is None:
+            return False, None
+        try:
+            entry = self.shared.get(key)
+        except Exception as e:
+            print(f"[QUERY_CACHE] Shared tier read failed: {e}")
+            return False, None
+        # Only the shared part of the tag versions is meaningful across processes
+        shared_versions = tuple((tag, shared) for tag, _, shared in versions)
+        if not entry or entry[0] <= now or entry[1] != shared_versions:
+            return False, None
+        return True, entry
+
+    def get_or_compute(self, namespace, params, compute, ttl, tags=()):
+        """
+        Returns the cached result for (namespace, params), computing it on a miss.
+        `compute` returns (value, ok); results with ok=False are returned but not cached.
+        Concurrent misses on the same key wait for a single computation.
+        """
+        key = make_key(namespace, params)
+        versions = self._versions(tags)
+        hit, value = self._get_local(key, versions, time.time())
+        if hit:
+            metrics.cache_requests.inc(cache=namespace, result='hit')
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                return self._compute_missing(namespace, key, versions, compute, ttl)
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+    def _compute_missing(self, namespace, key, versions, compute, ttl):
+        """Miss path, run under the key's lock: re-check both tiers, then compute and store."""
+        now = time.time()
+        hit, value = self._get_local(key, versions, now)
+        if hit:
+            metrics.cache_requests.inc(cache=namespace, result='hit')
+            return value
+        hit, entry = self._get_shared(key, versions, now)
+        if hit:
+            metrics.cache_requests.inc(cache=namespace, result='shared_hit')
+            self._set_local(key, entry[0], versions, entry[2])
+            return entry[2]
+
+        metrics.cache_requests.inc(cache=namespace, result='miss')
+        value, ok = compute()
+        if ok:
+            expires_at = time.time() + ttl
+            self._set_local(key, expires_at, versions, value)
+            if self.shared is not None:
+                try:
+                    self.shared.set(key, (expires_at, tuple((tag, shared) for tag, _, shared in versions), value), ttl)
+                except Exception as e:
+                    print(f"[QUERY_CACHE] Shared tier write failed: {e}")
+        return value
+
+    def invalidate(self, *tags):
+        """Makes every entry tagged with any of `tags` stale, in this and (via the shared tier) other processes."""
+        with self._lock:
+            for tag in tags:
+                self._local_versions[tag] = self._local_versions.get(tag, 0) + 1
+        if self.shared is None:
+            return
+        for tag in tags:
+            try:
+                self.shared.bump(tag)
+            except Exception as e:
+                print(f"[QUERY_CACHE] Could not invalidate shared tag '{tag}': {e}")
+            self._shared_versions.pop(tag, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,65 +1,131 @@
-import pandas as pd
+import importlib.util
+import threading
 
-# Try to import scikit-learn components with fallback
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import linear_kernel
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
+from modules import metrics
+
+# scikit-learn (and pandas) are imported on first use, keeping them out of app startup;
+# only the presence of scikit-learn is checked here
+SKLEARN_AVAILABLE = importlib.util.find_spec("sklearn") is not None
+if not SKLEARN_AVAILABLE:
     print("Warning: scikit-learn not available. Using simple recommendation fallback.")
 
 # This global variable will cache the computed similarity matrix
 similarity_matrix_cache = None
 movie_data_cache = None
+# (similarity matrix, movies) swapped in as one object, so readers never pair a new
+# matrix with the old movies while a rebuild is being published
+_model = (None, None)
+# Version of the movies the cached model was built from (see ensure_model)
+model_version = None
+_model_lock = threading.Lock()  # held for the whole build
+_rebuilding = False
+_rebuilding_lock = threading.Lock()  # never held across a build, so renders do not wait
 
+@metrics.timed(metrics.recommender_seconds, operation='build')
 def build_recommendation_model(movies_df):
     """
     Builds and returns the cosine similarity matrix for the movies.
+    movies_df is not modified; its has_poster column (selected from the database)
+    decides which movies can be recommended.
     """
     global similarity_matrix_cache, movie_data_cache
-    
+
     if not SKLEARN_AVAILABLE:
         # Fallback: just cache the movie data for simple recommendations
-        movie_data_cache = movies_df
-        similarity_matrix_cache = None
+        _publish(None, movies_df)
         return None, movies_df
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import linear_kernel
     
     # --- Feature Engineering ---
     # Create a 'soup' of text features for each movie
-    movies_df['soup'] = movies_df['genre'].fillna('') + ' ' + \
-                        movies_df['description'].fillna('') + ' ' + \
-                        movies_df['cast'].fillna('')
+    soup = movies_df['genre'].fillna('') + ' ' + \
+           movies_df['description'].fillna('') + ' ' + \
+           movies_df['cast'].fillna('')
+    # TMDb keywords (filled in by the metadata sync) are the most specific signal we have
+    if 'keywords' in movies_df:
+        soup += ' ' + movies_df['keywords'].fillna('').str.replace(',', ' ')
     
     # --- Vectorization ---
     # Use TF-IDF to convert the text soup into a matrix of numerical features
     tfidf = TfidfVectorizer(stop_words='english')
-    tfidf_matrix = tfidf.fit_transform(movies_df['soup'])
+    tfidf_matrix = tfidf.fit_transform(soup)
     
     # --- Similarity Calculation ---
     # Compute the cosine similarity matrix
     cosine_sim = linear_kernel(tfidf_matrix, tfidf_matrix)
     
     # Cache the results
-    similarity_matrix_cache = cosine_sim
-    movie_data_cache = movies_df
+    _publish(cosine_sim, movies_df)
     
     return cosine_sim, movies_df
 
+def _publish(similarity, movies_df):
+    global _model, similarity_matrix_cache, movie_data_cache
+    _model = (similarity, movies_df)
+    similarity_matrix_cache, movie_data_cache = similarity, movies_df
+
+def _build(version, load_movies):
+    global model_version
+    import pandas as pd
+    movies = load_movies()
+    if movies:
+        build_recommendation_model(pd.DataFrame(movies))
+    model_version = version
+
+def _rebuild(version, load_movies):
+    global _rebuilding
+    try:
+        with _model_lock:
+            if version != model_version:
+                _build(version, load_movies)
+    except Exception as e:
+        print(f"[RECOMMENDER] Model rebuild failed: {e}")
+    finally:
+        _rebuilding = False
+
+def ensure_model(version, load_movies):
+    """
+    Returns the movies DataFrame of the current model, or None if there are no movies.
+    The first build runs inline (there is nothing to serve yet). When `version` changes
+    afterwards, load_movies() and the rebuild run on a background thread and the old
+    model keeps serving until the new one is published.
+    """
+    global _rebuilding
+    if movie_data_cache is None:
+        with _model_lock:
+            if movie_data_cache is None and version != model_version:
+                _build(version, load_movies)
+        return movie_data_cache
+    # version is None when it could not be read; keep serving the current model
+    if version is not None and version != model_version:
+        with _rebuilding_lock:
+            start = not _rebuilding and version != model_version
+            if start:
+                _rebuilding = True
+        if start:
+            threading.Thread(target=_rebuild, args=(version, load_movies), name="model-rebuild", daemon=True).start()
+    return movie_data_cache
+
+@metrics.timed(metrics.recommender_seconds, operation='recommend')
 def get_recommendations(movie_title, num_recommendations=10):
     """
     Gets movie recommendations based on a given movie title.
     """
-    if movie_data_cache is None:
+    import pandas as pd
+    # One consistent snapshot, even if a rebuild is published meanwhile
+    similarity, movies = _model
+    if movies is None:
         # This should ideally be handled by pre-loading the model
         return pd.DataFrame() # Return empty if model not built
 
-    if not SKLEARN_AVAILABLE or similarity_matrix_cache is None:
+    if not SKLEARN_AVAILABLE or similarity is None:
         # Fallback: return movies with similar genres
         return get_simple_recommendations(movie_title, num_recommendations)
 
     # Create a mapping of movie titles to indices
-    indices = pd.Series(movie_data_cache.index, index=movie_data_cache['title']).drop_duplicates()
+    indices = pd.Series(movies.index, index=movies['title']).drop_duplicates()
 
     try:
         # Get the index of the movie that matches the title
@@ -68,7 +134,7 @@ def get_recommendations(movie_title, num_recommendations=10):
         return pd.DataFrame() # Movie not found
 
     # Get the pairwise similarity scores of all movies with that movie
-    sim_scores = list(enumerate(similarity_matrix_cache[idx]))
+    sim_scores = list(enumerate(similarity[idx]))
 
     # Sort the movies based on the similarity scores
     sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
@@ -80,7 +146,7 @@ def get_recommendations(movie_title, num_recommendations=10):
     movie_indices = [i[0] for i in sim_scores]
 
     # Get the recommended movies from the cache
-    recommended_movies = movie_data_cache.iloc[movie_indices]
+    recommended_movies = movies.iloc[movie_indices]
     
     # --- Remove Duplicates ---
     # Drop movies with the same title, keeping the first occurrence
@@ -88,11 +154,8 @@ def get_recommendations(movie_title, num_recommendations=10):
 
     # --- Filter for Posters ---
     # Only recommend movies that have a valid-looking poster URL.
-    if 'poster_url' in recommended_movies.columns:
-        recommended_movies = recommended_movies[
-            recommended_movies['poster_url'].notna() & 
-            recommended_movies['poster_url'].str.strip().str.startswith('http', na=False)
-        ]
+    if 'has_poster' in recommended_movies.columns:
+        recommended_movies = recommended_movies[recommended_movies['has_poster'].astype(bool)]
 
     # Return the top N unique recommendations
     return recommended_movies.head(num_recommendations)
@@ -101,6 +164,7 @@ def get_simple_recommendations(movie_title, num_recommendations=10):
     """
     Simple fallback recommendation system based on genre similarity.
     """
+    import pandas as pd
     if movie_data_cache is None:
         return pd.DataFrame()
     
@@ -131,11 +195,8 @@ def get_simple_recommendations(movie_title, num_recommendations=10):
                 similar_movies = pd.concat([similar_movies, additional])
         
         # Filter for posters and return
-        if 'poster_url' in similar_movies.columns:
-            similar_movies = similar_movies[
-                similar_movies['poster_url'].notna() & 
-                similar_movies['poster_url'].str.strip().str.startswith('http', na=False)
-            ]
+        if 'has_poster' in similar_movies.columns:
+            similar_movies = similar_movies[similar_movies['has_poster'].astype(bool)]
         
         return similar_movies.head(num_recommendations)
         
@@ -0,0 +1,89 @@
+import threading
+import time
+
+# Registry of periodic jobs started in this process, keyed by job name
+_jobs = {}
+_lock = threading.Lock()
+
+def start_periodic(name, interval_seconds, func, run_immediately=True):
+    """
+    Runs `func` every `interval_seconds` on a daemon thread.
+    Calling it again for a job that is already running is a no-op, so it is safe to
+    call from code that executes on every Streamlit rerun. Returns True if a new job started.
+    """
+    with _lock:
+        job = _jobs.get(name)
+        if job and job['thread'].is_alive():
+            return False
+
+        stop_event = threading.Event()
+        wake_event = threading.Event()
+        job = {
+            'interval': interval_seconds,
+            'stop': stop_event,
+            'wake': wake_event,
+            'last_run': None,
+            'last_duration': None,
+            'last_error': None,
+            'runs': 0,
+        }
+
+        def wait():
+            # Sleeps until the next run is due or run_now()/stop() wakes the job
+            wake_event.wait(interval_seconds)
+            wake_event.clear()
+
+        def loop():
+            if not run_immediately:
+                wait()
+            while not stop_event.is_set():
+                started = time.time()
+                try:
+                    func()
+                    job['last_error'] = None
+                except Exception as e:
+                    job['last_error'] = str(e)
+                    print(f"[SCHEDULER] Job '{name}' failed: {e}")
+                job['last_run'] = started
+                job['last_duration'] = time.time() - started
+                job['runs'] += 1
+                wait()
+
+        job['thread'] = threading.Thread(target=loop, name=f"scheduler-{name}", daemon=True)
+        _jobs[name] = job
+        job['thread'].start()
+        return True
+
+def stop(name):
+    """Signals a periodic job to stop after its current run."""
+    with _lock:
+        job = _jobs.pop(name, None)
+    if job:
+        job['stop'].set()
+        job['wake'].set()
+        return True
+    return False
+
+def run_now(name):
+    """Starts the next run of a periodic job right away (or right after its current run)."""
+    with _lock:
+        job = _jobs.get(name)
+    if job and job['thread'].is_alive():
+        job['wake'].set()
+        return True
+    return False
+
+def job_status():
+    """Returns a summary of every job started in this process."""
+    with _lock:
+        return {
+            name: {
+                'interval': job['interval'],
+                'alive': job['thread'].is_alive(),
+                'runs': job['runs'],
+                'last_run': job['last_run'],
+                'last_duration': job['last_duration'],
+                'last_error': job['last_error'],
+            }
+            for name, job in _jobs.items()
+        }
@@ -1,9 +1,40 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+
+from modules import metrics
 
-BASE_URL = "https://api.themoviedb.org/3"
+BASE_URL = os.environ.get("TMDB_BASE_URL", "https://api.themoviedb.org/3")
 BASE_POSTER_URL = "https://image.tmdb.org/t/p/w500"
 
+# --- Configuration ---
+REQUEST_TIMEOUT_SECONDS = 10
+# TMDb allows roughly 50 requests/second per IP; stay below it with a small burst
+RATE_LIMIT_PER_SECOND = float(os.environ.get("TMDB_RATE_LIMIT", "40"))
+RATE_LIMIT_BURST = 20
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 0.5
+# Longest Retry-After we honour; a larger value would stall a worker (and its batch) for that long
+MAX_RETRY_AFTER_SECONDS = 60
+RESOLVER_WORKERS = 8
+POSTER_CACHE_PATH = os.environ.get("TMDB_POSTER_CACHE", os.path.join(".cache", "tmdb_posters.sqlite3"))
+# "No poster" results are retried after this long (TMDb gains posters over time)
+NEGATIVE_CACHE_TTL_SECONDS = 30 * 24 * 3600
+RESPONSE_CACHE_PATH = os.environ.get("TMDB_RESPONSE_CACHE", os.path.join(".cache", "tmdb_responses.sqlite3"))
+RESPONSE_CACHE_TTL_SECONDS = 7 * 24 * 3600
+# Expired responses are deleted at most this often (and whenever a cache is opened)
+RESPONSE_CACHE_PRUNE_SECONDS = 3600
+METADATA_CAST_LIMIT = 4
+METADATA_KEYWORD_LIMIT = 20
+YOUTUBE_WATCH_URL = "https://www.youtube.com/watch?v="
+
 def get_api_key():
     """Retrieves the TMDb API key from Streamlit secrets."""
     try:
@@ -12,38 +43,304 @@ def get_api_key():
         st.error("TMDb API key not found. Please add it to your secrets.toml file.")
         return None
 
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a request may be sent."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class PosterCache:
+    """
+    Persistent (title, year) -> poster path cache in SQLite, shared by every process on
+    the host. Negative results are stored as NULL and expire after NEGATIVE_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, path=POSTER_CACHE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS posters ("
+                " title_key TEXT NOT NULL, year INTEGER NOT NULL, poster_path TEXT, resolved_at REAL NOT NULL,"
+                " PRIMARY KEY (title_key, year))"
+            )
+
+    @staticmethod
+    def key(title, year):
+        return " ".join(str(title).split()).lower(), int(year or 0)
+
+    def get_many(self, items):
+        """Returns {(title, year): poster_path or None} for the items with a usable cache entry."""
+        found = {}
+        cutoff = time.time() - NEGATIVE_CACHE_TTL_SECONDS
+        with self._lock:
+            for item in items:
+                row = self._conn.execute(
+                    "SELECT poster_path, resolved_at FROM posters WHERE title_key = ? AND year = ?", self.key(*item)
+                ).fetchone()
+                if row and (row[0] is not None or row[1] >= cutoff):
+                    found[item] = row[0]
+        return found
+
+    def put_many(self, results):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO posters (title_key, year, poster_path, resolved_at) VALUES (?, ?, ?, ?)",
+                [self.key(*item) + (path, now) for item, path in results.items()]
+            )
+
+class ResponseCache:
+    """Persistent cache of TMDb JSON responses keyed by endpoint and parameters (API key excluded)."""
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, ttl=RESPONSE_CACHE_TTL_SECONDS):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (request_key TEXT PRIMARY KEY, body TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_fetched_at ON responses (fetched_at)")
+        self._pruned_at = 0.0
+        self.prune()
+
+    @staticmethod
+    def key(endpoint, params):
+        return endpoint + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params) if k != "api_key")
+
+    def get(self, endpoint, params):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM responses WHERE request_key = ? AND fetched_at >= ?",
+                (self.key(endpoint, params), time.time() - self.ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, endpoint, params, data):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (request_key, body, fetched_at) VALUES (?, ?, ?)",
+                (self.key(endpoint, params), json.dumps(data), time.time())
+            )
+        if time.monotonic() - self._pruned_at >= RESPONSE_CACHE_PRUNE_SECONDS:
+            self.prune()
+
+    def prune(self):
+        """Deletes the responses older than the TTL; returns how many were removed."""
+        self._pruned_at = time.monotonic()
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.ttl,)).rowcount
+
+_session = None
+_session_lock = threading.Lock()
+_response_cache = None
+_bucket = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+_cache = None
+
+def get_session():
+    """Returns the process-wide HTTP session (keep-alive connections sized for the resolver pool)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=RESOLVER_WORKERS * 2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+def get_poster_cache():
+    global _cache
+    with _session_lock:
+        if _cache is None:
+            _cache = PosterCache()
+        return _cache
+
+def get_response_cache():
+    global _response_cache
+    with _session_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+def _retry_delay(attempt, response=None):
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            delay = None
+        # NaN fails both comparisons and falls through to the backoff
+        if delay is not None and delay >= 0:
+            return min(delay, MAX_RETRY_AFTER_SECONDS)
+    return BACKOFF_BASE_SECONDS * (2 ** attempt)
+
+def get_json(endpoint, params, api_key, cache=None):
+    """
+    GETs a TMDb endpoint (e.g. "search/movie") and returns the decoded JSON. Rate limited;
+    429/5xx responses and connection errors are retried with exponential backoff. A 404
+    returns None. Raises requests.RequestException when the call keeps failing, so
+    transient errors are never cached. With `cache` (a ResponseCache), responses are
+    served from and stored in it.
+    """
+    if cache is not None:
+        cached = cache.get(endpoint, params)
+        if cached is not None:
+            return cached
+    for attempt in range(MAX_RETRIES + 1):
+        _bucket.acquire()
+        started = time.perf_counter()
+        outcome = "error"
+        response = None
+        try:
+            response = get_session().get(f"{BASE_URL}/{endpoint}", params=dict(params, api_key=api_key),
+                                         timeout=REQUEST_TIMEOUT_SECONDS)
+            outcome = str(response.status_code)
+            if response.status_code == 404:
+                return None
+            if response.status_code == 429 or response.status_code >= 500:
+                raise requests.exceptions.HTTPError(f"TMDb returned {response.status_code}", response=response)
+            response.raise_for_status()
+            data = response.json()
+            if cache is not None:
+                cache.put(endpoint, params, data)
+            return data
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.HTTPError) as e:
+            retryable = not isinstance(e, requests.exceptions.HTTPError) or response.status_code == 429 or response.status_code >= 500
+            if not retryable or attempt == MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(attempt, response))
+        finally:
+            # movie/{id} requests share one label to keep cardinality bounded
+            label = "movie/{id}" if endpoint.startswith("movie/") else endpoint
+            metrics.tmdb_request_seconds.observe(time.perf_counter() - started, endpoint=label, outcome=outcome)
+
+def search_movie(title, year, api_key, cache=None):
+    """Returns the first TMDb search result for a title (and year), or None."""
+    params = {"query": title}
+    if year:
+        params["year"] = year
+    data = get_json("search/movie", params, api_key, cache) or {}
+    results = data.get("results") or []
+    return results[0] if results else None
+
+def search_poster_path(title, year, api_key):
+    """Returns the first search result's poster path, or None when TMDb has no poster."""
+    result = search_movie(title, year, api_key)
+    return result.get("poster_path") if result else None
+
+def resolve_posters(items, workers=RESOLVER_WORKERS, api_key=None, cache=None):
+    """
+    Resolves many (title, year) pairs to full poster URLs (None when TMDb has no poster).
+    Cached answers, including "no poster", are served from the persistent PosterCache;
+    the rest are looked up concurrently on a thread pool sharing one HTTP session and
+    rate limiter. Pairs whose lookup failed are left out of the result.
+    """
+    items = list(dict.fromkeys(items))
+    cache = cache or get_poster_cache()
+    paths = cache.get_many(items)
+    missing = [item for item in items if item not in paths]
+    if missing:
+        api_key = api_key or get_api_key()
+        if not api_key:
+            missing = []
+
+    def lookup(item):
+        try:
+            return item, search_poster_path(item[0], item[1], api_key), True
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Error calling TMDb API for '{item[0]}': {e}")
+            return item, None, False
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(missing))), thread_name_prefix="tmdb") as pool:
+            resolved = {item: path for item, path, ok in pool.map(lookup, missing) if ok}
+        cache.put_many(resolved)
+        paths.update(resolved)
+    return {item: f"{BASE_POSTER_URL}{path}" if path else None for item, path in paths.items()}
+
 def find_poster_url(title, year=None):
     """
     Finds a movie's poster URL on TMDb by its title and release year.
     Returns the full poster URL if found, otherwise None.
     """
-    api_key = get_api_key()
-    if not api_key:
-        return None
+    return resolve_posters([(title, year)], workers=1).get((title, year))
 
-    # --- Search for the movie ---
-    search_url = f"{BASE_URL}/search/movie"
-    params = {"api_key": api_key, "query": title}
-    if year:
-        params["year"] = year
-    
-    try:
-        response = requests.get(search_url, params=params)
-        response.raise_for_status() # Raises an HTTPError for bad responses
-        data = response.json()
-        
-        # --- Find the best match ---
-        if data.get("results"):
-            # The first result is often the best match, especially with a year filter.
-            poster_path = data["results"][0].get("poster_path")
-            if poster_path:
-                return f"{BASE_POSTER_URL}{poster_path}"
-        
-        return None
+# --- Metadata ---
 
-    except requests.exceptions.RequestException as e:
-        print(f"Error calling TMDb API: {e}")
-        return None
-    except (KeyError, IndexError) as e:
-        print(f"Error parsing TMDb response for '{title}': {e}")
-        return None 
\ No newline at end of file
+def extract_metadata(details):
+    """Reduces a /movie/{id}?append_to_response=credits,keywords,videos response to the columns we store."""
+    def names(items, limit=None):
+        return ", ".join(filter(None, (str(item.get("name") or "") for item in (items or [])[:limit])))
+
+    videos = [v for v in (details.get("videos") or {}).get("results", []) if v.get("site") == "YouTube" and v.get("key")]
+    # Prefer official trailers, then any trailer, then teasers
+    videos.sort(key=lambda v: (v.get("type") != "Trailer", not v.get("official", False), v.get("type") != "Teaser"))
+    languages = details.get("spoken_languages") or []
+    return {
+        "tmdb_id": details.get("id"),
+        "genre": names(details.get("genres")),
+        "cast": names((details.get("credits") or {}).get("cast"), METADATA_CAST_LIMIT),
+        "keywords": names((details.get("keywords") or {}).get("keywords"), METADATA_KEYWORD_LIMIT),
+        "audio_languages": ", ".join(filter(None, (l.get("english_name") or l.get("name") for l in languages))),
+        "trailer_url": f"{YOUTUBE_WATCH_URL}{videos[0]['key']}" if videos else None,
+        "poster_url": f"{BASE_POSTER_URL}{details['poster_path']}" if details.get("poster_path") else None,
+    }
+
+def fetch_metadata(title, year=None, tmdb_id=None, api_key=None, cache=None):
+    """
+    Returns extract_metadata() for a movie, found by TMDb id or else by title and year,
+    or None if TMDb does not know it. Details, credits, keywords and videos come from
+    one append_to_response request. Raises requests.RequestException on failure.
+    """
+    cache = cache or get_response_cache()
+    if not tmdb_id:
+        result = search_movie(title, year, api_key, cache)
+        if not result:
+            return None
+        tmdb_id = result["id"]
+    details = get_json(f"movie/{tmdb_id}", {"append_to_response": "credits,keywords,videos"}, api_key, cache)
+    return extract_metadata(details) if details else None
+
+def fetch_metadata_bulk(items, workers=RESOLVER_WORKERS, api_key=None, cache=None):
+    """
+    Fetches metadata for many (title, year, tmdb_id) tuples concurrently, sharing the
+    pooled session, rate limiter and response cache. Returns {item: metadata or None};
+    items whose lookup failed are left out.
+    """
+    items = list(dict.fromkeys(items))
+    api_key = api_key or get_api_key()
+    if not items or not api_key:
+        return {}
+    cache = cache or get_response_cache()
+
+    def lookup(item):
+        try:
+            return item, fetch_metadata(item[0], item[1], item[2], api_key, cache), True
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            print(f"Error fetching TMDb metadata for '{item[0]}': {e}")
+            return item, None, False
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items))), thread_name_prefix="tmdb") as pool:
+        return {item: metadata for item, metadata, ok in pool.map(lookup, items) if ok}
@@ -0,0 +1,186 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Optional faster JSON decoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# --- Configuration ---
+GENRE_LIMIT = 5
+CAST_LIMIT = 4
+# JSON values above which decoding is spread over a process pool (only with more than
+# one worker). Serial by default, so the Streamlit server never starts worker processes;
+# import_catalog.py uses one worker per CPU (--workers).
+PARSE_POOL_MIN_VALUES = int(os.environ.get("TMDB_PARSE_POOL_MIN_VALUES", "200000"))
+PARSE_POOL_WORKERS = int(os.environ.get("TMDB_PARSE_WORKERS", "1")) or 1
+PARSE_POOL_BATCH = 20000
+# Rows of the credits file read (and decoded) at a time; the raw cast JSON is large
+CREDITS_CHUNK_SIZE = int(os.environ.get("TMDB_CREDITS_CHUNK_SIZE", "20000"))
+
+# Columns read from the TMDB files (everything else is skipped while parsing the CSV)
+MOVIE_SOURCE_COLUMNS = ('id', 'title', 'genres', 'release_date', 'overview')
+CREDIT_SOURCE_COLUMNS = ('movie_id', 'id', 'cast')
+
+def _loads(value):
+    return orjson.loads(value) if ORJSON_AVAILABLE else json.loads(value)
+
+def extract_names(values, key='name', limit=3):
+    """
+    Decodes JSON list strings such as '[{"id": 28, "name": "Action"}, ...]' and joins the
+    first `limit` `key` values of each with ', '. Invalid or missing values give ''.
+    """
+    names = []
+    for value in values:
+        try:
+            items = _loads(value)
+        except (ValueError, TypeError):
+            names.append('')
+            continue
+        if isinstance(items, list):
+            names.append(', '.join(filter(None, (str(item.get(key) or '') for item in items[:limit] if isinstance(item, dict)))))
+        else:
+            names.append('')
+    return names
+
+def parse_pool(workers):
+    """
+    A process pool for parse_json_names. Workers are spawned rather than forked: a
+    fork of a threaded process (such as the Streamlit server) can deadlock in the child.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+def _extract_in_pool(values, key, limit, workers, pool=None):
+    batch_size = max(1, min(PARSE_POOL_BATCH, -(-len(values) // workers)))
+    batches = [values[start:start + batch_size] for start in range(0, len(values), batch_size)]
+    own_pool = pool is None
+    try:
+        if own_pool:
+            pool = parse_pool(workers)
+        results = pool.map(extract_names, batches, [key] * len(batches), [limit] * len(batches))
+        return [name for batch in results for name in batch]
+    except (OSError, RuntimeError) as e:
+        # RuntimeError covers BrokenProcessPool (e.g. workers killed)
+        print(f"[TMDB] Process pool unavailable, parsing serially: {e}")
+        return extract_names(values, key, limit)
+    finally:
+        if own_pool and pool is not None:
+            pool.shutdown()
+
+def parse_json_names(series, key='name', limit=3, workers=None, dedupe=True, pool=None):
+    """
+    Bulk version of Series.apply(parse_json_column), using a process pool past
+    PARSE_POOL_MIN_VALUES values (or `pool`, shared across calls, past PARSE_POOL_BATCH).
+    With `dedupe` every distinct value is decoded once, which pays off for columns that
+    repeat heavily (genres) but not for ones that are nearly unique (cast lists, where
+    hashing the long strings costs more than it saves).
+    """
+    workers = workers or PARSE_POOL_WORKERS
+    if dedupe:
+        codes, values = pd.factorize(series)
+        values = values.tolist()
+    else:
+        values = series.tolist()
+    if workers > 1 and pool is not None and len(values) >= PARSE_POOL_BATCH:
+        names = _extract_in_pool(values, key, limit, workers, pool)
+    elif workers > 1 and len(values) >= PARSE_POOL_MIN_VALUES:
+        names = _extract_in_pool(values, key, limit, workers)
+    else:
+        names = extract_names(values, key, limit)
+    if not dedupe:
+        return pd.Series(names, index=series.index, dtype=object)
+    # Missing values have code -1, which picks the trailing ''
+    lookup = np.array(names + [''], dtype=object)
+    return pd.Series(lookup[codes], index=series.index, dtype=object)
+
+def normalize_columns(df):
+    """Returns `df` with stripped, lower-case column names."""
+    return df.rename(columns=lambda c: str(c).strip().lower())
+
+def _source_columns(columns):
+    return lambda column: str(column).strip().lower() in columns
+
+def iter_credits(source, chunk_size):
+    """Yields the credits file (DataFrame, path or file object) in chunks, keeping only the id and cast columns."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield source.iloc[start:start + chunk_size]
+        return
+    yield from pd.read_csv(source, chunksize=chunk_size, usecols=_source_columns(CREDIT_SOURCE_COLUMNS))
+
+def iter_movies(source, chunk_size):
+    """Yields the movies file (DataFrame, path or file object) in chunks of `chunk_size` rows."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield source.iloc[start:start + chunk_size]
+        return
+    yield from pd.read_csv(source, chunksize=chunk_size, usecols=_source_columns(MOVIE_SOURCE_COLUMNS))
+
+def cast_lookup(credits, workers=None, pool=None):
+    """Reduces (a chunk of) the credits file to a Series of cast names indexed by TMDB movie id."""
+    credits = normalize_columns(credits)
+    id_column = 'movie_id' if 'movie_id' in credits.columns else 'id'
+    ids = pd.to_numeric(credits[id_column], errors='coerce')
+    cast = parse_json_names(credits['cast'], limit=CAST_LIMIT, workers=workers, dedupe=False, pool=pool)
+    cast.index = ids
+    return cast[cast.index.notna() & ~cast.index.duplicated(keep='first')]
+
+def read_cast_lookup(source, chunk_size=CREDITS_CHUNK_SIZE, workers=None):
+    """
+    cast_lookup of the whole credits file (DataFrame, path or file object), read and
+    decoded `chunk_size` rows at a time so only the cast names are held, never the raw
+    cast JSON of the whole file. With more than one worker, one process pool is
+    shared by all chunks.
+    """
+    workers = workers or PARSE_POOL_WORKERS
+    pool = None
+    if workers > 1:
+        try:
+            pool = parse_pool(workers)
+        except (OSError, ValueError) as e:
+            print(f"[TMDB] Process pool unavailable, parsing serially: {e}")
+    try:
+        parts = [cast_lookup(chunk, workers, pool) for chunk in iter_credits(source, chunk_size)]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.Series(dtype=object)
+    cast = pd.concat(parts)
+    return cast[~cast.index.duplicated(keep='first')]
+
+def transform_movies(movies, cast_by_id):
+    """
+    Turns a chunk of the TMDB movies file into rows for database.validate_movie_chunk.
+    Like the original merge, movies without an entry in the credits file are dropped.
+    The rows keep the chunk's index (their position in the movies file), and attrs
+    ['source_rows'] holds the size of the chunk before the drop.
+    """
+    source_rows = len(movies)
+    movies = normalize_columns(movies)
+    ids = pd.to_numeric(movies['id'], errors='coerce')
+    movies = movies[ids.isin(cast_by_id.index)]
+    ids = ids[movies.index]
+    years = pd.to_datetime(movies['release_date'], errors='coerce', format='%Y-%m-%d').dt.year
+    rows = pd.DataFrame({
+        'title': movies['title'],
+        'type': 'Movie',
+        'genre': parse_json_names(movies['genres'], limit=GENRE_LIMIT),
+        'release_year': years.astype('Int64').astype('string').fillna(''),
+        'description': movies['overview'],
+        'cast': cast_by_id.reindex(ids).to_numpy(),
+        # Posters are not in the source files; they are fetched from the TMDb API later
+        'poster_url': '',
+        'trailer_url': '',
+    }, index=movies.index)
+    rows.attrs['source_rows'] = source_rows
+    return rows
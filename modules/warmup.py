@@ -0,0 +1,109 @@
+"""
+Warms a fresh process before it serves traffic.
+
+Otherwise the first session after a deploy pays for the database driver imports, the
+schema checks, the recommendation model build and every cold cache. warm_up() runs
+those steps once and reports how long each took; start() runs it on a daemon thread
+and registers a readiness check, so the metrics exporter answers GET /ready with 503
+until the process is warm (see serve.py for the container health check).
+"""
+import threading
+import time
+
+from modules import autocomplete, database, image_cache, metrics, recommender
+
+# The home page shows this many trending movies
+TRENDING_LIMIT = 10
+
+warmup_step_seconds = metrics.Gauge("warmup_step_seconds", "Time taken by each process warm-up step.", ["step"])
+
+# 'pending' until start(), then 'running', 'ready' or 'failed'
+state = 'pending'
+results = []
+_lock = threading.Lock()
+_thread = None
+
+def _open_connection():
+    # Loads the driver and the credentials, and fails fast if the database is unreachable
+    database.get_conn().close()
+
+def _verify_schema():
+    errors = database.init_database()
+    if errors:
+        raise RuntimeError(f"{len(errors)} schema error(s), first: {errors[0]}")
+
+def _load_model():
+    recommender.ensure_model(database.get_model_version(), database.get_model_movies)
+
+def _prime_trending():
+    movies = database.get_trending_movies(limit=TRENDING_LIMIT)
+    image_cache.prefetch([movie.get('poster_url') for movie in movies])
+
+def _prime_autocomplete():
+    autocomplete.ensure_fresh(database.get_catalog_fingerprint, database.get_autocomplete_rows)
+
+# In order: later steps need the connection and the schema
+STEPS = [
+    ('connection', _open_connection),
+    ('schema', _verify_schema),
+    ('filter_bounds', database.get_movie_filter_bounds),
+    ('model', _load_model),
+    ('trending', _prime_trending),
+    ('autocomplete', _prime_autocomplete),
+]
+
+def warm_up(steps=None):
+    """
+    Runs the warm-up steps and returns [(step, seconds, error)], error being None on
+    success. Stops at the first failure, since the remaining steps need the database.
+    """
+    timings = []
+    for name, func in (STEPS if steps is None else steps):
+        started = time.perf_counter()
+        try:
+            func()
+            error = None
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        elapsed = time.perf_counter() - started
+        warmup_step_seconds.set(elapsed, step=name)
+        timings.append((name, elapsed, error))
+        if error:
+            break
+    return timings
+
+def report(timings):
+    """Prints one line per step and the total."""
+    for name, seconds, error in timings:
+        print(f"[WARMUP] {name}: {seconds * 1000:.0f} ms" + (f" FAILED: {error}" if error else ""))
+    print(f"[WARMUP] total: {sum(seconds for _, seconds, _ in timings) * 1000:.0f} ms")
+
+def _run():
+    global state, results
+    timings = warm_up()
+    report(timings)
+    results = timings
+    state = 'failed' if any(error for _, _, error in timings) else 'ready'
+
+def start():
+    """
+    Warms this process on a daemon thread. A no-op while a warm-up is running or after
+    one succeeded; a failed warm-up (e.g. the database was not up yet) is started again.
+    """
+    global state, _thread
+    with _lock:
+        if state in ('running', 'ready'):
+            return False
+        state = 'running'
+        _thread = threading.Thread(target=_run, name="warmup", daemon=True)
+        _thread.start()
+    metrics.register_readiness_check(check_ready)
+    return True
+
+def check_ready():
+    """Readiness check for the metrics exporter; restarts a failed warm-up so health checks retry it."""
+    if state == 'failed':
+        start()
+    if state == 'ready':
+        return True, f"warm-up: done in {sum(seconds for _, seconds, _ in results) * 1000:.0f} ms"
+    return False, f"warm-up: {state}"
@@ -1,11 +1,9 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from modules import database, tmdb
+from modules import database, instrumentation, metrics, profiling, tmdb
 from app import load_and_build_model
 import io
 import os
+from datetime import datetime
 
 # --- SESSION STATE CHECK ---
 if 'user' not in st.session_state or st.session_state.user is None:
@@ -180,12 +178,17 @@ def get_cached_movies():
         return []
 
 def render_dashboard():
+    # plotly and pandas are slow to import, so they load with the sections that use them
+    import pandas as pd
+    import plotly.express as px
     st.header("🚀 Dashboard Overview")
     metrics = get_cached_dashboard_metrics()
     
     if not metrics:
         st.error("Could not load dashboard data.")
         return
+    if metrics.get('rollup_updated_at'):
+        st.caption(f"Metrics as of {metrics['rollup_updated_at']} (refreshed every {database.DASHBOARD_ROLLUP_INTERVAL_SECONDS // 60} minutes)")
 
     kpi_cols = st.columns(5)
     kpis = {
@@ -233,6 +236,7 @@ def render_dashboard():
         st.dataframe(pd.DataFrame(metrics.get('admin_activity', [])), use_container_width=True)
 
 def render_user_management():
+    import pandas as pd
     st.header("👥 User Management")
     
     all_users = get_cached_users()
@@ -337,21 +341,50 @@ def single_movie_upload():
                 st.warning("Please fill out all required fields.")
 
 def bulk_upload_section():
+    import pandas as pd
     st.info("Required columns: `title`. Optional: `type`, `genre`, `release_year`, `description`, `cast`, `poster_url`, `trailer_url`, `audio_languages`.")
     uploaded_file = st.file_uploader("Choose a CSV file", type=['csv'])
     if uploaded_file:
-        df = pd.read_csv(uploaded_file)
-        st.dataframe(df.head())
+        # Preview only; the import itself streams the file in chunks
+        st.dataframe(pd.read_csv(uploaded_file, nrows=5))
+        uploaded_file.seek(0)
+        job = database.get_resumable_import(database.import_source_key(uploaded_file, uploaded_file.name))
+        if job:
+            st.warning(f"A previous import of this file stopped after {job['rows_committed']:,} row(s); uploading will resume from there.")
         if st.button("🚀 Upload from CSV"):
-            with st.spinner("Uploading..."):
-                success, message = database.bulk_upload_movies(df, st.session_state.user['id'])
-                if success:
-                    st.success(message)
-                    st.rerun()
-                else:
-                    st.error(message)
+            progress_bar = st.progress(0.0, text="Uploading...")
+
+            def report(rows_done, fraction):
+                progress_bar.progress(fraction or 0.0, text=f"Processed {rows_done:,} row(s)...")
+
+            success, message = database.ingest_movies_csv(uploaded_file, st.session_state.user['id'], uploaded_file.name, progress=report)
+            if success:
+                progress_bar.progress(1.0, text="Upload complete.")
+                st.success(message)
+            else:
+                st.error(message)
+
+def poster_backfill_status():
+    """Shows the automatic poster backfill progress and lets the admin start a run."""
+    st.subheader("Automatic Poster Backfill")
+    database.start_poster_backfill_job()
+    status = database.get_poster_backfill_status()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Missing posters", f"{status['missing']:,}")
+    col2.metric("Resolved", f"{status['resolved']:,}")
+    col3.metric("Not on TMDb", f"{status['not_found']:,}")
+    col4.metric("Failed lookups", f"{status['failed']:,}")
+    job = status['job']
+    if job and job['last_run']:
+        st.caption(f"Last run {datetime.fromtimestamp(job['last_run']):%Y-%m-%d %H:%M} ({job['last_duration']:.0f}s)"
+                   + (f" — error: {job['last_error']}" if job['last_error'] else ""))
+    if st.button("🔄 Run poster backfill now"):
+        database.start_poster_backfill_job(run_now=True)
+        st.toast("Poster backfill started in the background.", icon="🖼️")
 
 def poster_fix_section():
+    poster_backfill_status()
+    st.divider()
     st.subheader("Manual Poster URL Fix")
     
     # Search for a movie to fix
@@ -363,7 +396,7 @@ def poster_fix_section():
         movies_to_fix = [m for m in all_movies if search_movie_title.lower() in str(m.get('title', '')).lower()]
     else:
         # Show movies without valid posters by default
-        movies_to_fix = [m for m in all_movies if not str(m.get('poster_url', '')).startswith('http')]
+        movies_to_fix = [m for m in all_movies if not m.get('has_poster')]
 
     if movies_to_fix:
         # Create a default "None" option
@@ -401,19 +434,25 @@ def tmdb_population_section():
         if movies_file is not None and credits_file is not None:
             with st.spinner("Populating database... This may take a few moments."):
                 try:
-                    movies_df = pd.read_csv(movies_file)
-                    credits_df = pd.read_csv(credits_file)
-                    
                     user_id = st.session_state.user.get('id')
                     if not user_id:
                         st.error("Could not identify admin user. Aborting.")
                         return
 
-                    success, message = database.populate_from_tmdb_files(movies_df, credits_df, user_id)
+                    progress_bar = st.progress(0.0, text="Uploading...")
+
+                    def report(rows_done, fraction):
+                        progress_bar.progress(fraction or 0.0, text=f"Processed {rows_done:,} row(s)...")
+
+                    # The files are streamed in chunks rather than read up front
+                    success, message = database.populate_from_tmdb_files(movies_file, credits_file, user_id, progress=report)
 
                     if success:
+                        progress_bar.progress(1.0, text="Population complete.")
                         st.success(message)
-                        st.rerun()
+                        # The TMDB files carry no posters or trailers; fetch them in the background
+                        database.start_poster_backfill_job(run_now=True)
+                        database.start_metadata_sync_job(run_now=True)
                     else:
                         st.error(f"Failed to populate: {message}")
                 except Exception as e:
@@ -421,7 +460,13 @@ def tmdb_population_section():
         else:
             st.warning("Please upload both CSV files to proceed.")
 
+    st.caption("Trailers, spoken languages and keywords are fetched from TMDb in the background every hour.")
+    if st.button("🔄 Sync TMDb metadata now"):
+        database.start_metadata_sync_job(run_now=True)
+        st.toast("Metadata sync started in the background.", icon="🎞️")
+
 def render_content_management():
+    import pandas as pd
     st.header("🎬 Content Management")
     
     st.subheader("All Movies in Database")
@@ -457,22 +502,54 @@ def render_content_management():
     with tab3:
         poster_fix_section()
 
+def query_performance_section():
+    """Shows the slowest database functions and statements recorded in this process."""
+    import pandas as pd
+    if not instrumentation.ENABLED:
+        st.info("Query instrumentation is off. Set `DB_INSTRUMENTATION=1` to record database timings.")
+        return
+
+    stats = instrumentation.snapshot()
+    acquire = stats['connection_acquire']
+    st.caption(f"Connection acquire: {acquire['count']} calls, avg {acquire['avg_ms']} ms, p95 {acquire['p95_ms']} ms. "
+               f"Slow threshold: {stats['slow_query_ms']} ms.")
+    columns = ['count', 'avg_ms', 'p95_ms', 'max_ms', 'total_ms']
+    if stats['functions']:
+        st.write("**Functions**")
+        st.dataframe(pd.DataFrame(stats['functions'])[['name', 'errors'] + columns], use_container_width=True)
+    if stats['statements']:
+        st.write("**Statements**")
+        st.dataframe(pd.DataFrame(stats['statements'])[['sql', 'rows'] + columns], use_container_width=True)
+    if stats['slow_queries']:
+        st.write("**Recent slow queries**")
+        st.dataframe(pd.DataFrame(stats['slow_queries']), use_container_width=True)
+    if st.button("Reset query stats"):
+        instrumentation.reset()
+        st.rerun()
+
 def render_system_config():
     st.header("⚙️ System & Configuration")
     
     st.subheader("TMDB Data Population")
     tmdb_population_section()
 
+    st.subheader("Query Performance")
+    query_performance_section()
+
 def admin_panel():
+    sections = metrics.SectionTimer("admin_panel")
     # Render the sidebar first
+    sections.start("sidebar")
     render_sidebar()
     
+    sections.start("header")
     st.title("⚙️ Admin Panel")
 
     inject_custom_css()
 
     # Show only the selected admin section content
     section = st.session_state.get("admin_section", "dashboard")  # Default to "dashboard"
+    sections.start(section)
 
     if section == "dashboard":
         render_dashboard()
@@ -501,13 +578,15 @@ def admin_panel():
     else:
         st.header("Welcome to the Admin Panel")
         st.info("Select a section from the sidebar.")
+    sections.stop()
 
     # Optionally, reset the section on logout
     if not st.session_state.get("logged_in", False):
         st.session_state["admin_section"] = "dashboard"
 
 def main():
-    admin_panel()
+    with profiling.profile_rerun("admin_panel"):
+        admin_panel()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""
+Starts the app in a process that warms itself up before taking traffic.
+
+    python serve.py --server.port 8501 --server.address 0.0.0.0
+    python serve.py --warm-only
+
+Streamlit runs app.py inside this process, so the schema check, model and caches that
+modules/warmup prepares in the background are the ones the first session uses. Until
+then the metrics exporter answers GET /ready with 503; point the container health
+check at it (see DEPLOYMENT.md). Any other arguments are passed to `streamlit run`.
+
+--warm-only runs the warm-up steps in the foreground, prints their timings and exits
+with status 1 if one failed.
+"""
+import os
+import sys
+
+from modules import metrics, warmup
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if '--warm-only' in argv:
+        timings = warmup.warm_up()
+        warmup.report(timings)
+        return 1 if any(error for _, _, error in timings) else 0
+
+    metrics.start_http_server()
+    warmup.start()
+    from streamlit.web import cli
+    sys.argv = ["streamlit", "run", os.path.join(ROOT, "app.py"), *argv]
+    return cli.main()
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import time
+import queue
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import activity_logger
+
+class TestActivityLogger(unittest.TestCase):
+    """Test cases for the buffered activity logger"""
+
+    def setUp(self):
+        """Start from an empty buffer with a recording writer"""
+        activity_logger.flush()
+        self.batches = []
+        self.fail_on = set()
+
+        def writer(events):
+            if any(event in self.fail_on for event in events):
+                raise RuntimeError("insert failed")
+            self.batches.append(list(events))
+
+        activity_logger._writer = writer
+
+    def written(self, expected=0, timeout=5):
+        """Returns written events, waiting for the background thread if it holds some"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            events = [event for batch in self.batches for event in batch]
+            if len(events) >= expected:
+                return events
+            time.sleep(0.05)
+        return [event for batch in self.batches for event in batch]
+
+    def test_flush_writes_in_bounded_batches(self):
+        """Buffered events are written in batches of at most BATCH_SIZE"""
+        for i in range(450):
+            activity_logger.enqueue(i)
+        activity_logger.flush()
+        self.assertEqual(sorted(self.written(450)), list(range(450)))
+        self.assertTrue(all(len(b) <= activity_logger.BATCH_SIZE for b in self.batches))
+
+    def test_flush_writes_the_batch_being_collected(self):
+        """Events the background thread has taken off the queue are written by flush"""
+        activity_logger._hold(('collected', 0))
+        activity_logger.enqueue('queued')
+        self.assertEqual(activity_logger.pending(), 2)
+        activity_logger.flush()
+        self.assertEqual(self.written(), ['collected', 'queued'])
+        self.assertEqual(activity_logger.pending(), 0)
+
+    def test_bad_event_does_not_block_batch(self):
+        """A failing event is retried alone and eventually dropped"""
+        self.fail_on = {'bad'}
+        items = [('a', 0), ('bad', 0), ('b', 0)]
+        self.assertFalse(activity_logger._write(items))
+        self.assertEqual(sorted(self.written()), ['a', 'b'])
+        self.assertEqual(activity_logger.pending(), 1)
+        for _ in range(activity_logger.MAX_ATTEMPTS):
+            activity_logger.flush()
+        self.assertEqual(activity_logger.pending(), 0)
+
+    def test_queue_is_bounded(self):
+        """When the buffer is full the oldest events are dropped"""
+        original_queue = activity_logger._queue
+        activity_logger._queue = queue.Queue(maxsize=5)
+        try:
+            dropped_before = activity_logger.stats['dropped']
+            for i in range(8):
+                activity_logger.enqueue(i)
+            self.assertEqual(activity_logger.pending(), 5)
+            self.assertEqual(activity_logger.stats['dropped'] - dropped_before, 3)
+            activity_logger.flush()
+            self.assertEqual(self.written(), [3, 4, 5, 6, 7])
+        finally:
+            activity_logger._queue = original_queue
+
+    def test_background_thread_flushes_on_interval(self):
+        """Events are written by the background thread without an explicit flush"""
+        activity_logger.start(activity_logger._writer)
+        activity_logger.enqueue('async')
+        deadline = time.time() + activity_logger.FLUSH_INTERVAL_SECONDS + 3
+        while 'async' not in self.written() and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertIn('async', self.written())
+
+if __name__ == "__main__":
+    unittest.main()
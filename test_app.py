@@ -84,6 +84,18 @@ class TestMovieRecommendationSystem(unittest.TestCase):
             print(f"Model building test skipped: {e}")
             self.assertTrue(True)
     
+    def test_recommendations_use_the_database_has_poster(self):
+        """Movies the database flags as posterless are not recommended; the caller's frame is untouched"""
+        df = pd.DataFrame([
+            {'title': 'Heat', 'genre': 'Crime', 'description': 'A bank heist crew', 'cast': 'Al Pacino', 'poster_url': 'http://a', 'has_poster': 1},
+            {'title': 'Ronin', 'genre': 'Crime', 'description': 'A heist crew in France', 'cast': 'Robert De Niro', 'poster_url': 'http://x/placeholder_1.jpg', 'has_poster': 0},
+            {'title': 'Thief', 'genre': 'Crime', 'description': 'A safecracker and a heist', 'cast': 'James Caan', 'poster_url': 'http://c', 'has_poster': 1},
+        ])
+        columns = list(df.columns)
+        recommender.build_recommendation_model(df)
+        self.assertEqual(list(df.columns), columns)
+        self.assertEqual(list(recommender.get_recommendations('Heat')['title']), ['Thief'])
+
     def test_search_functionality(self):
         """Test search functionality with mock data"""
         # Test title search
@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import autocomplete
+
+class TestAutocompleteIndex(unittest.TestCase):
+    """Test cases for the in-memory autocomplete index"""
+
+    def setUp(self):
+        """Build a small index with known ranking"""
+        self.rows = [
+            {'id': 1, 'title': 'The Godfather', 'genre': 'Crime', 'release_year': 1972, 'popularity': 50},
+            {'id': 2, 'title': 'The Godfather Part II', 'genre': 'Crime', 'release_year': 1974, 'popularity': 20},
+            {'id': 3, 'title': 'Gone Girl', 'genre': 'Thriller', 'release_year': 2014, 'popularity': 30},
+            {'id': 4, 'title': 'Amélie', 'genre': 'Romance', 'release_year': 2001, 'popularity': 5},
+            {'id': 5, 'title': 'Godzilla', 'genre': 'Action', 'release_year': 2014, 'popularity': 0},
+        ]
+        self.index = autocomplete.build_index(self.rows, fingerprint='v1')
+
+    def test_normalize(self):
+        """Titles are lowercased, accent-folded and stripped of punctuation"""
+        self.assertEqual(autocomplete.normalize("  Amélie: The Movie! "), "amelie the movie")
+        self.assertEqual(autocomplete.normalize(None), "")
+
+    def test_prefix_ranked_by_popularity(self):
+        """Completions for a prefix are ordered by popularity, then year"""
+        titles = [s['title'] for s in autocomplete.suggest_from(self.index, 'go')]
+        self.assertEqual(titles, ['The Godfather', 'Gone Girl', 'The Godfather Part II', 'Godzilla'])
+
+    def test_leading_article_is_optional(self):
+        """'godf' matches titles starting with 'The Godfather'"""
+        titles = [s['title'] for s in autocomplete.suggest_from(self.index, 'godf')]
+        self.assertEqual(titles, ['The Godfather', 'The Godfather Part II'])
+
+    def test_accents_and_limit(self):
+        """Accented queries match and the limit is respected"""
+        self.assertEqual(autocomplete.suggest_from(self.index, 'Amé')[0]['title'], 'Amélie')
+        self.assertEqual(len(autocomplete.suggest_from(self.index, 'g', limit=1)), 1)
+        self.assertEqual(autocomplete.suggest_from(self.index, ''), [])
+
+    def test_heavy_prefixes_match_full_scan(self):
+        """Precomputed completions for large prefix ranges equal a brute-force ranking"""
+        rows = [
+            {'id': i, 'title': f"Star {i:05d}", 'genre': '', 'release_year': 1950 + i % 70, 'popularity': (i * 7919) % 1000}
+            for i in range(5000)
+        ]
+        index = autocomplete.build_index(rows)
+        self.assertIn('star', index['heavy'])
+        expected = sorted(rows, key=lambda r: (r['popularity'], r['release_year']), reverse=True)[:5]
+        titles = [s['title'] for s in autocomplete.suggest_from(index, 'star', limit=5)]
+        self.assertEqual(titles, [r['title'] for r in expected])
+
+    def test_ensure_fresh_rebuilds_on_fingerprint_change(self):
+        """The process-wide index is rebuilt only when the fingerprint changes"""
+        builds = []
+        def fetch_rows():
+            builds.append(1)
+            return self.rows
+
+        autocomplete._index = None
+        autocomplete.ensure_fresh(lambda: 'v1', fetch_rows)
+        autocomplete.invalidate()
+        autocomplete.ensure_fresh(lambda: 'v1', fetch_rows)
+        self.assertEqual(len(builds), 1)
+        autocomplete.invalidate()
+        autocomplete.ensure_fresh(lambda: 'v2', fetch_rows)
+        self.assertEqual(len(builds), 2)
+        self.assertEqual(autocomplete.suggest('gone')[0]['title'], 'Gone Girl')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import unittest
+import sys
+import os
+import io
+import pandas as pd
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_fakes import FakeCursor, FakeDB
+from modules import database
+
+class FakeImportDB(FakeDB):
+    """In-memory stand-in for the import_jobs/movies statements used by ingest_movies_csv"""
+
+    def __init__(self):
+        self.jobs = {}
+        self.movies = {}  # natural key -> row
+        self.upserted = []
+        self.staged = []
+        self.tag_lookups = []
+        self.fail_on_title = None
+        self.load_data_disabled = False
+        self.load_data_error = None
+
+    def execute(self, cursor, sql, params):
+        if sql.startswith("SELECT * FROM import_jobs"):
+            return [dict(job) for job in self.jobs.values() if job['source_key'] == params[0] and job['status'] != 'completed']
+        elif sql.startswith("INSERT INTO import_jobs"):
+            cursor.lastrowid = len(self.jobs) + 1
+            self.jobs[cursor.lastrowid] = {'id': cursor.lastrowid, 'source_key': params[0], 'status': 'running',
+                                           'rows_committed': 0, 'rows_inserted': 0, 'rows_updated': 0,
+                                           'rows_skipped': 0, 'rows_rejected': 0}
+        elif sql.startswith("UPDATE import_jobs SET rows_committed"):
+            self.jobs[params[5]].update(rows_committed=params[0], rows_inserted=params[1], rows_updated=params[2],
+                                        rows_skipped=params[3], rows_rejected=params[4])
+        elif sql.startswith("UPDATE import_jobs SET status = 'completed'"):
+            self.jobs[params[0]]['status'] = 'completed'
+        elif sql.startswith("UPDATE import_jobs SET status = 'failed'"):
+            self.jobs[params[1]]['status'] = 'failed'
+        elif sql.startswith("LOAD DATA LOCAL INFILE"):
+            if self.load_data_disabled:
+                raise RuntimeError("Loading local data is disabled")
+            if self.load_data_error:
+                raise self.load_data_error
+            with open(params[0], encoding="utf-8") as f:
+                self.staged = [line.split("\t") for line in f.read().splitlines()]
+        elif sql.startswith("SELECT id, genre, audio_languages FROM movies WHERE natural_key IN"):
+            self.tag_lookups.extend(params)
+        elif sql.startswith("SELECT natural_key"):
+            return [self.movies[key] for key in params if key in self.movies]
+        elif sql.startswith("INSERT INTO movies") and "FROM movies_import_staging" in sql:
+            self.upserted.extend(fields[0] for fields in self.staged)
+            cursor.rowcount = len(self.staged)
+
+    def executemany(self, cursor, sql, seq_params):
+        for params in seq_params:
+            if params[0] == self.fail_on_title:
+                self.fail_on_title = None
+                raise RuntimeError("connection lost")
+        for params in seq_params:
+            key = f"{params[0].lower()}|{'' if params[3] is None else params[3]}|{params[1]}"
+            self.movies[key] = dict(zip(['natural_key'] + database.MOVIE_UPDATE_COLUMNS, (key, params[2]) + params[4:9]))
+        self.upserted.extend(p[0] for p in seq_params)
+        cursor.rowcount = len(seq_params)
+
+class TestBulkImport(unittest.TestCase):
+    """Test cases for vectorized validation and the streaming CSV import"""
+
+    def setUp(self):
+        self.db = FakeImportDB()
+        self.originals = (database.get_conn, database.log_activity, database.LOAD_DATA_MIN_ROWS, database._load_data_available)
+        database.get_conn = self.db.connect
+        database.log_activity = lambda *args, **kwargs: True
+
+    def tearDown(self):
+        database.get_conn, database.log_activity, database.LOAD_DATA_MIN_ROWS, database._load_data_available = self.originals
+
+    def test_validate_movie_chunk(self):
+        """Invalid rows are reported by CSV line; types and years are normalized"""
+        df = pd.DataFrame({
+            ' Title': ['A', '', 'B', 'C'],
+            'type': ['series', 'movie', 'Movie', 'other'],
+            'release_year': ['2001', '1999', 'abc', None],
+        })
+        rows, errors = database.validate_movie_chunk(df)
+        self.assertEqual(rows['title'].tolist(), ['A', 'C'])
+        self.assertEqual(rows['type'].tolist(), ['Series', 'Movie'])
+        self.assertEqual(errors, [
+            "Row 3: 'title' cannot be empty.",
+            "Row 4: Invalid 'release_year' for title 'B'. Must be a whole number.",
+        ])
+        params = database._movie_rows_to_tuples(rows, 7)
+        self.assertEqual((params[0][3], params[1][3], params[1][-1]), (2001, None, 7))
+
+    def test_ingest_resumes_after_failure(self):
+        """A failed import resumes after the last committed chunk when the file is ingested again"""
+        csv_bytes = ("title,release_year\n" + "".join(f"Movie {i},2000\n" for i in range(10))).encode()
+        self.db.fail_on_title = "Movie 5"
+        progress = []
+        ok, message = database.ingest_movies_csv(io.BytesIO(csv_bytes), 1, "dump.csv", chunk_size=4, progress=lambda done, fraction: progress.append(done))
+        self.assertFalse(ok)
+        self.assertIn("after 4 row(s)", message)
+        self.assertEqual(progress, [4])
+
+        ok, message = database.ingest_movies_csv(io.BytesIO(csv_bytes), 1, "dump.csv", chunk_size=4)
+        self.assertTrue(ok, message)
+        self.assertEqual(self.db.upserted, [f"Movie {i}" for i in range(10)])
+        self.assertEqual(self.db.jobs[1]['status'], 'completed')
+        self.assertEqual(self.db.jobs[1]['rows_committed'], 10)
+
+    def test_load_data_fast_path_and_fallback(self):
+        """Large batches go through the staging TSV; if LOAD DATA is rejected, batched inserts are used"""
+        database.LOAD_DATA_MIN_ROWS = 2
+        database._load_data_available = None
+        rows, _ = database.validate_movie_chunk(pd.DataFrame({'title': ['Tabs', 'Plain'], 'release_year': ['2001', None],
+                                                              'description': ['a\tb', '']}))
+        self.assertEqual(database.upsert_movie_rows(FakeCursor(self.db), rows, 3)['inserted'], 2)
+        self.assertEqual(self.db.staged[0], ['Tabs', 'Movie', '', '2001', 'a\\tb', '', '', '', '', '3'])
+        self.assertEqual(self.db.staged[1][3], '\\N')
+
+        self.db.load_data_disabled = True
+        database._load_data_available = None
+        database.upsert_movie_rows(FakeCursor(self.db), rows, 3)
+        self.assertIs(database._load_data_available, False)
+        self.assertEqual(self.db.upserted[2:], ['Tabs', 'Plain'])
+
+    def test_load_data_stays_enabled_after_other_errors(self):
+        """Only a disabled/not-allowed LOAD DATA LOCAL turns the fast path off; other errors are raised"""
+        database.LOAD_DATA_MIN_ROWS = 2
+        database._load_data_available = True
+        rows, _ = database.validate_movie_chunk(pd.DataFrame({'title': ['Heat', 'Up']}))
+        self.db.load_data_error = RuntimeError("Lock wait timeout exceeded; try restarting transaction")
+        with self.assertRaises(RuntimeError):
+            database.upsert_movie_rows(FakeCursor(self.db), rows, 3)
+        self.assertIs(database._load_data_available, True)
+
+        error = RuntimeError("The used command is not allowed with this MySQL version")
+        error.errno = 1148
+        self.db.load_data_error = error
+        database.upsert_movie_rows(FakeCursor(self.db), rows, 3)
+        self.assertIs(database._load_data_available, False)
+
+    def test_reimport_is_idempotent(self):
+        """Rows are keyed on normalized title, year and type; unchanged rows are not rewritten"""
+        df = pd.DataFrame({'title': ['Heat', 'heat ', 'Heat', 'Up'], 'release_year': ['1995', '1995', '2020', '2009'],
+                           'genre': ['Crime', 'Crime, Drama', 'Drama', 'Animation']})
+        rows, _ = database.validate_movie_chunk(df)
+        counts = database.upsert_movie_rows(FakeCursor(self.db), rows, 1)
+        self.assertEqual(counts, {'inserted': 3, 'updated': 0, 'skipped': 1})
+        self.assertEqual(self.db.movies['heat|1995|Movie']['genre'], 'Crime, Drama')
+        # Tags are re-synced for the written movies only, found by their indexed natural key
+        self.assertEqual(self.db.tag_lookups, ['heat|1995|Movie', 'heat|2020|Movie', 'up|2009|Movie'])
+
+        rows, _ = database.validate_movie_chunk(pd.DataFrame({'title': ['HEAT', 'Up'], 'release_year': ['1995', '2009'],
+                                                              'genre': ['Crime, Drama', 'Family']}))
+        counts = database.upsert_movie_rows(FakeCursor(self.db), rows, 1)
+        self.assertEqual(counts, {'inserted': 0, 'updated': 1, 'skipped': 1})
+        self.assertEqual(self.db.upserted[-1], 'Up')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import sys
+import os
+from datetime import date, datetime, timedelta
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_fakes import FakeDB
+from modules import database
+
+TODAY = date.today()
+
+class FakeRollupDB(FakeDB):
+    """In-memory stand-in for the statements used by the dashboard rollup"""
+
+    def __init__(self):
+        self.lock_free = True
+        self.lock_attempts = 0
+        self.rollup = []  # [metric_date, metric, dimension, value, payload, updated_at]
+        self.age_seconds = 0
+        self.aggregates = {
+            'totals': [{'total_users': 10, 'total_movies': 4, 'total_watchlist': 3, 'total_watched': 7, 'avg_watch_time': 42.5}],
+            'genres': [{'genre': 'Drama', 'count': 3}, {'genre': 'Crime', 'count': 1}],
+            'signups': [{'day': TODAY, 'count': 2}, {'day': TODAY - timedelta(days=1), 'count': 3}],
+            'uploads': [{'day': TODAY, 'count': 1}],
+            'user_actions': [{'day': TODAY, 'username': 'ann', 'count': 5}, {'day': TODAY, 'username': 'bob', 'count': 2}],
+        }
+
+    def execute(self, cursor, sql, params):
+        if sql.startswith("SELECT GET_LOCK"):
+            self.lock_attempts += 1
+            return [{'acquired': 1 if self.lock_free else 0}]
+        elif sql.startswith("SELECT CURDATE() AS today"):
+            return [{'today': TODAY, 'since': TODAY - timedelta(days=params[0])}]
+        elif "AS total_users" in sql:
+            return self.aggregates['totals']
+        elif "FROM movie_genres" in sql:
+            return self.aggregates['genres']
+        elif "DATE(date_joined) AS day" in sql:
+            return self.aggregates['signups']
+        elif "DATE(created_at) AS day" in sql:
+            return self.aggregates['uploads']
+        elif "u.username, COUNT(*) AS count" in sql:
+            return self.aggregates['user_actions']
+        elif sql.startswith("DELETE FROM dashboard_rollup"):
+            self.rollup = [row for row in self.rollup if row[0] < params[0]]
+        elif "FROM dashboard_rollup" in sql:
+            return [
+                {'metric_date': day, 'metric': metric, 'dimension': dimension, 'value': value, 'payload': payload,
+                 'updated_at': updated_at, 'today': TODAY, 'age_seconds': self.age_seconds}
+                for day, metric, dimension, value, payload, updated_at in self.rollup
+            ]
+
+    def executemany(self, cursor, sql, seq_params):
+        self.rollup.extend(list(row) + [datetime.now()] for row in seq_params)
+
+class TestDashboardRollup(unittest.TestCase):
+    """Test cases for the admin dashboard rollup and its refresh from dashboard views"""
+
+    def setUp(self):
+        self.db = FakeRollupDB()
+        self.originals = (database.get_conn, database.start_dashboard_rollup_job, database._rollup_refresh_attempted_at)
+        database.get_conn = self.db.connect
+        database.start_dashboard_rollup_job = lambda: None
+        database._rollup_refresh_attempted_at = 0.0
+
+    def tearDown(self):
+        database.get_conn, database.start_dashboard_rollup_job, database._rollup_refresh_attempted_at = self.originals
+
+    def test_refresh_writes_the_rollup_the_dashboard_reads(self):
+        """A missing rollup is refreshed once, then every metric comes from the rollup rows"""
+        metrics = database.get_dashboard_snapshot()
+        self.assertEqual(self.db.lock_attempts, 1)
+        self.assertEqual((metrics['total_users'], metrics['total_movies'], metrics['avg_watch_time']), (10, 4, 42.5))
+        self.assertEqual(metrics['genre_distribution'][0], {'genre': 'Drama', 'count': 3})
+        self.assertEqual(len(metrics['weekly_signups']), database.DASHBOARD_WINDOW_DAYS)
+        self.assertEqual(metrics['weekly_signups'][-1], {'signup_date': TODAY, 'count': 2})
+        self.assertEqual(metrics['user_growth_pct'], 100.0)
+        self.assertEqual(metrics['movies_uploaded_today'], 1)
+        self.assertEqual(metrics['recent_activity'], 7)
+        self.assertEqual(metrics['most_active_users'][0], {'username': 'ann', 'action_count': 5})
+
+        # A second refresh replaces the window instead of appending to it
+        rows = len(self.db.rollup)
+        self.assertTrue(database.refresh_dashboard_rollup())
+        self.assertEqual(len(self.db.rollup), rows)
+
+    def test_fresh_rollup_is_not_refreshed(self):
+        """Dashboard views only read the rollup while it is recent"""
+        database.refresh_dashboard_rollup()
+        self.db.lock_attempts = 0
+        database.get_dashboard_snapshot()
+        self.assertEqual(self.db.lock_attempts, 0)
+
+    def test_stale_rollup_is_refreshed_once_per_interval(self):
+        """A refresh that keeps failing is not retried by every dashboard view"""
+        database.refresh_dashboard_rollup()
+        self.db.age_seconds = 3 * database.DASHBOARD_ROLLUP_INTERVAL_SECONDS
+        self.db.lock_free = False
+        self.db.lock_attempts = 0
+        for _ in range(3):
+            self.assertEqual(database.get_dashboard_snapshot()['total_users'], 10)
+        self.assertEqual(self.db.lock_attempts, 1)
+
+        database._rollup_refresh_attempted_at -= database.DASHBOARD_ROLLUP_INTERVAL_SECONDS
+        database.get_dashboard_snapshot()
+        self.assertEqual(self.db.lock_attempts, 2)
+
+if __name__ == "__main__":
+    unittest.main()
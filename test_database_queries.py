@@ -0,0 +1,157 @@
+import unittest
+import sys
+import os
+import inspect
+import re
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_fakes import FakeCursor, FakeDB
+from modules import database
+
+class RecordingDB(FakeDB):
+    """Records the SQL it is given and returns no rows (but grants named locks)"""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, cursor, sql, params):
+        self.statements.append(sql)
+        if "GET_LOCK" in sql:
+            return [{'acquired': 1}]
+
+    def executemany(self, cursor, sql, seq_params):
+        self.statements.append(sql)
+
+def schema_tables():
+    """Tables created by init_database"""
+    return set(re.findall(r"CREATE TABLE IF NOT EXISTS (\w+)", inspect.getsource(database._create_schema)))
+
+def referenced_tables(sql):
+    return set(re.findall(r"\b(?:FROM|JOIN)\s+([a-z_]+)\b", sql))
+
+class TestQueriesMatchSchema(unittest.TestCase):
+    """The aggregate queries only read tables that init_database creates"""
+
+    def test_profile_query_tables_exist(self):
+        db = RecordingDB()
+        original = database.get_conn
+        database.get_conn = db.connect
+        try:
+            database._query_user_profile(1)
+        finally:
+            database.get_conn = original
+        tables = referenced_tables(" ".join(db.statements))
+        self.assertIn('ratings', tables)
+        self.assertEqual(tables - schema_tables(), set())
+
+    def test_poster_filters_compare_the_generated_column(self):
+        """has_poster is compared with a constant, so idx_movies_has_poster can serve the lookups"""
+        db = RecordingDB()
+        original = database.get_conn
+        database.get_conn = db.connect
+        try:
+            database.refresh_trending_movies()
+            database._next_posterless_movies(FakeCursor(db), 0, 10)
+        finally:
+            database.get_conn = original
+        predicates = [sql for sql in db.statements if "has_poster" in sql]
+        self.assertEqual(len(predicates), 3)
+        self.assertIn("WHERE m.has_poster = 1", predicates[0])
+        self.assertIn("WHERE has_poster = 1", predicates[1])
+        self.assertIn("m.has_poster = 0", predicates[2])
+
+class TestQueriesOnMySQL(unittest.TestCase):
+    """
+    Runs queries against the real schema, created by init_database in a scratch
+    database next to the configured one. Skipped when MySQL is not reachable.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.config = database.get_db_config()
+            conn = database.get_conn()
+        except Exception as e:
+            raise unittest.SkipTest(f"MySQL is not reachable: {e}")
+        cls.scratch = f"movieapp_test_{os.getpid()}"
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"CREATE DATABASE {cls.scratch}")
+        except Exception as e:
+            raise unittest.SkipTest(f"Cannot create a scratch database: {e}")
+        finally:
+            cursor.close()
+            conn.close()
+        database.DB_CONFIG = dict(cls.config, database=cls.scratch)
+        database.init_database(force=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        conn = database.get_conn()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"DROP DATABASE {cls.scratch}")
+        finally:
+            cursor.close()
+            conn.close()
+            database.DB_CONFIG = cls.config
+            database._schema_verified = False
+
+    def execute(self, sql, params=()):
+        conn = database.get_conn()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            conn.commit()
+            return cursor.lastrowid
+        finally:
+            cursor.close()
+            conn.close()
+
+    def test_profile_aggregates(self):
+        """Join date, watch counts, genres and ratings come back from one query"""
+        user_id = self.execute("INSERT INTO users (username, email, password_hash) VALUES ('ann', 'ann@example.com', 'x')")
+        heat = self.execute("INSERT INTO movies (title, type, genre, release_year) VALUES ('Heat', 'Movie', 'Crime', 1995)")
+        ronin = self.execute("INSERT INTO movies (title, type, genre, release_year) VALUES ('Ronin', 'Movie', 'Crime', 1998)")
+        up = self.execute("INSERT INTO movies (title, type, genre, release_year) VALUES ('Up', 'Movie', 'Animation', 2009)")
+        for movie_id in (heat, heat, ronin, up):
+            self.execute("INSERT INTO history (user_id, movie_id) VALUES (%s, %s)", (user_id, movie_id))
+        self.execute("INSERT INTO ratings (user_id, movie_id, rating, review) VALUES (%s, %s, 5, 'Great')", (user_id, heat))
+        self.execute("INSERT INTO ratings (user_id, movie_id, rating) VALUES (%s, %s, 4)", (user_id, up))
+
+        profile, ok = database._query_user_profile(user_id)
+        self.assertTrue(ok)
+        self.assertIsNotNone(profile['date_joined'])
+        self.assertEqual((profile['watched'], profile['history_rows']), (3, 4))
+        self.assertEqual(profile['genres'], [('Crime', 3), ('Animation', 1)])
+        self.assertEqual((profile['average_rating'], profile['total_reviews']), (4.5, 2))
+
+    def test_has_poster_column_and_trending_fallback(self):
+        """has_poster is computed by MySQL; the trending fallback only lists movies with a poster"""
+        posters = {
+            'Poster': 'https://image.tmdb.org/t/p/w500/a.jpg',
+            'Padded': '  http://example.com/b.jpg',
+            'Placeholder': 'https://example.com/placeholder_1.jpg',
+            'Relative': '/posters/c.jpg',
+            'Empty': '',
+            'Missing': None,
+        }
+        for title, url in posters.items():
+            self.execute("INSERT INTO movies (title, type, release_year, poster_url) VALUES (%s, 'Movie', 2001, %s)", (title, url))
+        conn = database.get_conn()
+        cursor = database.get_cursor(conn)
+        try:
+            cursor.execute("SELECT title, has_poster FROM movies WHERE release_year = 2001")
+            flags = {row['title']: bool(row['has_poster']) for row in cursor.fetchall()}
+            self.assertEqual({title for title, flag in flags.items() if flag}, {'Poster', 'Padded'})
+            self.assertTrue(database.refresh_trending_movies())
+            cursor.execute("SELECT m.title FROM trending_movies t JOIN movies m ON m.id = t.movie_id")
+            self.assertTrue({row['title'] for row in cursor.fetchall()} & set(posters) <= {'Poster', 'Padded'})
+        finally:
+            cursor.close()
+            conn.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+import io
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PIL import Image
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import image_cache
+
+def poster_bytes(color):
+    out = io.BytesIO()
+    Image.new("RGB", (500, 750), color).save(out, "PNG")
+    return out.getvalue()
+
+class StubImages(BaseHTTPRequestHandler):
+    """Serves /red.png and /red-copy.png (same bytes) and /blue.png; anything else is a 404"""
+    images = {"/red.png": poster_bytes("red"), "/red-copy.png": poster_bytes("red"), "/blue.png": poster_bytes("blue")}
+    hits = []
+
+    def do_GET(self):
+        StubImages.hits.append(self.path)
+        body = StubImages.images.get(self.path)
+        self.send_response(200 if body else 404)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestImageCache(unittest.TestCase):
+    """Test cases for the local poster thumbnail cache"""
+
+    def setUp(self):
+        StubImages.hits = []
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_dir = image_cache.IMAGE_CACHE_DIR
+        image_cache.IMAGE_CACHE_DIR = self.tmp.name
+        image_cache._cache_bytes = None
+        image_cache._failures.clear()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubImages)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        image_cache.IMAGE_CACHE_DIR = self.original_dir
+        self.tmp.cleanup()
+
+    def test_posters_are_resized_once_and_content_addressed(self):
+        """A poster is downloaded once; identical images share one thumbnail file"""
+        first = image_cache.poster_path(self.base + "/red.png")
+        self.assertEqual(image_cache.poster_path(self.base + "/red.png"), first)
+        self.assertEqual(image_cache.poster_path(self.base + "/red-copy.png"), first)
+        self.assertEqual(StubImages.hits, ["/red.png", "/red-copy.png"])
+        with Image.open(first) as thumb:
+            self.assertEqual(thumb.format, image_cache.thumbnail_format())
+            self.assertEqual(thumb.size, (image_cache.THUMBNAIL_WIDTH, 513))
+
+    def test_broken_urls_fall_back_without_refetching(self):
+        """Failed downloads return None and are not retried until the failure expires"""
+        self.assertIsNone(image_cache.poster_path(self.base + "/missing.png"))
+        self.assertIsNone(image_cache.poster_path(self.base + "/missing.png"))
+        self.assertEqual(StubImages.hits, ["/missing.png"])
+        self.assertIsNone(image_cache.poster_path("not a url"))
+        self.assertTrue(os.path.exists(image_cache.placeholder_path()))
+
+    def test_eviction_removes_least_recently_used(self):
+        """Eviction deletes the thumbnails that were used longest ago"""
+        image_cache.prefetch([self.base + "/red.png", self.base + "/blue.png"])
+        red = image_cache.poster_path(self.base + "/red.png")
+        blue = image_cache.poster_path(self.base + "/blue.png")
+        os.utime(red, (1, 1))
+        image_cache.evict(max_bytes=os.path.getsize(blue))
+        self.assertFalse(os.path.exists(red))
+        self.assertTrue(os.path.exists(blue))
+        # The evicted poster is fetched again on its next use
+        self.assertTrue(os.path.exists(image_cache.poster_path(self.base + "/red.png")))
+
+    def test_render_misses_are_cached_in_the_background(self):
+        """A miss returns the remote URL at once; the thumbnail is served once it is cached"""
+        url = self.base + "/blue.png"
+        self.assertEqual(image_cache.poster_source(url), url)
+        for _ in range(500):
+            if not image_cache._pending:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(image_cache.poster_source(url), image_cache.poster_path(url))
+        self.assertEqual(StubImages.hits, ["/blue.png"])
+        self.assertIsNone(image_cache.poster_source("not a url"))
+
+if __name__ == "__main__":
+    unittest.main()
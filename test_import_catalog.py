@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import import_catalog
+from modules import database
+
+class TestImportCatalog(unittest.TestCase):
+    """Test cases for the command-line catalog import"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_jsonl_source_is_read_in_chunks(self):
+        """JSON Lines input is streamed in chunks that validate like CSV rows"""
+        path = self.write("movies.jsonl", "".join(json.dumps({"title": f"M{i}", "release_year": 2000 + i}) + "\n" for i in range(5)))
+        chunks = list(import_catalog.prefetch(import_catalog.read_chunks("jsonl", [path], 2)))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        rows, errors = database.validate_movie_chunk(chunks[2])
+        self.assertEqual((rows['title'].tolist(), rows['release_year'].tolist(), errors), (["M4"], [2004], []))
+
+    def test_dry_run_validates_without_connecting(self):
+        """--dry-run reports valid and rejected rows and never opens a connection"""
+        path = self.write("movies.csv", "title,release_year\nA,2001\n,2002\nB,abc\nC,\n")
+        original = database.get_conn
+        database.get_conn = lambda **kwargs: self.fail("dry run must not connect")
+        out = io.StringIO()
+        try:
+            with redirect_stdout(out):
+                code = import_catalog.main(["csv", path, "--dry-run", "--chunk-size", "2"])
+        finally:
+            database.get_conn = original
+        self.assertEqual(code, 0)
+        self.assertIn("Dry run: 2 valid, 2 rejected of 4 rows", out.getvalue())
+        self.assertIn("Row 3: 'title' cannot be empty.", out.getvalue())
+
+    def run_main(self, argv):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = import_catalog.main(argv)
+        return code, out.getvalue()
+
+    def test_tmdb_errors_use_movies_file_lines(self):
+        """Rows dropped by the TMDB transform still count, and errors name the movies file line"""
+        movies = self.write("movies.csv", "id,title,genres,release_date,overview\n"
+                                          "1,A,[],2001-01-01,x\n2,No credits,[],2002-01-01,x\n3,,[],2003-01-01,x\n4,D,[],,x\n")
+        credits = self.write("credits.csv", 'movie_id,title,cast,crew\n1,A,[],[]\n3,C,[],[]\n4,D,[],[]\n')
+        code, out = self.run_main(["tmdb", movies, credits, "--dry-run", "--chunk-size", "2", "--workers", "1"])
+        self.assertEqual(code, 0)
+        self.assertIn("Row 4: 'title' cannot be empty.", out)
+        self.assertIn("1 rows were dropped before validation", out)
+        self.assertIn("Dry run: 2 valid, 1 rejected of 4 rows", out)
+
+    def test_uploader_must_exist(self):
+        """Without --uploaded-by the first admin is recorded; an unknown user stops the import before loading"""
+        path = self.write("movies.csv", "title\nA\n")
+        lookups = []
+        originals = (database.get_import_uploader_id, database.load_movie_chunks)
+
+        def uploader(user_id=None):
+            lookups.append(user_id)
+            return 7 if user_id is None else None
+
+        def load(chunks, uploaded_by, **kwargs):
+            self.assertEqual(uploaded_by, 7)
+            return True, {'rows': 1, 'dropped': 0, 'valid': 1, 'inserted': 1, 'updated': 0, 'skipped': 0, 'rejected': 0,
+                          'errors': [], 'seconds': 0.0, 'error': None}
+        database.get_import_uploader_id, database.load_movie_chunks = uploader, load
+        try:
+            self.assertEqual(self.run_main(["csv", path])[0], 0)
+            with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                self.run_main(["csv", path, "--uploaded-by", "99"])
+        finally:
+            database.get_import_uploader_id, database.load_movie_chunks = originals
+        self.assertEqual(lookups, [None, 99])
+
+    def test_reader_errors_are_raised_to_the_loader(self):
+        """A failing reader surfaces its error instead of ending the import silently"""
+        chunks = import_catalog.prefetch(import_catalog.read_chunks("csv", [os.path.join(self.tmp.name, "missing.csv")], 10))
+        with self.assertRaises(OSError):
+            list(chunks)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_fakes import FakeDB
+from modules import instrumentation
+
+class ExplainDB(FakeDB):
+    """Answers every statement with one EXPLAIN-like tuple row, to exercise the instrumented proxy"""
+
+    def execute(self, cursor, sql, params):
+        cursor.rowcount = 2
+        cursor.description = [('id',), ('select_type',)]
+        return [(1, 'SIMPLE')]
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for the database instrumentation registry"""
+
+    def setUp(self):
+        instrumentation.reset()
+
+    def test_histogram_percentiles(self):
+        """Percentiles report the upper bound of the containing bucket"""
+        hist = instrumentation.Histogram()
+        for ms in [0.5] * 90 + [40] * 9 + [20000]:
+            hist.observe(ms)
+        self.assertEqual(hist.percentile(50), 1.0)
+        self.assertEqual(hist.percentile(95), 50.0)
+        self.assertEqual(hist.percentile(100), 20000)
+        self.assertEqual(hist.summary()['count'], 100)
+
+    def test_normalize_sql_groups_in_lists(self):
+        """Statements differing only in IN-list length share one entry"""
+        a = instrumentation.normalize_sql("SELECT *\n  FROM movies WHERE id IN (%s, %s)")
+        b = instrumentation.normalize_sql("SELECT * FROM movies WHERE id IN (%s)")
+        self.assertEqual(a, b)
+
+    def test_instrument_module_wraps_db_functions_only(self):
+        """Only functions that open connections are wrapped and timed"""
+        namespace = {'__name__': 'fake_db', 'connect': ExplainDB().connect}
+        exec(
+            "def get_conn():\n    return connect()\n"
+            "def read_rows():\n    return get_conn()\n"
+            "def pure_helper():\n    return 1\n",
+            namespace
+        )
+        pure_helper = namespace['pure_helper']
+        instrumentation.instrument_module(namespace, exclude={'get_conn'})
+        self.assertTrue(getattr(namespace['read_rows'], '__instrumented__', False))
+        self.assertIs(namespace['pure_helper'], pure_helper)
+        namespace['read_rows']()
+        self.assertEqual(instrumentation.functions['read_rows']['latency'].count, 1)
+
+    def test_slow_select_is_explained(self):
+        """Slow SELECTs are logged with their EXPLAIN plan when the cursor closes"""
+        original = instrumentation.SLOW_QUERY_MS
+        instrumentation.SLOW_QUERY_MS = 0
+        try:
+            conn = ExplainDB().connect()
+            cursor = instrumentation.InstrumentedCursor(conn.cursor(), conn)
+            cursor.execute("SELECT * FROM movies WHERE id = %s", (1,))
+            cursor.fetchall()
+            cursor.close()
+        finally:
+            instrumentation.SLOW_QUERY_MS = original
+        stats = instrumentation.snapshot()
+        self.assertEqual(stats['statements'][0]['rows'], 2)
+        self.assertEqual(stats['slow_queries'][0]['explain'], [{'id': 1, 'select_type': 'SIMPLE'}])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_fakes import FakeDB
+from modules import database, tmdb
+
+class FakeSyncDB(FakeDB):
+    """In-memory stand-in for the statements used by sync_movie_metadata"""
+
+    def __init__(self, movies):
+        self.movies = movies  # id -> row dict
+        self.tag_syncs = []
+
+    def execute(self, cursor, sql, params):
+        if sql.startswith("SELECT GET_LOCK"):
+            return [{'acquired': 1}]
+        elif sql.startswith("SELECT id, title, release_year, tmdb_id"):
+            after_id, _, limit = params
+            pending = [i for i in sorted(self.movies) if i > after_id and not self.movies[i]['metadata_synced_at']]
+            return [dict(self.movies[i], id=i) for i in pending[:limit]]
+        elif sql.startswith("SELECT id, genre, audio_languages"):
+            return [dict(self.movies[i], id=i) for i in params]
+
+    def executemany(self, cursor, sql, seq_params):
+        for tmdb_id, keywords, trailer, languages, genre, cast, poster, movie_id in seq_params:
+            movie = self.movies[movie_id]
+            movie['tmdb_id'] = tmdb_id or movie['tmdb_id']
+            movie['keywords'] = keywords or movie['keywords']
+            for column, value in (('trailer_url', trailer), ('audio_languages', languages), ('genre', genre), ('cast', cast)):
+                if not movie[column]:
+                    movie[column] = value
+            movie['metadata_synced_at'] = 'now'
+
+def movie(title, year, **values):
+    row = {'title': title, 'release_year': year, 'tmdb_id': None, 'keywords': None, 'trailer_url': None,
+           'audio_languages': None, 'genre': None, 'cast': None, 'metadata_synced_at': None}
+    row.update(values)
+    return row
+
+class TestMetadataSync(unittest.TestCase):
+    """Test cases for the batched TMDb metadata sync job"""
+
+    def setUp(self):
+        self.db = FakeSyncDB({
+            1: movie('Heat', 1995, trailer_url='https://youtu.be/admin'),
+            2: movie('Nothing', 2001),
+            3: movie('Offline', 1999),
+        })
+        self.originals = (database.get_conn, database._sync_movie_tags, tmdb.get_api_key, tmdb.fetch_metadata_bulk)
+        database.get_conn = self.db.connect
+        database._sync_movie_tags = lambda cursor, movies: self.db.tag_syncs.extend(movies)
+        tmdb.get_api_key = lambda: "key"
+
+        def fetch(items, api_key=None, **kwargs):
+            known = {'Heat': {'tmdb_id': 949, 'keywords': 'bank robbery', 'trailer_url': 'https://www.youtube.com/watch?v=t',
+                              'audio_languages': 'English, Spanish', 'genre': 'Crime', 'cast': 'Al Pacino', 'poster_url': None},
+                     'Nothing': None}
+            return {item: known[item[0]] for item in items if item[0] in known}
+        tmdb.fetch_metadata_bulk = fetch
+
+    def tearDown(self):
+        database.get_conn, database._sync_movie_tags, tmdb.get_api_key, tmdb.fetch_metadata_bulk = self.originals
+
+    def test_sync_fills_empty_fields_only(self):
+        """Fetched metadata fills empty columns, keeps admin values, and failures stay pending"""
+        summary = database.sync_movie_metadata(batch_size=2)
+        self.assertEqual(summary, {'scanned': 3, 'synced': 1, 'not_found': 1, 'failed': 1})
+        heat = self.db.movies[1]
+        self.assertEqual(heat['trailer_url'], 'https://youtu.be/admin')
+        self.assertEqual((heat['tmdb_id'], heat['keywords'], heat['audio_languages']), (949, 'bank robbery', 'English, Spanish'))
+        self.assertEqual(self.db.movies[2]['metadata_synced_at'], 'now')
+        self.assertIsNone(self.db.movies[3]['metadata_synced_at'])
+        self.assertEqual([row[0] for row in self.db.tag_syncs], [1, 2])
+
+        # Only the failed lookup is attempted again
+        self.assertEqual(database.sync_movie_metadata()['scanned'], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+import gc
+import threading
+import urllib.request
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_fakes import FakeDB
+from modules import metrics
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the Prometheus metrics exporter"""
+
+    def test_histogram_renders_cumulative_buckets(self):
+        """Histogram buckets are cumulative and end with +Inf, _sum and _count"""
+        hist = metrics.Histogram("test_latency_seconds", "Test latency.", ["op"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            hist.observe(value, op="read")
+        text = metrics.render()
+        self.assertIn('movieapp_test_latency_seconds_bucket{op="read",le="0.1"} 1', text)
+        self.assertIn('movieapp_test_latency_seconds_bucket{op="read",le="1.0"} 2', text)
+        self.assertIn('movieapp_test_latency_seconds_bucket{op="read",le="+Inf"} 3', text)
+        self.assertIn('movieapp_test_latency_seconds_count{op="read"} 3', text)
+        self.assertIn("# TYPE movieapp_test_latency_seconds histogram", text)
+
+    def test_tracked_connect_counts_open_connections(self):
+        """Open connections are counted until the connection object is released"""
+        before = metrics.db_connections_in_use._values.get((), 0)
+        connect = metrics.tracked_connect(FakeDB().connect)
+        conn = connect()
+        self.assertEqual(metrics.db_connections_in_use._values[()], before + 1)
+        del conn
+        gc.collect()
+        self.assertEqual(metrics.db_connections_in_use._values[()], before)
+
+    def test_section_timer_records_each_section(self):
+        """Each started section is observed once when the next one starts"""
+        sections = metrics.SectionTimer("test_page")
+        sections.start("header")
+        sections.start("grid")
+        sections.stop()
+        sections.stop()
+        for section in ("header", "grid"):
+            state = metrics.section_seconds._values[("test_page", section)]
+            self.assertEqual(state[2], 1)
+
+    def test_http_endpoint_serves_metrics(self):
+        """The exporter serves /metrics from a background thread"""
+        server = metrics.ThreadingHTTPServer(("127.0.0.1", 0), metrics._MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            body = urllib.request.urlopen(url, timeout=5).read().decode("utf-8")
+            self.assertIn("movieapp_cache_requests_total", body)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_fakes import FakeCursor, FakeDB
+from modules import database
+
+class FakeTagDB(FakeDB):
+    """In-memory stand-in for the movie_genres/movie_languages statements"""
+
+    def __init__(self, movies):
+        self.movies = movies  # id -> (genre, audio_languages)
+        self.genres = set()
+        self.languages = set()
+        self.statements = []
+
+    def execute(self, cursor, sql, params):
+        self.statements.append((sql, list(params or [])))
+        if sql.startswith("SELECT m.id, m.genre, m.audio_languages FROM movies m"):
+            after_id, limit = params
+            tagged = {movie_id for movie_id, _ in self.genres | self.languages}
+            rows = []
+            for movie_id in sorted(self.movies):
+                genre, languages = self.movies[movie_id]
+                if movie_id <= after_id:
+                    continue
+                if "NOT EXISTS" in sql and (movie_id in tagged or not (genre or languages)):
+                    continue
+                rows.append({'id': movie_id, 'genre': genre, 'audio_languages': languages})
+            return rows[:limit]
+        elif sql.startswith("DELETE FROM movie_genres"):
+            self.genres = {row for row in self.genres if row[0] not in params}
+        elif sql.startswith("DELETE FROM movie_languages"):
+            self.languages = {row for row in self.languages if row[0] not in params}
+
+    def executemany(self, cursor, sql, seq_params):
+        table = self.genres if "movie_genres" in sql else self.languages
+        table.update(tuple(row) for row in seq_params)
+
+class TestMovieTags(unittest.TestCase):
+    """Test cases for the genre/language tag tables"""
+
+    def setUp(self):
+        self.db = FakeTagDB({
+            1: ('Drama, Crime', 'English'),
+            2: ('Comedy', 'French, English'),
+            3: (None, None),
+            4: ('Horror', ''),
+        })
+        self.original = database.get_conn
+        database.get_conn = self.db.connect
+
+    def tearDown(self):
+        database.get_conn = self.original
+
+    def test_split_tags(self):
+        """Tags are trimmed, de-duplicated and capped at the column width; blanks and 'nan' are dropped"""
+        self.assertEqual(database.split_tags(" Drama,Crime , Drama,, nan"), ['Drama', 'Crime'])
+        self.assertEqual(database.split_tags(None), [])
+        self.assertEqual(database.split_tags("x" * 150), ["x" * 100])
+
+    def test_sync_replaces_a_movies_tags(self):
+        """Re-syncing a movie drops the tags its columns no longer list"""
+        cursor = FakeCursor(self.db)
+        database._sync_movie_tags(cursor, [(1, 'Drama, Crime', 'English')])
+        database._sync_movie_tags(cursor, [(1, 'Drama', 'English, Spanish')])
+        self.assertEqual(self.db.genres, {(1, 'Drama')})
+        self.assertEqual(self.db.languages, {(1, 'English'), (1, 'Spanish')})
+
+    def test_interrupted_backfill_is_resumed(self):
+        """The migration tags the movies that have none, leaving tagged ones alone"""
+        self.db.genres = {(1, 'Drama')}
+        self.assertEqual(database.migrate_movie_tag_tables(), 2)
+        self.assertEqual(self.db.genres, {(1, 'Drama'), (2, 'Comedy'), (4, 'Horror')})
+        self.assertEqual(self.db.languages, {(2, 'French'), (2, 'English')})
+        self.assertEqual(database.migrate_movie_tag_tables(), 0)
+
+    def test_genre_and_language_filters_use_the_tag_tables(self):
+        """Filters are EXISTS lookups on the tag tables, with the tags passed as parameters"""
+        database._query_movies_paginated(1, 12, None, None, ['Drama', 'Crime'], None, None, ['English'], 'popularity')
+        sql, params = self.db.statements[0]
+        self.assertIn("EXISTS (SELECT 1 FROM movie_genres mg WHERE mg.movie_id = m.id AND mg.genre IN (%s, %s))", sql)
+        self.assertIn("EXISTS (SELECT 1 FROM movie_languages ml WHERE ml.movie_id = m.id AND ml.language IN (%s))", sql)
+        self.assertNotIn("m.genre LIKE", sql)
+        self.assertEqual(params, ['Drama', 'Crime', 'English'])
+
+if __name__ == "__main__":
+    unittest.main()
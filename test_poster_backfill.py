@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+import threading
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_fakes import FakeDB
+from modules import database, scheduler, tmdb
+
+class FakeBackfillDB(FakeDB):
+    """In-memory stand-in for the statements used by backfill_missing_posters"""
+
+    def __init__(self, movies):
+        self.movies = movies  # id -> {'title', 'release_year', 'poster_url'}
+        self.outcomes = {}
+        self.updates = []
+
+    def execute(self, cursor, sql, params):
+        if sql.startswith("SELECT GET_LOCK"):
+            return [{'acquired': 1}]
+        elif sql.startswith("SELECT m.id, m.title"):
+            after_id, _, _, limit = params
+            pending = [movie_id for movie_id in sorted(self.movies)
+                       if movie_id > after_id and not self.movies[movie_id]['poster_url'] and movie_id not in self.outcomes]
+            return [dict(self.movies[movie_id], id=movie_id) for movie_id in pending[:limit]]
+        elif sql.startswith("UPDATE movies SET poster_url = CASE"):
+            self.updates.append(sql)
+            pairs = params[:len(params) * 2 // 3]
+            for movie_id, url in zip(pairs[::2], pairs[1::2]):
+                self.movies[movie_id]['poster_url'] = url
+
+    def executemany(self, cursor, sql, seq_params):
+        for movie_id, status, _ in seq_params:
+            self.outcomes[movie_id] = status
+
+class TestPosterBackfill(unittest.TestCase):
+    """Test cases for the background poster backfill job"""
+
+    def setUp(self):
+        self.db = FakeBackfillDB({
+            1: {'title': 'Heat', 'release_year': 1995, 'poster_url': ''},
+            2: {'title': 'Up', 'release_year': 2009, 'poster_url': 'https://image.tmdb.org/t/p/w500/up.jpg'},
+            3: {'title': 'Unknown', 'release_year': None, 'poster_url': None},
+            4: {'title': 'Offline', 'release_year': 2001, 'poster_url': ''},
+            5: {'title': 'Alien', 'release_year': 1979, 'poster_url': ''},
+        })
+        self.originals = (database.get_conn, tmdb.get_api_key, tmdb.resolve_posters)
+        database.get_conn = self.db.connect
+        tmdb.get_api_key = lambda: "key"
+
+        def resolve(items, api_key=None, **kwargs):
+            posters = {'Heat': 'https://img/heat.jpg', 'Alien': 'https://img/alien.jpg', 'Unknown': None}
+            return {item: posters[item[0]] for item in items if item[0] in posters}
+        tmdb.resolve_posters = resolve
+
+    def tearDown(self):
+        database.get_conn, tmdb.get_api_key, tmdb.resolve_posters = self.originals
+
+    def test_backfill_writes_batches_and_records_outcomes(self):
+        """Posters are written with one UPDATE per batch; every lookup outcome is recorded"""
+        summary = database.backfill_missing_posters(batch_size=2)
+        self.assertEqual(summary, {'scanned': 4, 'resolved': 2, 'not_found': 1, 'failed': 1})
+        self.assertEqual(len(self.db.updates), 2)
+        self.assertEqual(self.db.movies[1]['poster_url'], 'https://img/heat.jpg')
+        self.assertEqual(self.db.movies[5]['poster_url'], 'https://img/alien.jpg')
+        self.assertEqual(self.db.outcomes, {1: 'resolved', 3: 'not_found', 4: 'failed', 5: 'resolved'})
+
+        # Recorded movies are not looked up again
+        self.assertEqual(database.backfill_missing_posters()['scanned'], 0)
+
+    def test_run_now_wakes_a_periodic_job(self):
+        """scheduler.run_now starts the next run without waiting for the interval"""
+        ran = threading.Event()
+        scheduler.start_periodic('test_run_now', 3600, ran.set, run_immediately=False)
+        try:
+            self.assertTrue(scheduler.run_now('test_run_now'))
+            self.assertTrue(ran.wait(5))
+        finally:
+            scheduler.stop('test_run_now')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import sys
+import os
+import json
+import time
+import tempfile
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import metrics, profiling
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+class TestProfiling(unittest.TestCase):
+    """Test cases for the per-rerun profiler"""
+
+    def test_sampled_rerun_writes_folded_stacks_per_section(self):
+        """Samples are rooted at page;section and section timings are summarized"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            with profiling.RerunProfiler("test_page", "sample", output_dir) as profiler:
+                sections = metrics.SectionTimer("test_page")
+                sections.start("header")
+                busy(0.05)
+                sections.start("grid")
+                busy(0.1)
+                sections.stop()
+            folded = [f for f in profiler.output_files if f.endswith(".folded")][0]
+            with open(folded, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            self.assertTrue(any(line.startswith("test_page;grid;") and "busy" in line for line in lines))
+            summary_file = [f for f in profiler.output_files if f.endswith(".json")][0]
+            with open(summary_file, encoding="utf-8") as f:
+                summary = json.load(f)
+            self.assertEqual(set(summary['sections_ms']), {"header", "grid"})
+            self.assertGreaterEqual(summary['sections_ms']['grid'], 100)
+
+    def test_cprofile_mode_writes_pstats(self):
+        """The deterministic mode writes a .prof file readable by pstats"""
+        import pstats
+        with tempfile.TemporaryDirectory() as output_dir:
+            with profiling.RerunProfiler("test_page", "cprofile", output_dir) as profiler:
+                busy(0.01)
+            prof = [f for f in profiler.output_files if f.endswith(".prof")][0]
+            self.assertTrue(pstats.Stats(prof).total_calls > 0)
+
+    def test_profiling_is_off_by_default_and_not_nested(self):
+        """Without a request nothing is profiled, and an active profiler is not nested"""
+        self.assertIsNone(profiling.requested_mode())
+        with tempfile.TemporaryDirectory() as output_dir:
+            with profiling.RerunProfiler("outer", "sample", output_dir):
+                self.assertNotIsInstance(profiling.profile_rerun("inner"), profiling.RerunProfiler)
+        self.assertIsNone(profiling.active())
+
+    def profiled_reruns(self, user):
+        from streamlit.testing.v1 import AppTest
+        app = AppTest.from_string(
+            "import streamlit as st\n"
+            "from modules import profiling\n"
+            "st.session_state.setdefault('modes', []).append(profiling.requested_mode())\n"
+        )
+        app.session_state.user = user
+        app.query_params["profile"] = "1"
+        app.run()
+        app.run()
+        return app.session_state.modes
+
+    def test_query_parameter_profiles_a_single_rerun(self):
+        """?profile=1 is consumed by the rerun it profiles"""
+        self.assertEqual(self.profiled_reruns({'id': 1, 'is_admin': True}), ['sample', None])
+
+    def test_query_parameter_is_ignored_for_non_admins(self):
+        """Anonymous visitors and regular users cannot trigger a profile"""
+        self.assertEqual(self.profiled_reruns(None), [None, None])
+        self.assertEqual(self.profiled_reruns({'id': 2, 'is_admin': False}), [None, None])
+
+    def test_profile_directory_is_capped(self):
+        """Only the newest PROFILE_MAX_FILES files are kept"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            for i in range(5):
+                path = os.path.join(output_dir, f"app-{i}.json")
+                with open(path, "w") as f:
+                    f.write("{}")
+                os.utime(path, (1000 + i, 1000 + i))
+            profiling.prune(output_dir, max_files=2)
+            self.assertEqual(sorted(os.listdir(output_dir)), ["app-3.json", "app-4.json"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import query_cache
+
+class TestQueryCache(unittest.TestCase):
+    """Test cases for the two-tier query result cache"""
+
+    def setUp(self):
+        self.calls = 0
+
+    def compute(self, value="rows", ok=True):
+        def run():
+            self.calls += 1
+            return f"{value}-{self.calls}", ok
+        return run
+
+    def test_equivalent_parameters_share_an_entry(self):
+        """Empty values, whitespace and list order do not create separate entries"""
+        cache = query_cache.QueryCache()
+        first = cache.get_or_compute('movies', {'query': ' ', 'genres': ['Drama', 'Action']}, self.compute(), 60)
+        second = cache.get_or_compute('movies', {'query': None, 'genres': ['Action', 'Drama']}, self.compute(), 60)
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, 1)
+
+    def test_tag_invalidation_and_ttl(self):
+        """Invalidating a tag or expiring the TTL forces a recompute; other tags are untouched"""
+        cache = query_cache.QueryCache()
+        cache.get_or_compute('trending', {}, self.compute(), 60, tags=('catalog', 'ratings'))
+        cache.get_or_compute('bounds', {}, self.compute(), 60, tags=('catalog',))
+        cache.invalidate('ratings')
+        self.assertEqual(cache.get_or_compute('trending', {}, self.compute(), 60, tags=('catalog', 'ratings')), "rows-3")
+        self.assertEqual(cache.get_or_compute('bounds', {}, self.compute(), 60, tags=('catalog',)), "rows-2")
+        cache.get_or_compute('short', {}, self.compute(), 0.01)
+        time.sleep(0.02)
+        self.assertEqual(cache.get_or_compute('short', {}, self.compute(), 0.01), "rows-5")
+
+    def test_failures_are_not_cached_and_lru_is_bounded(self):
+        """Results with ok=False are recomputed; the least recently used entry is evicted"""
+        cache = query_cache.QueryCache(max_entries=2)
+        cache.get_or_compute('a', {}, self.compute(ok=False), 60)
+        self.assertEqual(cache.get_or_compute('a', {}, self.compute(), 60), "rows-2")
+        cache.get_or_compute('b', {}, self.compute(), 60)
+        cache.get_or_compute('a', {}, self.compute(), 60)
+        cache.get_or_compute('c', {}, self.compute(), 60)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get_or_compute('a', {}, self.compute(), 60), "rows-2")
+        self.assertEqual(cache.get_or_compute('b', {}, self.compute(), 60), "rows-5")
+
+    def test_disk_tier_is_shared_between_processes(self):
+        """A second cache instance reads the shared tier and sees invalidations made by the first"""
+        with tempfile.TemporaryDirectory() as directory:
+            writer = query_cache.QueryCache(shared=query_cache.DiskTier(directory))
+            reader = query_cache.QueryCache(shared=query_cache.DiskTier(directory))
+            writer.get_or_compute('all_movies', {}, self.compute(), 60, tags=('catalog',))
+            self.assertEqual(reader.get_or_compute('all_movies', {}, self.compute(), 60, tags=('catalog',)), "rows-1")
+            writer.invalidate('catalog')
+            reader._shared_versions.clear()  # Skip the TAG_SYNC_SECONDS grace period
+            self.assertEqual(reader.get_or_compute('all_movies', {}, self.compute(), 60, tags=('catalog',)), "rows-2")
+
+    def test_disk_tier_drops_expired_and_surplus_files(self):
+        """Expired entries are removed when read or swept; the sweep keeps at most max_entries files"""
+        with tempfile.TemporaryDirectory() as directory:
+            tier = query_cache.DiskTier(directory, max_entries=2)
+            now = time.time()
+            tier.set('expired', (now - 1, (), 'old'), 1)
+            self.assertIsNone(tier.get('expired'))
+            self.assertFalse(os.path.exists(tier._path('expired')))
+
+            tier.set('stale', (now - 1, (), 'old'), 1)
+            for i, key in enumerate(['a', 'b', 'c']):
+                tier.set(key, (now + 60 + i, (), key), 60)
+            tier.sweep()
+            self.assertEqual(sorted(name for name in os.listdir(directory) if name.endswith('.pkl')),
+                             sorted(os.path.basename(tier._path(key)) for key in ['b', 'c']))
+            self.assertEqual(tier.get('c')[2], 'c')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+import sys
+import os
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import benchmark_startup
+
+class TestStartupImports(unittest.TestCase):
+    """Heavy dependencies must stay out of the modules every page imports"""
+
+    def test_app_modules_import_lazily(self):
+        """pandas, numpy (via Pillow), scikit-learn and the MySQL drivers load on first use, not at import"""
+        _, baseline = benchmark_startup.measure('streamlit')
+        for target in ('app', 'modules.database', 'modules.recommender', 'modules.image_cache'):
+            seconds, modules = benchmark_startup.measure(target)
+            self.assertIn(target, modules)
+            self.assertEqual(benchmark_startup.heavy_modules_loaded(modules, baseline), [], target)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import unittest
+import sys
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import tmdb
+
+# Trimmed recording of /movie/949?append_to_response=credits,keywords,videos
+HEAT_DETAILS = {
+    "id": 949, "title": "Heat", "poster_path": "/heat.jpg",
+    "genres": [{"id": 28, "name": "Action"}, {"id": 80, "name": "Crime"}],
+    "spoken_languages": [{"english_name": "English", "iso_639_1": "en"}, {"english_name": "Spanish", "iso_639_1": "es"}],
+    "credits": {"cast": [{"name": "Al Pacino"}, {"name": "Robert De Niro"}, {"name": "Val Kilmer"},
+                         {"name": "Jon Voight"}, {"name": "Tom Sizemore"}]},
+    "keywords": {"keywords": [{"name": "bank robbery"}, {"name": "los angeles"}]},
+    "videos": {"results": [
+        {"site": "YouTube", "type": "Featurette", "key": "feat", "official": True},
+        {"site": "YouTube", "type": "Trailer", "key": "fan", "official": False},
+        {"site": "YouTube", "type": "Trailer", "key": "official", "official": True},
+    ]},
+}
+
+class StubTMDb(BaseHTTPRequestHandler):
+    """Local stand-in for /search/movie and /movie/949: 'Busy' is throttled once, 'Nothing' has no poster"""
+    requests = []
+    throttled = set()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.startswith("/movie/"):
+            StubTMDb.requests.append(url.path)
+            if url.path == "/movie/949":
+                self.send_json(HEAT_DETAILS)
+            else:
+                self.send_response(404)
+                self.end_headers()
+            return
+        query = parse_qs(url.query)
+        title = query["query"][0]
+        StubTMDb.requests.append(title)
+        if title == "Busy" and title not in StubTMDb.throttled:
+            StubTMDb.throttled.add(title)
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        results = [] if title == "Nothing" else [{"id": 949 if title == "Heat" else 1, "title": title, "poster_path": f"/{title.lower()}.jpg"}]
+        self.send_json({"results": results})
+
+    def send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestPosterResolver(unittest.TestCase):
+    """Test cases for the batch TMDb poster resolver against a local stub server"""
+
+    def setUp(self):
+        StubTMDb.requests, StubTMDb.throttled = [], set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubTMDb)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.original_url = tmdb.BASE_URL
+        tmdb.BASE_URL = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.cache = tmdb.PosterCache(":memory:")
+
+    def tearDown(self):
+        tmdb.BASE_URL = self.original_url
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_batch_resolution_with_retry(self):
+        """Titles resolve concurrently; a 429 is retried and the result still arrives"""
+        items = [("Heat", 1995), ("Busy", None), ("Nothing", 2001)]
+        posters = tmdb.resolve_posters(items, workers=3, api_key="key", cache=self.cache)
+        self.assertEqual(posters, {
+            ("Heat", 1995): f"{tmdb.BASE_POSTER_URL}/heat.jpg",
+            ("Busy", None): f"{tmdb.BASE_POSTER_URL}/busy.jpg",
+            ("Nothing", 2001): None,
+        })
+        self.assertEqual(StubTMDb.requests.count("Busy"), 2)
+
+    def test_cache_serves_positive_and_negative_results(self):
+        """A second resolution, including the 'no poster' answer, makes no requests"""
+        items = [("Heat", 1995), ("Nothing", 2001)]
+        tmdb.resolve_posters(items, api_key="key", cache=self.cache)
+        StubTMDb.requests.clear()
+        posters = tmdb.resolve_posters([(" heat ", 1995), ("Nothing", 2001)], api_key="key", cache=self.cache)
+        self.assertEqual(StubTMDb.requests, [])
+        self.assertEqual(posters[(" heat ", 1995)], f"{tmdb.BASE_POSTER_URL}/heat.jpg")
+        self.assertIsNone(posters[("Nothing", 2001)])
+
+    def test_failed_lookups_are_not_cached(self):
+        """Lookups that keep failing are left out of the result and of the cache"""
+        tmdb.BASE_URL = "http://127.0.0.1:9/unreachable"
+        original = tmdb.MAX_RETRIES
+        tmdb.MAX_RETRIES = 0
+        try:
+            posters = tmdb.resolve_posters([("Heat", 1995)], api_key="key", cache=self.cache)
+        finally:
+            tmdb.MAX_RETRIES = original
+        self.assertEqual(posters, {})
+        self.assertEqual(self.cache.get_many([("Heat", 1995)]), {})
+
+    def test_retry_after_is_clamped(self):
+        """Retry-After is honoured up to MAX_RETRY_AFTER_SECONDS; unusable values fall back to the backoff"""
+        class Response:
+            def __init__(self, retry_after):
+                self.headers = {"Retry-After": retry_after}
+        self.assertEqual(tmdb._retry_delay(0, Response("2")), 2.0)
+        self.assertEqual(tmdb._retry_delay(0, Response("86400")), tmdb.MAX_RETRY_AFTER_SECONDS)
+        self.assertEqual(tmdb._retry_delay(0, Response("inf")), tmdb.MAX_RETRY_AFTER_SECONDS)
+        for value in ("-5", "nan", "Wed, 21 Oct 2026 07:28:00 GMT"):
+            self.assertEqual(tmdb._retry_delay(1, Response(value)), tmdb.BACKOFF_BASE_SECONDS * 2)
+
+    def test_token_bucket_limits_rate(self):
+        """Past the burst, acquire() waits for tokens to refill"""
+        bucket = tmdb.TokenBucket(rate=100, capacity=2)
+        started = tmdb.time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        self.assertGreaterEqual(tmdb.time.monotonic() - started, 0.015)
+
+class TestMetadataClient(unittest.TestCase):
+    """Test cases for the bulk TMDb metadata client against recorded responses"""
+
+    def setUp(self):
+        StubTMDb.requests, StubTMDb.throttled = [], set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubTMDb)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.original_url = tmdb.BASE_URL
+        tmdb.BASE_URL = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.cache = tmdb.ResponseCache(":memory:")
+
+    def tearDown(self):
+        tmdb.BASE_URL = self.original_url
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_extract_metadata(self):
+        """Details, credits, keywords and videos reduce to the stored columns"""
+        self.assertEqual(tmdb.extract_metadata(HEAT_DETAILS), {
+            "tmdb_id": 949,
+            "genre": "Action, Crime",
+            "cast": "Al Pacino, Robert De Niro, Val Kilmer, Jon Voight",
+            "keywords": "bank robbery, los angeles",
+            "audio_languages": "English, Spanish",
+            "trailer_url": f"{tmdb.YOUTUBE_WATCH_URL}official",
+            "poster_url": f"{tmdb.BASE_POSTER_URL}/heat.jpg",
+        })
+
+    def test_bulk_fetch_uses_ids_search_and_cache(self):
+        """Known ids skip the search; unknown movies map to None; repeats make no requests"""
+        items = [("Heat", 1995, None), ("Heat", 1995, 949), ("Nothing", 2001, None), ("Gone", None, 5)]
+        metadata = tmdb.fetch_metadata_bulk(items, workers=4, api_key="key", cache=self.cache)
+        self.assertEqual(metadata[("Heat", 1995, None)], metadata[("Heat", 1995, 949)])
+        self.assertEqual(metadata[("Heat", 1995, 949)]["tmdb_id"], 949)
+        self.assertIsNone(metadata[("Nothing", 2001, None)])
+        self.assertIsNone(metadata[("Gone", None, 5)])
+
+        StubTMDb.requests.clear()
+        self.assertEqual(tmdb.fetch_metadata_bulk(items[:3], api_key="key", cache=self.cache), {k: metadata[k] for k in items[:3]})
+        self.assertEqual(StubTMDb.requests, [])
+
+    def test_expired_responses_are_pruned(self):
+        """Responses older than the TTL are deleted, not just ignored"""
+        self.cache.put("/movie/949", {}, HEAT_DETAILS)
+        self.cache.put("/movie/1", {}, {"id": 1})
+        with self.cache._conn:
+            self.cache._conn.execute("UPDATE responses SET fetched_at = ? WHERE request_key = '/movie/1?'",
+                                     (tmdb.time.time() - self.cache.ttl - 1,))
+        self.assertEqual(self.cache.prune(), 1)
+        self.assertEqual(self.cache._conn.execute("SELECT request_key FROM responses").fetchall(), [("/movie/949?",)])
+        self.assertEqual(self.cache.get("/movie/949", {}), HEAT_DETAILS)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+import io
+import pandas as pd
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import tmdb_files
+
+GENRES = '[{"id": 28, "name": "Action"}, {"id": 12, "name": "Adventure"}]'
+CAST = '[{"cast_id": 1, "name": "Sam Worthington"}, {"cast_id": 2, "name": "Zoe Saldana"}, {"cast_id": 3, "name": ""}]'
+
+class TestTmdbFiles(unittest.TestCase):
+    """Test cases for the bulk TMDB file transformation"""
+
+    def test_parse_json_names_handles_invalid_values(self):
+        """Each value yields the joined names; invalid, empty and missing values give ''"""
+        series = pd.Series([GENRES, 'not json', None, '[]', GENRES, '{"name": "x"}'], index=[5, 6, 7, 8, 9, 10])
+        names = tmdb_files.parse_json_names(series, limit=1)
+        self.assertEqual(names.tolist(), ['Action', '', '', '', 'Action', ''])
+        self.assertEqual(names.index.tolist(), [5, 6, 7, 8, 9, 10])
+
+    def test_process_pool_matches_serial_parsing(self):
+        """Large inputs are decoded in a process pool with the same result"""
+        series = pd.Series([CAST.replace("Zoe", f"Zoe {i}") for i in range(50)])
+        original = tmdb_files.PARSE_POOL_MIN_VALUES, tmdb_files.PARSE_POOL_BATCH
+        tmdb_files.PARSE_POOL_MIN_VALUES, tmdb_files.PARSE_POOL_BATCH = 10, 20
+        try:
+            pooled = tmdb_files.parse_json_names(series, limit=4, workers=2)
+        finally:
+            tmdb_files.PARSE_POOL_MIN_VALUES, tmdb_files.PARSE_POOL_BATCH = original
+        self.assertEqual(pooled.tolist(), tmdb_files.extract_names(series.tolist(), limit=4))
+        self.assertEqual(pooled[3], "Sam Worthington, Zoe 3 Saldana")
+
+    def test_credits_are_read_in_chunks(self):
+        """The cast lookup is built chunk by chunk (sharing one pool), keeping the first row per movie"""
+        credits = pd.DataFrame({'movie_id': [1, 2, 3, 2, 'x'], 'title': ['A', 'B', 'C', 'B2', 'D'],
+                                'crew': ['[]'] * 5, 'cast': [CAST, '[]', CAST.replace("Sam", "Ann"), CAST, CAST]})
+        source = io.StringIO(credits.to_csv(index=False))
+        cast = tmdb_files.read_cast_lookup(source, chunk_size=2)
+        self.assertEqual(cast.to_dict(), {1: 'Sam Worthington, Zoe Saldana', 2: '', 3: 'Ann Worthington, Zoe Saldana'})
+
+        original = tmdb_files.PARSE_POOL_BATCH
+        tmdb_files.PARSE_POOL_BATCH = 2
+        try:
+            pooled = tmdb_files.read_cast_lookup(credits, chunk_size=4, workers=2)
+        finally:
+            tmdb_files.PARSE_POOL_BATCH = original
+        self.assertEqual(pooled.to_dict(), cast.to_dict())
+
+    def test_transform_movies_joins_cast(self):
+        """Movies are joined to their cast by id; movies without credits are dropped"""
+        credits = pd.read_csv(io.StringIO(pd.DataFrame({'movie_id': [19995, 285], 'title': ['Avatar', 'Pirates'], 'cast': [CAST, '[]']}).to_csv(index=False)))
+        movies = pd.DataFrame({
+            ' ID': [19995, 285, 1],
+            'Title': ['Avatar', 'Pirates', 'No credits'],
+            'genres': [GENRES, '[]', GENRES],
+            'release_date': ['2009-12-10', None, '2001-01-01'],
+            'overview': ['Pandora', None, ''],
+        })
+        rows = tmdb_files.transform_movies(movies, tmdb_files.cast_lookup(credits))
+        self.assertEqual(rows['title'].tolist(), ['Avatar', 'Pirates'])
+        self.assertEqual(rows['cast'].tolist(), ['Sam Worthington, Zoe Saldana', ''])
+        self.assertEqual(rows['genre'].tolist(), ['Action, Adventure', ''])
+        self.assertEqual(rows['release_year'].tolist(), ['2009', ''])
+
+if __name__ == "__main__":
+    unittest.main()
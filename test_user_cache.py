@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db_fakes import FakeDB
+from modules import database
+
+class FakeUserDB(FakeDB):
+    """In-memory watchlist and profile aggregates that record every statement run"""
+
+    def __init__(self):
+        self.watchlist = {(1, 10)}
+        self.statements = []
+        self.profile = {'date_joined': '2024-01-01', 'watched': 12, 'history_rows': 12, 'avg_rating': 4.5, 'total_reviews': 2}
+        self.genres = [('Drama', 7), ('Action', 5)]
+
+    def execute(self, cursor, sql, params):
+        self.statements.append(sql.split()[0])
+        if sql.startswith("SELECT movie_id FROM watchlist"):
+            return [{'movie_id': movie_id} for user_id, movie_id in self.watchlist if user_id == params[0]]
+        elif sql.startswith("SELECT u.date_joined"):
+            return [dict(self.profile, genre=genre, watch_count=count) for genre, count in self.genres]
+        elif sql.startswith("INSERT IGNORE INTO watchlist"):
+            cursor.rowcount = 0 if params in self.watchlist else 1
+            self.watchlist.add(params)
+
+class TestUserCache(unittest.TestCase):
+    """Test cases for the per-user read cache and its invalidation on writes"""
+
+    def setUp(self):
+        self.db = FakeUserDB()
+        self.originals = (database.get_conn, database.log_activity)
+        database.get_conn = self.db.connect
+        database.log_activity = lambda *args: None
+        database.user_cache.clear()
+
+    def tearDown(self):
+        database.get_conn, database.log_activity = self.originals
+        database.user_cache.clear()
+
+    def test_reads_are_cached_until_the_user_writes(self):
+        """Repeated checks make one query; a write refreshes only the writer's entries"""
+        self.assertTrue(database.is_in_watchlist(1, 10))
+        self.assertFalse(database.is_in_watchlist(1, 11))
+        self.assertFalse(database.is_in_watchlist(2, 10))
+        self.assertEqual(self.db.statements, ["SELECT", "SELECT"])
+
+        self.assertTrue(database.add_to_watchlist(1, 11))
+        self.assertTrue(database.is_in_watchlist(1, 11))
+        self.assertFalse(database.is_in_watchlist(2, 10))
+        self.assertEqual(self.db.statements, ["SELECT", "SELECT", "INSERT", "SELECT"])
+
+    def test_stats_and_badges_share_one_query(self):
+        """Profile stats and badges are derived from a single cached aggregate query"""
+        stats = database.get_user_stats(1)
+        badges = database.get_user_badges(1)
+        self.assertEqual(self.db.statements, ["SELECT"])
+        self.assertEqual(stats, {"member_since": '2024-01-01', "total_watched": 12, "most_watched_genre": 'Drama',
+                                 "average_rating": 4.5, "total_reviews": 2})
+        self.assertEqual([badge['name'] for badge in badges],
+                         ['First Watch', '10 Movies Watched', 'First Review', 'Drama Master', 'Action Master'])
+
+if __name__ == "__main__":
+    unittest.main()
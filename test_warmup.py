@@ -0,0 +1,104 @@
+import unittest
+import sys
+import os
+import threading
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import database, metrics, recommender, warmup
+
+MOVIES = [
+    {'id': 1, 'title': 'Heat', 'genre': 'Crime', 'description': 'A bank robbery crew', 'cast': 'Al Pacino', 'poster_url': 'http://a'},
+    {'id': 2, 'title': 'Ronin', 'genre': 'Crime', 'description': 'A heist in France', 'cast': 'Robert De Niro', 'poster_url': 'http://b'},
+]
+
+class TestWarmup(unittest.TestCase):
+    """Test cases for the process warm-up and the once-per-process work it front-loads"""
+
+    def test_steps_are_timed_and_stop_at_the_first_failure(self):
+        """Each step reports its duration; steps after a failure are not attempted"""
+        calls = []
+
+        def fail():
+            raise Exception("Database connection failed")
+        timings = warmup.warm_up([('connection', lambda: calls.append('connection')), ('schema', fail),
+                                  ('model', lambda: calls.append('model'))])
+        self.assertEqual(calls, ['connection'])
+        self.assertEqual([(name, error) for name, _, error in timings],
+                         [('connection', None), ('schema', "Database connection failed")])
+        self.assertIn('movieapp_warmup_step_seconds{step="schema"}', metrics.render())
+
+    def test_readiness_follows_the_warmup_state(self):
+        """/ready reports not ready until the warm-up has succeeded"""
+        original = warmup.state
+        try:
+            warmup.state, warmup.results = 'running', []
+            self.assertFalse(warmup.check_ready()[0])
+            warmup.state, warmup.results = 'ready', [('schema', 0.25, None)]
+            self.assertEqual(warmup.check_ready(), (True, "warm-up: done in 250 ms"))
+        finally:
+            warmup.state = original
+
+    def test_schema_is_verified_once_per_process(self):
+        """init_database only runs the DDL again when forced"""
+        calls = []
+        originals = (database._create_schema, database._schema_verified)
+        database._create_schema, database._schema_verified = lambda: calls.append(1) or [], False
+        try:
+            database.init_database()
+            database.init_database()
+            self.assertEqual(len(calls), 1)
+            database.init_database(force=True)
+            self.assertEqual(len(calls), 2)
+        finally:
+            database._create_schema, database._schema_verified = originals
+
+    def test_incomplete_schema_is_checked_again_and_fails_the_warmup(self):
+        """A schema check with errors is not remembered, and the warm-up schema step fails"""
+        calls = []
+        originals = (database._create_schema, database._schema_verified)
+        database._create_schema, database._schema_verified = lambda: calls.append(1) or ["index idx_x: denied"], False
+        try:
+            self.assertEqual(database.init_database(), ["index idx_x: denied"])
+            self.assertFalse(database._schema_verified)
+            timings = warmup.warm_up([('schema', warmup._verify_schema)])
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(timings[0][2], "1 schema error(s), first: index idx_x: denied")
+        finally:
+            database._create_schema, database._schema_verified = originals
+
+    def test_model_is_rebuilt_in_the_background_when_the_movies_change(self):
+        """ensure_model neither reloads nor rebuilds until the version changes, then serves the old model meanwhile"""
+        builds = []
+        original = recommender.build_recommendation_model
+        release = threading.Event()
+
+        def build(movies_df):
+            if builds:
+                release.wait(5)
+            builds.append(len(movies_df))
+            return original(movies_df)
+        recommender.build_recommendation_model = build
+        # Start without a model, whatever other tests built
+        recommender._publish(None, None)
+        recommender.model_version = None
+        try:
+            first = recommender.ensure_model((2, 2, 'a'), lambda: [dict(movie) for movie in MOVIES])
+            self.assertIs(recommender.ensure_model((2, 2, 'a'), self.fail), first)
+            self.assertEqual(builds, [2])
+
+            self.assertIs(recommender.ensure_model((1, 1, 'b'), lambda: MOVIES[:1]), first)
+            self.assertIs(recommender.ensure_model((1, 1, 'b'), self.fail), first)
+            self.assertIs(recommender.ensure_model(None, self.fail), first)
+            release.set()
+            for thread in threading.enumerate():
+                if thread.name == "model-rebuild":
+                    thread.join(5)
+            self.assertEqual(builds, [2, 1])
+            self.assertEqual(len(recommender.ensure_model((1, 1, 'b'), self.fail)), 1)
+        finally:
+            recommender.build_recommendation_model = original
+
+if __name__ == "__main__":
+    unittest.main()